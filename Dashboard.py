@@ -1,81 +1,654 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
-import time
+import ast
+import copy
+import hashlib
+import json
+import os
 import warnings
+import pickle
+import threading
+from concurrent.futures import ThreadPoolExecutor
+# plotly.express et plotly.graph_objects (lents à importer) ne sont importés que par
+# les constructeurs de figures : une figure servie par le cache n'en a pas besoin
+import plotly
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from data_api import DataAPI
+from data_loader import ColumnarDataLoader, SortedYearIndex, shared_view
+from dataset_schema import SCHEMAS as DATASET_SCHEMAS
+from downsampling import MAX_POINTS, ResolutionPyramid, scatter_class
+from export_engine import ExportEngine
+from figure_cache import FigureCache
+from figure_encoding import compact_figure_json, decimal_figure_json, wire_bytes
+from forecast_engine import OBJECTIF, forecast_prevalence
+from geometry_pipeline import LEVELS as MAP_LEVELS, cached_level_path
+from international_panel import VARIATION, VARIATION_YEARS, InternationalPanel
+from memory_report import SessionMemory, SharedBuffers, format_bytes, frame_bytes, owned_bytes
+from metrics_cube import MetricsCube, long_format
+import narrative
+from perf_metrics import RECORDER as PERF, timed
+from policy_impact import FENETRE, HORIZON, estimate_policy_impacts
+from policy_index import PolicyIntervalIndex
+from price_scenarios import TARGET_YEARS, build_surface
+from refresh_monitor import DataChangeMonitor, version_changed
+from warmup import WarmupScheduler
 warnings.filterwarnings('ignore')
 
-# Configuration de la page
-st.set_page_config(
-    page_title="Dashboard Tabac France - Analyse Stratégique",
-    page_icon="🚭",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-# CSS personnalisé
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 2.8rem;
-        background: linear-gradient(45deg, #8B0000, #FF6B6B, #FFD700);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        text-align: center;
-        margin-bottom: 2rem;
-        font-weight: bold;
-        padding: 1rem;
-    }
-    .section-header {
-        color: #8B0000;
-        border-bottom: 3px solid #FF6B6B;
-        padding-bottom: 0.5rem;
-        margin-top: 2rem;
-        font-size: 1.8rem;
-    }
-    .metric-card {
-        background: linear-gradient(135deg, #8B0000 0%, #FF6B6B 100%);
-        color: white;
-        padding: 1.5rem;
-        border-radius: 15px;
-        margin: 0.5rem 0;
-        box-shadow: 0 4px 15px rgba(0,0,0,0.1);
-    }
-    .impact-card {
-        padding: 1rem;
-        border-radius: 10px;
-        margin: 0.5rem 0;
-        border-left: 5px solid;
+def configure_page():
+    """Configuration de la page et CSS personnalisé (premières commandes Streamlit)"""
+    st.set_page_config(
+        page_title="Dashboard Tabac France - Analyse Stratégique",
+        page_icon="🚭",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+
+    # CSS personnalisé
+    st.markdown("""
+    <style>
+        .main-header {
+            font-size: 2.8rem;
+            background: linear-gradient(45deg, #8B0000, #FF6B6B, #FFD700);
+            -webkit-background-clip: text;
+            -webkit-text-fill-color: transparent;
+            text-align: center;
+            margin-bottom: 2rem;
+            font-weight: bold;
+            padding: 1rem;
+        }
+        .section-header {
+            color: #8B0000;
+            border-bottom: 3px solid #FF6B6B;
+            padding-bottom: 0.5rem;
+            margin-top: 2rem;
+            font-size: 1.8rem;
+        }
+        .metric-card {
+            background: linear-gradient(135deg, #8B0000 0%, #FF6B6B 100%);
+            color: white;
+            padding: 1.5rem;
+            border-radius: 15px;
+            margin: 0.5rem 0;
+            box-shadow: 0 4px 15px rgba(0,0,0,0.1);
+        }
+        .impact-card {
+            padding: 1rem;
+            border-radius: 10px;
+            margin: 0.5rem 0;
+            border-left: 5px solid;
+        }
+        .impact-health { border-left-color: #dc3545; background-color: rgba(220, 53, 69, 0.1); }
+        .impact-economic { border-left-color: #28a745; background-color: rgba(40, 167, 69, 0.1); }
+        .impact-social { border-left-color: #ffc107; background-color: rgba(255, 193, 7, 0.1); }
+        .policy-card {
+            padding: 1rem;
+            border-radius: 8px;
+            margin: 0.5rem 0;
+            border-left: 4px solid;
+        }
+        .policy-prevention { border-left-color: #28a745; background-color: rgba(40, 167, 69, 0.1); }
+        .policy-tax { border-left-color: #007bff; background-color: rgba(0, 123, 255, 0.1); }
+        .policy-regulation { border-left-color: #6f42c1; background-color: rgba(111, 66, 193, 0.1); }
+        .policy-ban { border-left-color: #dc3545; background-color: rgba(220, 53, 69, 0.1); }
+    </style>
+    """, unsafe_allow_html=True)
+
+
+# Version du schéma des données ; la version effective inclut l'empreinte des
+# fichiers du chargeur, si bien que le cache partagé est invalidé dès qu'ils changent
+DATA_VERSION = "2023.4"
+DATA_DIR = os.environ.get('TABAC_DATA_DIR',
+                          os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data'))
+
+# Copy-on-write : une session qui modifie un DataFrame partagé obtient sa propre copie
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.options.mode.copy_on_write = True
+
+
+@st.cache_resource(show_spinner=False)
+def get_data_loader():
+    """Chargeur colonnaire du processus : un fichier Arrow par jeu de données"""
+    loader = ColumnarDataLoader(DATA_DIR, DATASET_SCHEMAS)
+    loader.register('historical_data', 'historique.arrow', TobaccoDashboard.initialize_historical_data)
+    loader.register('policy_timeline', 'politiques.arrow', TobaccoDashboard.initialize_policy_timeline)
+    loader.register('regional_data', 'regions.arrow', TobaccoDashboard.initialize_regional_data)
+    loader.register('international_comparison', 'international.arrow',
+                    TobaccoDashboard.initialize_international_comparison)
+    # Panel (pays, année) : classements et variations de la section internationale
+    loader.register('international_panel', 'international_panel.arrow',
+                    TobaccoDashboard.initialize_international_panel)
+    loader.register('health_impact_data', 'sante.arrow', TobaccoDashboard.initialize_health_impact_data)
+    # Agrégats mensuels produits par sales_ingestion.py (pas de source intégrée)
+    loader.register('ventes_mensuelles', 'ventes_mensuelles.arrow')
+    # Prévalence infra-régionale pour les cartes (colonnes code, nom, prevalence)
+    loader.register('departemental_data', 'departements.arrow')
+    loader.register('communal_data', 'communes.arrow')
+    # Séries régionales annuelles (colonnes region, annee, prevalence) pour l'impact des politiques
+    loader.register('regional_series', 'regions_series.arrow')
+    return loader
+
+
+def current_data_version():
+    """Version effective des données (schéma + empreinte des fichiers)"""
+    return f"{DATA_VERSION}-{get_data_loader().fingerprint()}"
+
+
+# Rafraîchissement automatique : le processus vérifie les sources toutes les
+# DATA_POLL_SECONDS, chaque session compare sa version toutes les SESSION_POLL_SECONDS
+DATA_POLL_SECONDS = 30
+SESSION_POLL_SECONDS = 15
+
+
+@st.cache_resource(show_spinner=False)
+def get_refresh_monitor():
+    """Surveillance des données partagée par toutes les sessions du processus"""
+    loader = get_data_loader()
+    return DataChangeMonitor(lambda: f"{DATA_VERSION}-{loader.fingerprint()}",
+                             interval=DATA_POLL_SECONDS)
+
+
+class SharedDatasets:
+    """Jeux de données d'une version, chargés à la demande et partagés en lecture seule"""
+
+    # Colonne temporelle des jeux de données filtrables par période
+    YEAR_COLUMNS = {
+        'historical_data': 'annee',
+        'health_impact_data': 'annee',
+        'policy_timeline': 'date',
     }
-    .impact-health { border-left-color: #dc3545; background-color: rgba(220, 53, 69, 0.1); }
-    .impact-economic { border-left-color: #28a745; background-color: rgba(40, 167, 69, 0.1); }
-    .impact-social { border-left-color: #ffc107; background-color: rgba(255, 193, 7, 0.1); }
-    .policy-card {
-        padding: 1rem;
-        border-radius: 8px;
-        margin: 0.5rem 0;
-        border-left: 4px solid;
+
+    # Indicateurs du cube des cartes, par jeu de données
+    KPI_INDICATORS = {
+        'historical_data': ['prevalence_tabagisme', 'fumeurs_quotidiens', 'consommation_cigarettes',
+                            'prix_moyen', 'recettes_fiscales'],
+        'health_impact_data': ['deces_tabac', 'couts_sante'],
     }
-    .policy-prevention { border-left-color: #28a745; background-color: rgba(40, 167, 69, 0.1); }
-    .policy-tax { border-left-color: #007bff; background-color: rgba(0, 123, 255, 0.1); }
-    .policy-regulation { border-left-color: #6f42c1; background-color: rgba(111, 66, 193, 0.1); }
-    .policy-ban { border-left-color: #dc3545; background-color: rgba(220, 53, 69, 0.1); }
-</style>
-""", unsafe_allow_html=True)
+
+    # Jeux de données joints aux exports
+    EXPORTED = ['historical_data', 'health_impact_data', 'policy_timeline', 'regional_data',
+                'international_comparison']
+
+    def __init__(self, version, loader):
+        self.version = version
+        self.loader = loader
+        self._year_indexes = {}
+        self._derived = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+        # Vrai quand l'état a changé depuis le dernier instantané
+        self._dirty = False
+        # Une seule écriture d'instantané à la fois par processus
+        self._saving = threading.Lock()
+
+    def frame(self, name, columns=None, years=None):
+        """Jeu de données restreint aux colonnes demandées et à la période (début, fin)"""
+        frame = self.loader.load(name, columns)
+        if years is None or name not in self.YEAR_COLUMNS:
+            return frame
+        return self.year_index(name).slice(frame, *years)
+
+    def year_index(self, name):
+        """Index trié des années d'un jeu de données (construit une fois par version)"""
+        index = self._year_indexes.get(name)
+        if index is None:
+            column = self.YEAR_COLUMNS[name]
+            values = self.loader.load(name, [column])[column]
+            if column == 'date':
+                values = pd.to_datetime(values).dt.year
+            index = self._year_indexes[name] = SortedYearIndex(values.to_numpy())
+            self._dirty = True
+        return index
+    
+    def reference_year(self):
+        """Dernière année dont la prévalence est connue
+        
+        Les années complètes des ventes des buralistes prolongent historical_data
+        sans prévalence : elles ne doivent pas devenir l'année des indicateurs clés.
+        """
+        frame = self.frame('historical_data', ['annee', 'prevalence_tabagisme'])
+        known = frame.loc[frame['prevalence_tabagisme'].notna(), 'annee']
+        return int(known.max()) if len(known) else self.year_index('historical_data').last
+    
+    def derived(self, name, build):
+        """Table dérivée de cette version, calculée une fois et conservée dans l'instantané
+        
+        Les sessions en reçoivent une vue : la table partagée n'est jamais modifiée.
+        """
+        frame = self._derived.get(name)
+        if frame is None:
+            frame = self._derived[name] = build()
+            self._dirty = True
+        return shared_view(frame)
+    
+    def derived_async(self, name, build, executor, wait=False):
+        """Table dérivée calculée en arrière-plan : None tant qu'elle n'est pas prête
+        
+        Le calcul n'est lancé qu'une fois, quelle que soit la session qui le demande ;
+        avec wait=True, l'appel attend son résultat.
+        """
+        frame = self._derived.get(name)
+        if frame is not None:
+            return shared_view(frame)
+        with self._lock:
+            future = self._pending.get(name)
+            if future is None:
+                future = self._pending[name] = executor.submit(build)
+        if not wait and not future.done():
+            return None
+        try:
+            frame = future.result()
+        finally:
+            # Un échec est relancé à la prochaine demande
+            with self._lock:
+                self._pending.pop(name, None)
+        self._derived[name] = frame
+        self._dirty = True
+        return shared_view(frame)
+    
+    def sorted_frame(self, name, by, columns=None):
+        """Jeu de données trié par `by`, trié une fois par version (les sessions en reçoivent une vue)"""
+        frame = self.derived(f"tri:{name}:{by}", lambda: self.frame(name).sort_values(by, kind='stable'))
+        return frame if columns is None else frame[list(columns)]
+    
+    def memory_usage(self):
+        """Octets des jeux de données chargés et des tables dérivées, partagés par les sessions"""
+        return {
+            'jeux de données': sum(self.loader.memory_usage().values()),
+            'tables dérivées': sum(frame_bytes(value) for value in list(self._derived.values())),
+        }
+    
+    def shared_buffers(self):
+        """Tampons du magasin partagé, pour ne pas les compter dans la mémoire des sessions"""
+        tables = [value for value in list(self._derived.values()) if isinstance(value, pd.DataFrame)]
+        return SharedBuffers(self.loader.frames() + tables)
+    
+    def policy_index(self):
+        """Index d'intervalles des politiques, dérivé de celui de la version précédente"""
+        def build():
+            latest = get_latest_policy_index()
+            index = latest['index'] = latest['index'].synced(self.frame('policy_timeline'))
+            return index
+        return self.derived('index_politiques', build)
+    
+    def international_panel(self):
+        """Panel international (pays, année) ; ses statistiques par indicateur sont calculées une fois"""
+        return self.derived('panel_international', lambda: InternationalPanel(self.frame('international_panel')))
+    
+    def metrics_long(self):
+        """Indicateurs des cartes en format long (annee, indicateur, region, valeur)"""
+        parts = [long_format(self.frame('historical_data'), self.KPI_INDICATORS['historical_data']),
+                 long_format(self.frame('health_impact_data'), self.KPI_INDICATORS['health_impact_data'])]
+        if self.loader.available('regional_series'):
+            regional = self.frame('regional_series', ['region', 'annee', 'prevalence'])
+            parts.append(regional.rename(columns={'prevalence': 'valeur'})
+                         .assign(indicateur='prevalence_tabagisme'))
+        return pd.concat(parts, ignore_index=True).dropna(subset=['valeur'])
+    
+    def metrics_cube(self):
+        """Cube (année, indicateur, région) des cartes, prolongé depuis celui de la version précédente"""
+        def build():
+            latest = get_latest_metrics_cube()
+            cube = latest['cube'] = latest['cube'].synced(self.metrics_long())
+            return cube
+        return self.derived('cube_indicateurs', build)
+    
+    def prepare(self):
+        """Charge les jeux de données exportés et leurs index d'années"""
+        for name in self.EXPORTED:
+            self.frame(name)
+        for name in self.YEAR_COLUMNS:
+            self.year_index(name)
+        self.policy_index()
+        self.metrics_cube()
+        self.international_panel().statistics('prevalence_tabagisme')
+    
+    def save_snapshot(self, path):
+        """Écrit l'état préparé (sources intégrées, index, tables dérivées) s'il a changé
+
+        Une session qui trouve une écriture en cours ne l'attend pas ; le fichier
+        temporaire est propre au processus et au thread, et un échec d'écriture
+        laisse l'état à réécrire au prochain rendu.
+        """
+        if not self._dirty or not self._saving.acquire(blocking=False):
+            return False
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            # Remis à zéro avant la copie : un changement pendant l'écriture sera repris
+            self._dirty = False
+            state = {
+                'version': self.version,
+                'builtins': self.loader.builtin_frames(),
+                'typed_bytes': self.loader.builtin_typed_bytes(),
+                'year_indexes': dict(self._year_indexes),
+                'derived': dict(self._derived),
+            }
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            return True
+        except OSError:
+            self._dirty = True
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return False
+        finally:
+            self._saving.release()
+    
+    def load_snapshot(self, path):
+        """Reprend l'état d'un instantané de la même version ; False s'il est absent ou illisible"""
+        try:
+            with open(path, 'rb') as f:
+                state = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return False
+        if state.get('version') != self.version:
+            return False
+        self.loader.preload(state['builtins'], state.get('typed_bytes'))
+        self._year_indexes.update(state['year_indexes'])
+        self._derived.update(state['derived'])
+        return True
+
+    def year_row(self, name, year, columns=None):
+        """Ligne d'une année, trouvée par recherche dichotomique"""
+        return self.year_index(name).row(self.loader.load(name, columns), year)
+
+    @property
+    def historical_data(self):
+        return self.frame('historical_data')
+
+    @property
+    def policy_timeline(self):
+        return tuple(self.frame('policy_timeline').to_dict('records'))
+
+    @property
+    def regional_data(self):
+        return self.frame('regional_data')
+
+    @property
+    def international_comparison(self):
+        return self.frame('international_comparison')
+
+    @property
+    def health_impact_data(self):
+        return self.frame('health_impact_data')
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def load_shared_datasets(data_version):
+    """Jeux de données d'une version donnée (une seule instance par processus)
+    
+    Un nouveau processus repart de l'instantané de la version s'il existe,
+    plutôt que de reconstruire les sources intégrées et les index.
+    """
+    datasets = SharedDatasets(data_version, get_data_loader())
+    path = snapshot_path(data_version)
+    if not datasets.load_snapshot(path):
+        datasets.prepare()
+        datasets.save_snapshot(path)
+        prune_snapshots(path)
+    return datasets
+
+
+@st.cache_resource(show_spinner=False)
+def get_latest_policy_index():
+    """Dernier index des politiques du processus : une nouvelle version n'y insère que les ajouts"""
+    return {'index': PolicyIntervalIndex()}
+
+
+@st.cache_resource(show_spinner=False)
+def get_latest_metrics_cube():
+    """Dernier cube des indicateurs du processus : une nouvelle version n'y ajoute que les nouvelles années"""
+    return {'cube': MetricsCube.build(pd.DataFrame(columns=['annee', 'indicateur', 'region', 'valeur']))}
+
+
+def snapshot_path(data_version):
+    """Instantané d'une version des données pour une version du code"""
+    return os.path.join(SNAPSHOT_DIR, f"{data_version}-{FIGURE_CODE_VERSION}.pkl")
+
+
+def prune_snapshots(keep, max_files=4):
+    """Supprime les instantanés les plus anciens"""
+    try:
+        paths = [os.path.join(SNAPSHOT_DIR, name) for name in os.listdir(SNAPSHOT_DIR)
+                 if name.endswith('.pkl')]
+    except OSError:
+        return
+    def mtime(path):
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return 0
+    paths.sort(key=mtime, reverse=True)
+    for path in paths[max_files:]:
+        if path != keep:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+# Cache des figures : le disque survit aux redémarrages ; l'empreinte du code
+# invalide les figures dès que leur construction change
+CACHE_DIR = os.environ.get('TABAC_CACHE_DIR',
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache'))
+FIGURE_CACHE_DIR = os.path.join(CACHE_DIR, 'figures')
+SNAPSHOT_DIR = os.path.join(CACHE_DIR, 'snapshots')
+# Mesures de performance (metrics.prom / metrics.json), réécrites au plus toutes les PERF_WRITE_SECONDS
+PERF_METRICS_DIR = os.path.join(CACHE_DIR, 'metrics')
+PERF_WRITE_SECONDS = 5
+# Encodage compact des figures envoyées au navigateur (tableaux typés, précision arrondie)
+COMPACT_FIGURES = os.environ.get('TABAC_COMPACT_FIGURES', '1') != '0'
+# Threads de préchauffage des onglets non affichés (0 = désactivé)
+WARMUP_WORKERS = int(os.environ.get('TABAC_WARMUP_WORKERS', '2'))
+# Port de l'API JSON locale servie depuis le processus du dashboard (non défini = pas d'API)
+API_PORT = os.environ.get('TABAC_API_PORT')
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def local_sources(path, mtime_ns):
+    """Fichiers du module `path` et des modules locaux qu'il importe, directement ou non (triés)
+    
+    Relus seulement quand `path` change (mtime_ns) : le script est réexécuté à chaque interaction.
+    """
+    directory = os.path.dirname(path)
+    pending, found = [path], set()
+    while pending:
+        current = pending.pop()
+        if current in found:
+            continue
+        found.add(current)
+        with open(current, 'rb') as f:
+            tree = ast.parse(f.read())
+        for node in ast.walk(tree):
+            names = [alias.name for alias in node.names] if isinstance(node, ast.Import) else \
+                [node.module] if isinstance(node, ast.ImportFrom) and node.module and not node.level else []
+            for name in names:
+                candidate = os.path.join(directory, f"{name.split('.')[0]}.py")
+                if os.path.exists(candidate):
+                    pending.append(candidate)
+    return tuple(sorted(found))
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def code_version(sources, mtimes):
+    """Empreinte du code des figures et de l'instantané : modules locaux et version de plotly
+    
+    Calculée une fois par état des fichiers (`mtimes`) : un rerun ne fait qu'un stat par module.
+    """
+    digest = hashlib.sha1(plotly.__version__.encode())
+    for source in sources:
+        with open(source, 'rb') as f:
+            digest.update(os.path.basename(source).encode() + b'\0' + f.read())
+    return digest.hexdigest()[:12]
+
+
+def current_code_version(path=os.path.abspath(__file__)):
+    """Empreinte du code de `path` et de ses modules locaux, recalculée seulement s'ils ont changé"""
+    sources = local_sources(path, os.stat(path).st_mtime_ns)
+    return code_version(sources, tuple(os.stat(source).st_mtime_ns for source in sources))
+
+
+# Une modification de Dashboard.py ou de l'un des modules locaux qu'il importe invalide
+# le cache de figures et l'instantané de démarrage
+FIGURE_CODE_VERSION = current_code_version()
+
+
+# Niveaux de carte : libellé et jeu de données associé
+MAP_LEVEL_LABELS = {'region': 'Régions', 'departement': 'Départements', 'commune': 'Communes'}
+MAP_LEVEL_DATASETS = {'region': 'regional_data', 'departement': 'departemental_data',
+                      'commune': 'communal_data'}
+
+
+@st.cache_resource(show_spinner=False, max_entries=6)
+def load_level_geometry(path, mtime):
+    """Contours simplifiés d'un niveau, lus une fois depuis le cache de geometry_pipeline.py"""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+@st.cache_resource(show_spinner=False)
+def get_figure_cache():
+    """Cache de figures partagé par toutes les sessions du processus"""
+    return FigureCache(cache_dir=FIGURE_CACHE_DIR)
+
+
+@st.cache_resource(show_spinner=False)
+def get_session_memory():
+    """Mémoire propre de chaque session active du processus"""
+    return SessionMemory()
+
+
+@st.cache_resource(show_spinner=False)
+def get_analysis_executor():
+    """Threads des estimations lourdes (hors du thread de rendu), partagés par les sessions"""
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix='analyse')
+
+
+@st.cache_resource(show_spinner=False)
+def get_warmup_scheduler():
+    """Préchauffage des figures des onglets non affichés, pool borné partagé par les sessions"""
+    return WarmupScheduler(max_workers=WARMUP_WORKERS)
+
+
+@st.cache_resource(show_spinner=False)
+def get_data_api():
+    """API JSON locale (data_api.py) sur les jeux de données partagés du processus"""
+    api = DataAPI(lambda: load_shared_datasets(current_data_version()))
+    api.serve('127.0.0.1', int(API_PORT))
+    return api
+
+
+@st.cache_resource(show_spinner=False)
+def get_export_engine():
+    """Moteur d'export partagé (pool de processus unique par serveur)"""
+    return ExportEngine(os.path.join(CACHE_DIR, 'exports'))
+
 
 class TobaccoDashboard:
-    def __init__(self):
-        self.historical_data = self.initialize_historical_data()
-        self.policy_timeline = self.initialize_policy_timeline()
-        self.regional_data = self.initialize_regional_data()
-        self.international_comparison = self.initialize_international_comparison()
-        self.health_impact_data = self.initialize_health_impact_data()
-        
-    def initialize_historical_data(self):
+    # Sections du dashboard : (libellé de l'onglet, clé, méthode de rendu)
+    SECTIONS = [
+        ("📈 Historique", 'historique', 'create_historical_analysis'),
+        ("🏛️ Politiques", 'politiques', 'create_policy_analysis'),
+        ("🗺️ Régional", 'regional', 'create_regional_analysis'),
+        ("🌍 International", 'international', 'create_international_comparison'),
+        ("🎯 Stratégies", 'strategies', 'create_strategic_recommendations'),
+        ("💡 Synthèse", 'synthese', 'create_synthesis'),
+    ]
+    
+    # Figures de chaque section (méthodes figure_<section>_<id>), dans l'ordre d'affichage
+    FIGURES = {
+        'historique': ['prevalence', 'repartition_fumeurs', 'consommation', 'prix_consommation',
+                       'mortalite', 'couts_sante'],
+        'politiques': ['timeline', 'impact_prevalence', 'delai_impact', 'efficacite'],
+        'regional': ['carte', 'classement', 'evolution'],  # + choroplethe(niveau, geometrie)
+        'international': ['prevalence', 'prix_prevalence', 'politiques', 'performances'],
+        'strategies': ['projection', 'scenario', 'surface'],
+    }
+    
+    # Cartes d'indicateurs clés : (libellé, indicateur du cube, unité, sens de la variation)
+    KPI_CARDS = [
+        ("Prévalence Tabagisme", 'prevalence_tabagisme', "%", "inverse"),
+        ("Fumeurs Quotidiens", 'fumeurs_quotidiens', "%", "inverse"),
+        ("Prix Moyen du Paquet", 'prix_moyen', "€", "normal"),
+        ("Recettes Fiscales", 'recettes_fiscales', "Md€", "normal"),
+    ]
+    
+    # Attributs partagés par toutes les sessions (exclus de la mémoire propre d'une session)
+    SHARED_ATTRIBUTES = ('datasets', 'figure_cache')
+    
+    def __init__(self, datasets=None):
+        # Les données sont partagées entre sessions : un rerun ne reconstruit rien
+        self.datasets = datasets if datasets is not None else load_shared_datasets(current_data_version())
+        self.lazy_sections = True
+        # Période (début, fin) appliquée aux séries temporelles ; None = tout
+        self.year_range = None
+        # État des contrôles dont dépendent les figures (clé du cache)
+        self.figure_controls = {}
+        self.figure_cache = get_figure_cache()
+        self.perf_panel = None
+        self.show_projections = True
+        self.compact_figures = COMPACT_FIGURES
+        # Octets de figures envoyés au navigateur par section, pour le rerun en cours
+        self.payload_bytes = {}
+        self.payload_panel = None
+        self.memory_panel = None
+    
+    @property
+    def historical_data(self):
+        return self.datasets.historical_data
+    
+    @property
+    def policy_timeline(self):
+        return self.datasets.policy_timeline
+    
+    @property
+    def regional_data(self):
+        return self.datasets.regional_data
+    
+    @property
+    def international_comparison(self):
+        return self.datasets.international_comparison
+    
+    @property
+    def health_impact_data(self):
+        return self.datasets.health_impact_data
+    
+    def dataset(self, name, columns=None):
+        """Jeu de données restreint aux colonnes utilisées par une figure et à la période"""
+        return self.datasets.frame(name, columns, self.year_range)
+    
+    def series(self, name, columns):
+        """Série temporelle de la période, sous-échantillonnée (LTTB) au-delà de MAX_POINTS points par trace
+        
+        columns : axe x puis colonnes tracées. La pyramide de résolutions est
+        calculée une fois par version des données ; la vue prend le niveau le
+        plus fin qui tient dans le budget de points de la période.
+        """
+        frame = self.dataset(name, columns)
+        if len(frame) <= MAX_POINTS:
+            return frame
+        x, values = columns[0], columns[1:]
+        full = self.datasets.frame(name, columns)
+        pyramid = self.datasets.derived(
+            f"lttb:{name}:{'/'.join(values)}",
+            lambda: ResolutionPyramid(full[x].to_numpy(), {c: full[c].to_numpy(dtype=float) for c in values}))
+        return pyramid.view(full, *(self.year_range or (None, None)))
+    
+    @staticmethod
+    def period_label(frame):
+        """Période couverte par un jeu de données filtré (ex. « 2000-2023 »)"""
+        if frame.empty:
+            return "aucune donnée"
+        return f"{frame['annee'].iloc[0]}-{frame['annee'].iloc[-1]}"
+    
+    @staticmethod
+    @timed
+    def initialize_historical_data():
         """Initialise les données historiques de la consommation de tabac"""
         years = list(range(2000, 2024))
         
@@ -119,7 +692,9 @@ class TobaccoDashboard:
             'recettes_fiscales': tax_revenue
         })
     
-    def initialize_policy_timeline(self):
+    @staticmethod
+    @timed
+    def initialize_policy_timeline():
         """Initialise la timeline des politiques anti-tabac"""
         return [
             {'date': '1991-01-01', 'type': 'regulation', 'titre': 'Loi Évin', 
@@ -144,7 +719,9 @@ class TobaccoDashboard:
              'description': 'Objectif: paquet à 13€ d\'ici 2027'},
         ]
     
-    def initialize_regional_data(self):
+    @staticmethod
+    @timed
+    def initialize_regional_data():
         """Initialise les données régionales de consommation"""
         regions = [
             'Île-de-France', 'Auvergne-Rhône-Alpes', 'Nouvelle-Aquitaine', 
@@ -163,7 +740,9 @@ class TobaccoDashboard:
         
         return pd.DataFrame(data)
     
-    def initialize_international_comparison(self):
+    @staticmethod
+    @timed
+    def initialize_international_comparison():
         """Initialise les données comparatives internationales"""
         countries = ['France', 'Allemagne', 'Royaume-Uni', 'Espagne', 'Italie', 'États-Unis', 'Australie', 'Japon']
         
@@ -178,7 +757,47 @@ class TobaccoDashboard:
         
         return pd.DataFrame(data)
     
-    def initialize_health_impact_data(self):
+    @staticmethod
+    @timed
+    def initialize_international_panel():
+        """Initialise le panel international 2013-2023
+        
+        France : série historique observée. Pays dont la baisse sur 10 ans est
+        connue (ancien tableau « Performances ») : 2013 et 2023 observés, années
+        intermédiaires interpolées linéairement et marquées `interpole`. Autres
+        pays : 2023 seulement.
+        """
+        latest = TobaccoDashboard.initialize_international_comparison().set_index('pays')
+        # Variation de la prévalence 2013-2023 (points), seule source des valeurs 2013
+        reduction_10ans = {'Allemagne': -2.8, 'Royaume-Uni': -6.9, 'États-Unis': -3.1, 'Australie': -8.2}
+        years = np.arange(2013, 2024)
+        share = (years - years[0]) / (years[-1] - years[0])
+        
+        historical = TobaccoDashboard.initialize_historical_data()
+        france = historical[historical['annee'].between(years[0], years[-1])]
+        parts = [pd.DataFrame({'pays': 'France', 'annee': france['annee'].to_numpy(),
+                               'prevalence_tabagisme': france['prevalence_tabagisme'].to_numpy(), 'interpole': 0})]
+        for pays, reduction in reduction_10ans.items():
+            end = latest.loc[pays, 'prevalence_tabagisme']
+            parts.append(pd.DataFrame({
+                'pays': pays, 'annee': years,
+                'prevalence_tabagisme': np.round(end - reduction + reduction * share, 1),
+                'interpole': ((years > years[0]) & (years < years[-1])).astype(int),
+            }))
+        others = latest.drop(index=['France', *reduction_10ans])
+        parts.append(pd.DataFrame({'pays': others.index, 'annee': years[-1],
+                                   'prevalence_tabagisme': others['prevalence_tabagisme'].to_numpy(), 'interpole': 0}))
+        
+        panel = pd.concat(parts, ignore_index=True)
+        panel['interpole'] = panel['interpole'].astype('int8')
+        # Dépenses de prévention (€ par habitant) : dernière année seulement
+        panel['depenses_prevention'] = np.where(panel['annee'] == years[-1],
+                                                panel['pays'].map(latest['depenses_prevention']), np.nan)
+        return panel
+    
+    @staticmethod
+    @timed
+    def initialize_health_impact_data():
         """Initialise les données d'impact sur la santé"""
         years = list(range(2010, 2024))
         
@@ -193,6 +812,7 @@ class TobaccoDashboard:
         
         return pd.DataFrame(data)
     
+    @timed
     def display_header(self):
         """Affiche l'en-tête du dashboard"""
         st.markdown(
@@ -213,577 +833,920 @@ class TobaccoDashboard:
         current_time = datetime.now().strftime('%H:%M:%S')
         st.sidebar.markdown(f"**🕐 Dernière mise à jour: {current_time}**")
     
+    @timed
     def display_key_metrics(self):
         """Affiche les métriques clés du tabac en France"""
         st.markdown('<h3 class="section-header">📊 INDICATEURS CLÉS DU TABAC EN FRANCE</h3>', 
                    unsafe_allow_html=True)
         
-        current_data = self.historical_data[self.historical_data['annee'] == 2023].iloc[0]
-        previous_data = self.historical_data[self.historical_data['annee'] == 2022].iloc[0]
+        cards = self.key_metric_cards()
+        for column, card in zip(st.columns(len(cards)), cards):
+            with column:
+                st.metric(card['libelle'], card['valeur'], card['ecart'], delta_color=card['sens'])
+    
+    def key_metric_cards(self):
+        """Cartes des indicateurs clés formatées (libellé, valeur, écart, sens, écart favorable)
         
-        col1, col2, col3, col4 = st.columns(4)
+        Partagées par le dashboard et le site statique pour un même affichage.
+        """
+        cube = self.datasets.metrics_cube()
+        year = self.kpi_year(cube)
+        cards = []
+        for label, indicator, unit, delta_color in self.KPI_CARDS:
+            cell = cube.cell(year, indicator) or {}
+            value, change = cell.get('valeur', np.nan), cell.get('ecart', np.nan)
+            cards.append({
+                'libelle': f"{label} ({year})",
+                'valeur': f"{value:.1f}{unit}" if pd.notna(value) else "n.d.",
+                'ecart': f"{change:+.1f}{unit} vs {year - 1}" if pd.notna(change) else None,
+                'sens': delta_color,
+                'favorable': bool(pd.notna(change) and (change < 0) == (delta_color == 'inverse')),
+            })
+        return cards
+    
+    @staticmethod
+    def show_text(rows):
+        """Affiche des blocs Markdown de narrative.py, côte à côte sur chaque ligne"""
+        for row in rows:
+            columns = st.columns(len(row)) if len(row) > 1 else [st.container()]
+            for column, text in zip(columns, row):
+                column.markdown(text)
+    
+    def end_year(self, last_year):
+        """Année de référence : l'année de fin sélectionnée, au plus la dernière année disponible"""
+        return min(self.year_range[1], last_year) if self.year_range else last_year
+    
+    def kpi_year(self, cube):
+        """Année des indicateurs clés : l'année de fin, au plus la dernière année dont la prévalence est connue"""
+        return self.end_year(min(cube.last_year, self.datasets.reference_year()))
+    
+    def render_tabs(self, key, tabs):
+        """Affiche des onglets (libellé, méthode de rendu)
         
-        with col1:
-            st.metric(
-                "Prévalence Tabagisme",
-                f"{current_data['prevalence_tabagisme']:.1f}%",
-                f"{(current_data['prevalence_tabagisme'] - previous_data['prevalence_tabagisme']):+.1f}% vs 2022",
-                delta_color="inverse"
-            )
+        En mode paresseux, seul l'onglet actif est calculé : les autres ne
+        construisent leurs figures qu'à leur ouverture.
+        """
+        labels = [label for label, _ in tabs]
         
-        with col2:
-            st.metric(
-                "Fumeurs Quotidiens",
-                f"{current_data['fumeurs_quotidiens']:.1f}%",
-                f"{(current_data['fumeurs_quotidiens'] - previous_data['fumeurs_quotidiens']):+.1f}% vs 2022",
-                delta_color="inverse"
-            )
+        if self.lazy_sections:
+            active = st.radio("Onglet", labels, horizontal=True,
+                              key=f"onglet_{key}", label_visibility="collapsed")
+            dict(tabs)[active]()
+        else:
+            for container, (_, render) in zip(st.tabs(labels), tabs):
+                with container:
+                    render()
+    
+    def figure_key(self, section, figure_id, **params):
+        """Clé de cache d'une figure : section, figure, version des données, code, contrôles et paramètres"""
+        return FigureCache.make_key(section, figure_id, self.datasets.version, FIGURE_CODE_VERSION,
+                                    tuple(sorted(self.figure_controls.items())),
+                                    tuple(sorted(params.items())), self.compact_figures)
+    
+    def figure_json(self, section, figure_id, **params):
+        """Figure sérialisée, mémoïsée par (section, figure, version des données, contrôles)
         
-        with col3:
-            st.metric(
-                "Prix Moyen du Paquet",
-                f"{current_data['prix_moyen']:.1f}€",
-                f"{(current_data['prix_moyen'] - previous_data['prix_moyen']):+.1f}€ vs 2022"
-            )
+        Les paramètres propres à la figure sont passés au constructeur et font partie de la clé.
+        """
+        key = self.figure_key(section, figure_id, **params)
+        builder = getattr(self, f"figure_{section}_{figure_id}")
         
-        with col4:
-            st.metric(
-                "Recettes Fiscales",
-                f"{current_data['recettes_fiscales']:.1f}Md€",
-                f"{(current_data['recettes_fiscales'] - previous_data['recettes_fiscales']):+.1f}Md€ vs 2022"
-            )
+        def build():
+            payload = decimal_figure_json(builder(**params).to_json())
+            return compact_figure_json(payload) if self.compact_figures else payload
+        
+        return self.figure_cache.get_or_build(key, build)
+    
+    def show_figure(self, section, figure_id, **params):
+        """Affiche une figure depuis le cache"""
+        payload = self.figure_json(section, figure_id, **params)
+        figure = json.loads(payload)
+        if not figure.get('data'):
+            st.info("Aucune donnée disponible sur la période sélectionnée.")
+            return
+        # Taille après la resérialisation de st.plotly_chart, celle réellement envoyée
+        self.payload_bytes[section] = self.payload_bytes.get(section, 0) + wire_bytes(payload)
+        with PERF.time(f"plotly_chart:{section}.{figure_id}"):
+            st.plotly_chart(figure, use_container_width=True)
     
+    @timed
     def create_historical_analysis(self):
         """Crée l'analyse historique de la consommation"""
         st.markdown('<h3 class="section-header">📈 ÉVOLUTION HISTORIQUE DE LA CONSOMMATION</h3>', 
                    unsafe_allow_html=True)
         
-        tab1, tab2, tab3 = st.tabs(["Prévalence", "Consommation & Prix", "Impact Santé"])
+        self.render_tabs("historique", [
+            ("Prévalence", self._historical_prevalence_tab),
+            ("Consommation & Prix", self._historical_consumption_tab),
+            ("Impact Santé", self._historical_health_tab),
+        ])
+    
+    def _historical_prevalence_tab(self):
+        """Onglet « Prévalence »"""
+        col1, col2 = st.columns(2)
         
-        with tab1:
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                # Évolution de la prévalence
-                fig = px.line(self.historical_data, 
-                             x='annee', 
-                             y='prevalence_tabagisme',
-                             title='Évolution de la Prévalence du Tabagisme (%) - 2000-2023',
-                             markers=True)
-                fig.update_layout(yaxis_title="Prévalence (%)", xaxis_title="Année")
-                st.plotly_chart(fig, use_container_width=True)
-            
-            with col2:
-                # Fumeurs quotidiens vs occasionnels
-                fig = go.Figure()
-                fig.add_trace(go.Scatter(x=self.historical_data['annee'], 
-                                       y=self.historical_data['fumeurs_quotidiens'],
-                                       name='Fumeurs quotidiens',
-                                       line=dict(color='red')))
-                
-                occasionnels = self.historical_data['prevalence_tabagisme'] - self.historical_data['fumeurs_quotidiens']
-                fig.add_trace(go.Scatter(x=self.historical_data['annee'], 
-                                       y=occasionnels,
-                                       name='Fumeurs occasionnels',
-                                       line=dict(color='orange')))
-                
-                fig.update_layout(title='Répartition Fumeurs Quotidiens vs Occasionnels',
-                                yaxis_title="Pourcentage (%)")
-                st.plotly_chart(fig, use_container_width=True)
-        
-        with tab2:
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                # Consommation de cigarettes
-                fig = px.line(self.historical_data, 
-                             x='annee', 
-                             y='consommation_cigarettes',
-                             title='Consommation de Cigarettes (milliards) - 2000-2023',
-                             markers=True)
-                fig.update_layout(yaxis_title="Milliards de cigarettes", xaxis_title="Année")
-                st.plotly_chart(fig, use_container_width=True)
-            
-            with col2:
-                # Prix vs consommation (double axe)
-                fig = make_subplots(specs=[[{"secondary_y": True}]])
-                
-                fig.add_trace(
-                    go.Scatter(x=self.historical_data['annee'], 
-                             y=self.historical_data['prix_moyen'],
-                             name="Prix moyen (€)",
-                             line=dict(color='green')),
-                    secondary_y=False,
-                )
-                
-                fig.add_trace(
-                    go.Scatter(x=self.historical_data['annee'], 
-                             y=self.historical_data['consommation_cigarettes'],
-                             name="Consommation (milliards)",
-                             line=dict(color='red')),
-                    secondary_y=True,
-                )
-                
-                fig.update_layout(title='Relation Prix vs Consommation')
-                fig.update_yaxes(title_text="Prix moyen (€)", secondary_y=False)
-                fig.update_yaxes(title_text="Consommation (milliards)", secondary_y=True)
-                st.plotly_chart(fig, use_container_width=True)
-        
-        with tab3:
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                # Impact sur la santé
-                fig = px.line(self.health_impact_data, 
-                             x='annee', 
-                             y=['deces_tabac', 'cancers_poumon', 'maladies_cardiovasculaires'],
-                             title='Mortalité Liée au Tabac (milliers) - 2010-2023',
-                             markers=True)
-                fig.update_layout(yaxis_title="Nombre de décès (milliers)", xaxis_title="Année")
-                st.plotly_chart(fig, use_container_width=True)
-            
-            with col2:
-                # Coûts sanitaires
-                fig = px.area(self.health_impact_data, 
-                             x='annee', 
-                             y='couts_sante',
-                             title='Coûts Sanitaires Liés au Tabac (milliards €) - 2010-2023')
-                fig.update_layout(yaxis_title="Coûts (milliards €)", xaxis_title="Année")
-                st.plotly_chart(fig, use_container_width=True)
+        with col1:
+            # Évolution de la prévalence
+            self.show_figure('historique', 'prevalence', projections=self.show_projections)
+        
+        with col2:
+            # Fumeurs quotidiens vs occasionnels
+            self.show_figure('historique', 'repartition_fumeurs')
     
+    def figure_historique_prevalence(self, projections=False):
+        """Évolution de la prévalence, prolongée par la projection nationale"""
+        import plotly.express as px
+        historical_data = self.series('historical_data', ['annee', 'prevalence_tabagisme'])
+        fig = px.line(historical_data, 
+                     x='annee', 
+                     y='prevalence_tabagisme',
+                     title=f'Évolution de la Prévalence du Tabagisme (%) - {self.period_label(historical_data)}',
+                     markers=True)
+        if projections and len(historical_data):
+            fig.data[0].update(name='Observé', showlegend=True)
+            self.add_fan_traces(fig, self.projection('France'))
+        fig.update_layout(yaxis_title="Prévalence (%)", xaxis_title="Année")
+        return fig
+    
+    def figure_historique_repartition_fumeurs(self):
+        """Fumeurs quotidiens vs occasionnels"""
+        import plotly.graph_objects as go
+        historical_data = self.series('historical_data', ['annee', 'prevalence_tabagisme', 'fumeurs_quotidiens'])
+        Scatter = scatter_class(len(historical_data))
+        fig = go.Figure()
+        fig.add_trace(Scatter(x=historical_data['annee'], 
+                               y=historical_data['fumeurs_quotidiens'],
+                               name='Fumeurs quotidiens',
+                               line=dict(color='red')))
+        
+        occasionnels = historical_data['prevalence_tabagisme'] - historical_data['fumeurs_quotidiens']
+        fig.add_trace(Scatter(x=historical_data['annee'], 
+                               y=occasionnels,
+                               name='Fumeurs occasionnels',
+                               line=dict(color='orange')))
+        
+        fig.update_layout(title='Répartition Fumeurs Quotidiens vs Occasionnels',
+                        yaxis_title="Pourcentage (%)")
+        return fig
+    
+    def _historical_consumption_tab(self):
+        """Onglet « Consommation & Prix »"""
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            # Consommation de cigarettes
+            self.show_figure('historique', 'consommation')
+        
+        with col2:
+            # Prix vs consommation (double axe)
+            self.show_figure('historique', 'prix_consommation')
+    
+    def figure_historique_consommation(self):
+        """Consommation de cigarettes"""
+        import plotly.express as px
+        historical_data = self.series('historical_data', ['annee', 'consommation_cigarettes'])
+        fig = px.line(historical_data, 
+                     x='annee', 
+                     y='consommation_cigarettes',
+                     title=f'Consommation de Cigarettes (milliards) - {self.period_label(historical_data)}',
+                     markers=True)
+        fig.update_layout(yaxis_title="Milliards de cigarettes", xaxis_title="Année")
+        return fig
+    
+    def figure_historique_prix_consommation(self):
+        """Prix vs consommation (double axe)"""
+        from plotly.subplots import make_subplots
+        historical_data = self.series('historical_data', ['annee', 'prix_moyen', 'consommation_cigarettes'])
+        Scatter = scatter_class(len(historical_data))
+        fig = make_subplots(specs=[[{"secondary_y": True}]])
+        
+        fig.add_trace(
+            Scatter(x=historical_data['annee'], 
+                     y=historical_data['prix_moyen'],
+                     name="Prix moyen (€)",
+                     line=dict(color='green')),
+            secondary_y=False,
+        )
+        
+        fig.add_trace(
+            Scatter(x=historical_data['annee'], 
+                     y=historical_data['consommation_cigarettes'],
+                     name="Consommation (milliards)",
+                     line=dict(color='red')),
+            secondary_y=True,
+        )
+        
+        fig.update_layout(title='Relation Prix vs Consommation')
+        fig.update_yaxes(title_text="Prix moyen (€)", secondary_y=False)
+        fig.update_yaxes(title_text="Consommation (milliards)", secondary_y=True)
+        return fig
+    
+    def _historical_health_tab(self):
+        """Onglet « Impact Santé »"""
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            # Impact sur la santé
+            self.show_figure('historique', 'mortalite')
+        
+        with col2:
+            # Coûts sanitaires
+            self.show_figure('historique', 'couts_sante')
+    
+    def figure_historique_mortalite(self):
+        """Mortalité liée au tabac"""
+        import plotly.express as px
+        health_impact_data = self.series('health_impact_data', ['annee', 'deces_tabac', 'cancers_poumon', 'maladies_cardiovasculaires'])
+        fig = px.line(health_impact_data, 
+                     x='annee', 
+                     y=['deces_tabac', 'cancers_poumon', 'maladies_cardiovasculaires'],
+                     title=f'Mortalité Liée au Tabac (milliers) - {self.period_label(health_impact_data)}',
+                     markers=True)
+        fig.update_layout(yaxis_title="Nombre de décès (milliers)", xaxis_title="Année")
+        return fig
+    
+    def figure_historique_couts_sante(self):
+        """Coûts sanitaires"""
+        import plotly.express as px
+        health_impact_data = self.series('health_impact_data', ['annee', 'couts_sante'])
+        fig = px.area(health_impact_data, 
+                     x='annee', 
+                     y='couts_sante',
+                     title=f'Coûts Sanitaires Liés au Tabac (milliards €) - {self.period_label(health_impact_data)}')
+        fig.update_layout(yaxis_title="Coûts (milliards €)", xaxis_title="Année")
+        return fig
+    
+    @timed
     def create_policy_analysis(self):
         """Analyse des politiques anti-tabac"""
         st.markdown('<h3 class="section-header">🏛️ ANALYSE DES POLITIQUES ANTI-TABAC</h3>', 
                    unsafe_allow_html=True)
         
-        tab1, tab2, tab3 = st.tabs(["Timeline des Politiques", "Impact des Mesures", "Efficacité Comparée"])
+        self.render_tabs("politiques", [
+            ("Timeline des Politiques", self._policy_timeline_tab),
+            ("Impact des Mesures", self._policy_impact_tab),
+            ("Efficacité Comparée", self._policy_efficiency_tab),
+        ])
+    
+    def _policy_timeline_tab(self):
+        """Onglet « Timeline des Politiques »"""
+        # Timeline interactive des politiques
+        self.show_figure('politiques', 'timeline')
         
-        with tab1:
-            # Timeline interactive des politiques
-            policy_df = pd.DataFrame(self.policy_timeline)
-            policy_df['date'] = pd.to_datetime(policy_df['date'])
-            policy_df['annee'] = policy_df['date'].dt.year
-            
-            # Fusion avec données historiques
-            merged_data = pd.merge(self.historical_data, policy_df, on='annee', how='left')
-            
-            fig = px.scatter(merged_data, 
-                           x='annee', 
-                           y='prevalence_tabagisme',
-                           color='type',
-                           size_max=20,
-                           hover_name='titre',
-                           hover_data={'description': True, 'type': True},
-                           title='Impact des Politiques sur la Prévalence du Tabagisme')
-            
-            # Ajouter la ligne de tendance
-            fig.add_trace(go.Scatter(x=self.historical_data['annee'], 
-                                   y=self.historical_data['prevalence_tabagisme'],
-                                   mode='lines',
-                                   name='Prévalence tabagisme',
-                                   line=dict(color='gray', width=2)))
-            
-            fig.update_layout(showlegend=True)
-            st.plotly_chart(fig, use_container_width=True)
-            
-            # Légende des types de politiques
-            col1, col2, col3, col4 = st.columns(4)
-            with col1:
-                st.markdown('<div class="policy-card policy-prevention">Prévention</div>', unsafe_allow_html=True)
-            with col2:
-                st.markdown('<div class="policy-card policy-tax">Fiscalité</div>', unsafe_allow_html=True)
-            with col3:
-                st.markdown('<div class="policy-card policy-regulation">Réglementation</div>', unsafe_allow_html=True)
-            with col4:
-                st.markdown('<div class="policy-card policy-ban">Interdiction</div>', unsafe_allow_html=True)
+        # Légende des types de politiques
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.markdown('<div class="policy-card policy-prevention">Prévention</div>', unsafe_allow_html=True)
+        with col2:
+            st.markdown('<div class="policy-card policy-tax">Fiscalité</div>', unsafe_allow_html=True)
+        with col3:
+            st.markdown('<div class="policy-card policy-regulation">Réglementation</div>', unsafe_allow_html=True)
+        with col4:
+            st.markdown('<div class="policy-card policy-ban">Interdiction</div>', unsafe_allow_html=True)
+    
+    def figure_politiques_timeline(self):
+        """Timeline interactive des politiques"""
+        import plotly.express as px
+        historical_data = self.dataset('historical_data', ['annee', 'prevalence_tabagisme'])
         
-        with tab2:
-            # Analyse d'impact des politiques majeures
-            st.subheader("Impact des Politiques Clés")
-            
-            impact_analysis = [
-                {'politique': 'Loi Évin (1991)', 'impact_prevalence': -3.2, 'delai_impact': 2},
-                {'politique': 'Interdiction lieux publics (2007)', 'impact_prevalence': -2.8, 'delai_impact': 1},
-                {'politique': 'Paquet neutre (2016)', 'impact_prevalence': -1.5, 'delai_impact': 2},
-                {'politique': 'Hausse prix 2018-2023', 'impact_prevalence': -4.2, 'delai_impact': 3},
-                {'politique': 'Remboursement substituts (2020)', 'impact_prevalence': -0.8, 'delai_impact': 1},
-            ]
-            
-            impact_df = pd.DataFrame(impact_analysis)
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                fig = px.bar(impact_df, 
-                            x='politique', 
-                            y='impact_prevalence',
-                            title='Impact sur la Prévalence Tabagique (points de %)',
-                            color='impact_prevalence',
-                            color_continuous_scale='RdYlGn')
-                fig.update_layout(xaxis_tickangle=45)
-                st.plotly_chart(fig, use_container_width=True)
-            
-            with col2:
-                # CORRECTION : Utiliser la valeur absolue pour la taille
-                impact_df['impact_absolu'] = impact_df['impact_prevalence'].abs()
-                
-                fig = px.scatter(impact_df, 
-                               x='delai_impact', 
-                               y='impact_prevalence',
-                               size='impact_absolu',  # Utiliser les valeurs absolues
-                               color='politique',
-                               hover_name='politique',
-                               title='Délai vs Amplitude des Impacts',
-                               size_max=30)
-                st.plotly_chart(fig, use_container_width=True)
-        
-        with tab3:
-            # Efficacité comparée des politiques
-            st.subheader("Efficacité des Différentes Stratégies")
-            
-            strategies = [
-                {'strategie': 'Augmentation des prix', 'efficacite': 9.2, 'cout': 2, 'acceptabilite': 5},
-                {'strategie': 'Interdiction publicité', 'efficacite': 7.8, 'cout': 1, 'acceptabilite': 8},
-                {'strategie': 'Paquet neutre', 'efficacite': 6.5, 'cout': 1, 'acceptabilite': 6},
-                {'strategie': 'Interdiction lieux publics', 'efficacite': 8.4, 'cout': 3, 'acceptabilite': 7},
-                {'strategie': 'Campagnes prévention', 'efficacite': 6.2, 'cout': 4, 'acceptabilite': 9},
-                {'strategie': 'Aides au sevrage', 'efficacite': 7.1, 'cout': 5, 'acceptabilite': 9},
-            ]
-            
-            strategy_df = pd.DataFrame(strategies)
+        # Fusion avec données historiques (politiques entrées en vigueur chaque année)
+        merged_data = self.datasets.policy_index().merge(historical_data, on='annee', granularity='year')
+        
+        fig = px.scatter(merged_data, 
+                       x='annee', 
+                       y='prevalence_tabagisme',
+                       color='type',
+                       size_max=20,
+                       hover_name='titre',
+                       hover_data={'description': True, 'type': True},
+                       title='Impact des Politiques sur la Prévalence du Tabagisme')
+        
+        # Ajouter la ligne de tendance
+        trend = self.series('historical_data', ['annee', 'prevalence_tabagisme'])
+        fig.add_trace(scatter_class(len(trend))(x=trend['annee'], 
+                               y=trend['prevalence_tabagisme'],
+                               mode='lines',
+                               name='Prévalence tabagisme',
+                               line=dict(color='gray', width=2)))
+        
+        fig.update_layout(showlegend=True)
+        return fig
+    
+    def _policy_impact_tab(self):
+        """Onglet « Impact des Mesures »"""
+        # Analyse d'impact des politiques majeures
+        st.subheader("Impact des Politiques Clés")
+        
+        impacts = self.policy_impacts()
+        if impacts is None:
+            # Estimation en cours dans un thread d'arrière-plan : la page reste réactive
+            @st.fragment(run_every=1)
+            def poll_impacts():
+                if self.policy_impacts() is not None:
+                    st.rerun()
+                st.info("⏳ Estimation des impacts en cours…")
             
-            fig = px.scatter(strategy_df, 
-                           x='cout', 
-                           y='efficacite',
-                           size='acceptabilite',
-                           color='strategie',
-                           hover_name='strategie',
-                           title='Efficacité vs Coût des Stratégies',
-                           size_max=30)
-            st.plotly_chart(fig, use_container_width=True)
+            poll_impacts()
+            return
+        
+        series = impacts['serie'].unique().tolist()
+        serie = 'France'
+        if len(series) > 1:
+            serie = st.selectbox("Série", series, key="impact_serie")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            self.show_figure('politiques', 'impact_prevalence', serie=serie)
+        
+        with col2:
+            self.show_figure('politiques', 'delai_impact', serie=serie)
+        
+        st.caption(
+            f"Régression segmentée sur ±{FENETRE} ans autour de chaque mesure ; impact = écart à la "
+            f"tendance antérieure {HORIZON} ans après la rupture, IC 95% par bootstrap des résidus."
+        )
+    
+    def policy_impacts(self, wait=False):
+        """Impacts estimés de chaque politique sur chaque série (une fois par version des données)
+        
+        Retourne None tant que l'estimation tourne, sauf avec wait=True.
+        """
+        return self.datasets.derived_async('impacts_politiques', self._estimate_policy_impacts,
+                                           get_analysis_executor(), wait=wait)
+    
+    def _estimate_policy_impacts(self):
+        national = self.datasets.frame('historical_data', ['annee', 'prevalence_tabagisme'])
+        series = [pd.DataFrame({'serie': 'France', 'annee': national['annee'],
+                                'prevalence': national['prevalence_tabagisme']})]
+        if self.datasets.loader.available('regional_series'):
+            regional = self.datasets.frame('regional_series', ['region', 'annee', 'prevalence'])
+            series.append(regional.rename(columns={'region': 'serie'}))
+        return estimate_policy_impacts(pd.concat(series, ignore_index=True),
+                                       self.datasets.frame('policy_timeline'))
+    
+    def _policy_impact_frame(self, serie):
+        """Impacts estimés d'une série, avec libellé et bornes de l'intervalle de confiance"""
+        impacts = self.policy_impacts(wait=True)
+        impact_df = impacts[impacts['serie'] == serie]
+        return impact_df.assign(
+            politique=impact_df['politique'] + ' (' + impact_df['annee'].astype(str) + ')',
+            erreur_haut=impact_df['ic_haut'] - impact_df['impact_prevalence'],
+            erreur_bas=impact_df['impact_prevalence'] - impact_df['ic_bas'],
+        )
+    
+    def figure_politiques_impact_prevalence(self, serie='France'):
+        """Impact des politiques sur la prévalence"""
+        import plotly.express as px
+        impact_df = self._policy_impact_frame(serie)
+        fig = px.bar(impact_df, 
+                    x='politique', 
+                    y='impact_prevalence',
+                    error_y='erreur_haut',
+                    error_y_minus='erreur_bas',
+                    title=f'Impact estimé à {HORIZON} ans sur la Prévalence (points de %, IC 95%) - {serie}',
+                    color='impact_prevalence',
+                    color_continuous_scale='RdYlGn_r')
+        fig.update_layout(xaxis_tickangle=45)
+        return fig
+    
+    def figure_politiques_delai_impact(self, serie='France'):
+        """Délai vs amplitude des impacts"""
+        import plotly.express as px
+        impact_df = self._policy_impact_frame(serie)
+        
+        # CORRECTION : Utiliser la valeur absolue pour la taille
+        impact_df['impact_absolu'] = impact_df['impact_prevalence'].abs()
+        
+        fig = px.scatter(impact_df, 
+                       x='delai_impact', 
+                       y='impact_prevalence',
+                       size='impact_absolu',  # Utiliser les valeurs absolues
+                       color='politique',
+                       hover_name='politique',
+                       hover_data={'ic_bas': ':.2f', 'ic_haut': ':.2f'},
+                       title=f'Délai vs Amplitude des Impacts - {serie}',
+                       size_max=30)
+        fig.update_layout(xaxis_title="Délai avant rupture (années)")
+        return fig
+    
+    def _policy_efficiency_tab(self):
+        """Onglet « Efficacité Comparée »"""
+        # Efficacité comparée des politiques
+        st.subheader("Efficacité des Différentes Stratégies")
+        
+        self.show_figure('politiques', 'efficacite')
     
+    def figure_politiques_efficacite(self):
+        """Efficacité comparée des stratégies"""
+        import plotly.express as px
+        strategies = [
+            {'strategie': 'Augmentation des prix', 'efficacite': 9.2, 'cout': 2, 'acceptabilite': 5},
+            {'strategie': 'Interdiction publicité', 'efficacite': 7.8, 'cout': 1, 'acceptabilite': 8},
+            {'strategie': 'Paquet neutre', 'efficacite': 6.5, 'cout': 1, 'acceptabilite': 6},
+            {'strategie': 'Interdiction lieux publics', 'efficacite': 8.4, 'cout': 3, 'acceptabilite': 7},
+            {'strategie': 'Campagnes prévention', 'efficacite': 6.2, 'cout': 4, 'acceptabilite': 9},
+            {'strategie': 'Aides au sevrage', 'efficacite': 7.1, 'cout': 5, 'acceptabilite': 9},
+        ]
+        
+        strategy_df = pd.DataFrame(strategies)
+        
+        fig = px.scatter(strategy_df, 
+                       x='cout', 
+                       y='efficacite',
+                       size='acceptabilite',
+                       color='strategie',
+                       hover_name='strategie',
+                       title='Efficacité vs Coût des Stratégies',
+                       size_max=30)
+        return fig
+    
+    @timed
     def create_regional_analysis(self):
         """Analyse des disparités régionales"""
         st.markdown('<h3 class="section-header">🗺️ ANALYSE RÉGIONALE ET DÉMOGRAPHIQUE</h3>', 
                    unsafe_allow_html=True)
         
-        tab1, tab2, tab3 = st.tabs(["Cartographie", "Disparités Régionales", "Analyse Démographique"])
+        self.render_tabs("regional", [
+            ("Cartographie", self._regional_map_tab),
+            ("Disparités Régionales", self._regional_disparities_tab),
+            ("Analyse Démographique", self._regional_demographics_tab),
+        ])
+    
+    def _regional_map_tab(self):
+        """Onglet « Cartographie »"""
+        level = st.radio("Niveau géographique", list(MAP_LEVEL_LABELS),
+                         format_func=MAP_LEVEL_LABELS.get, horizontal=True, key="niveau_carte")
+        st.subheader(f"Prévalence du Tabagisme par {MAP_LEVEL_LABELS[level][:-1]}")
         
-        with tab1:
-            # CORRECTION : Remplacer la carte choroplèthe par une carte scatter_geo
-            st.subheader("Prévalence du Tabagisme par Région")
-            
-            # Ajouter des coordonnées approximatives pour chaque région
-            regional_coords = {
-                'Île-de-France': {'lat': 48.8566, 'lon': 2.3522},
-                'Auvergne-Rhône-Alpes': {'lat': 45.75, 'lon': 4.85},
-                'Nouvelle-Aquitaine': {'lat': 44.8378, 'lon': -0.5792},
-                'Occitanie': {'lat': 43.6, 'lon': 1.4333},
-                'Hauts-de-France': {'lat': 50.6292, 'lon': 3.0573},
-                'Provence-Alpes-Côte d\'Azur': {'lat': 43.3, 'lon': 5.37},
-                'Pays de la Loire': {'lat': 47.2181, 'lon': -1.5528},
-                'Bretagne': {'lat': 48.1173, 'lon': -1.6778},
-                'Normandie': {'lat': 49.18, 'lon': -0.37},
-                'Grand Est': {'lat': 48.5734, 'lon': 7.7521},
-                'Bourgogne-Franche-Comté': {'lat': 47.24, 'lon': 6.02},
-                'Centre-Val de Loire': {'lat': 47.9, 'lon': 1.9},
-                'Corse': {'lat': 42.15, 'lon': 9.08}
-            }
-            
-            # Créer un DataFrame avec les coordonnées
-            coords_df = pd.DataFrame.from_dict(regional_coords, orient='index').reset_index()
-            coords_df.columns = ['region', 'lat', 'lon']
-            
-            # Fusionner avec les données régionales
-            regional_with_coords = pd.merge(self.regional_data, coords_df, on='region')
-            
-            # Créer une carte scatter_geo
-            fig = px.scatter_geo(regional_with_coords,
-                                lat='lat',
-                                lon='lon',
-                                color='prevalence_2023',
-                                size='prevalence_2023',
-                                hover_name='region',
-                                hover_data={'prevalence_2023': True, 'evolution_2010_2023': True},
-                                title='Prévalence du Tabagisme par Région - 2023',
-                                color_continuous_scale='RdYlGn_r')
-            
-            # Ajuster la vue sur la France
-            fig.update_geos(
-                visible=False,
-                resolution=50,
-                scope='europe',
-                showcountries=True,
-                countrycolor="Black",
-                showsubunits=True,
-                subunitcolor="Blue",
-                lonaxis_range=[-5, 10],
-                lataxis_range=[40, 52]
-            )
-            
-            fig.update_layout(
-                geo=dict(
-                    bgcolor='rgba(0,0,0,0)',
-                    lakecolor='#0E1117',
-                    landcolor='#0E1117'
-                )
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
+        # Choroplèthe à partir des contours pré-simplifiés (simple lecture du cache)
+        geometry_path = cached_level_path(level)
+        if geometry_path and self.datasets.loader.available(MAP_LEVEL_DATASETS[level]):
+            self.show_figure('regional', 'choroplethe', niveau=level,
+                             geometrie=(geometry_path, os.path.getmtime(geometry_path)))
+        elif level == 'region':
+            # Sans contours préparés : carte scatter_geo sur les chefs-lieux
+            self.show_figure('regional', 'carte')
+            st.caption("Contours non préparés : lancer `python geometry_pipeline.py` pour la choroplèthe.")
+        else:
+            st.info(f"Contours ou données indisponibles pour le niveau « {MAP_LEVEL_LABELS[level]} ».")
+    
+    def figure_regional_choroplethe(self, niveau, geometrie):
+        """Choroplèthe de la prévalence au niveau géographique choisi"""
+        import plotly.express as px
+        geojson = load_level_geometry(*geometrie)
+        id_property = MAP_LEVELS[niveau]['id_property']
         
-        with tab2:
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                # Classement des régions
-                fig = px.bar(self.regional_data.sort_values('prevalence_2023'), 
-                            x='prevalence_2023', 
-                            y='region',
-                            orientation='h',
-                            title='Prévalence du Tabagisme par Région - 2023',
+        if niveau == 'region':
+            data = self.dataset('regional_data', ['region', 'prevalence_2023', 'evolution_2010_2023'])
+            data = data.rename(columns={'region': 'nom', 'prevalence_2023': 'prevalence'})
+            hover_data = {'evolution_2010_2023': True}
+        else:
+            data = self.dataset(MAP_LEVEL_DATASETS[niveau], ['code', 'nom', 'prevalence'])
+            hover_data = {'code': True}
+        
+        fig = px.choropleth(data,
+                            geojson=geojson,
+                            locations=id_property,
+                            featureidkey=f"properties.{id_property}",
+                            color='prevalence',
+                            hover_name='nom',
+                            hover_data=hover_data,
+                            title=f'Prévalence du Tabagisme par {MAP_LEVEL_LABELS[niveau][:-1]}',
+                            color_continuous_scale='RdYlGn_r')
+        fig.update_geos(fitbounds="locations", visible=False)
+        fig.update_layout(margin=dict(l=0, r=0, t=50, b=0))
+        return fig
+    
+    def figure_regional_carte(self):
+        """Carte de la prévalence par région"""
+        import plotly.express as px
+        regional_data = self.dataset('regional_data', ['region', 'prevalence_2023', 'evolution_2010_2023'])
+        # Ajouter des coordonnées approximatives pour chaque région
+        regional_coords = {
+            'Île-de-France': {'lat': 48.8566, 'lon': 2.3522},
+            'Auvergne-Rhône-Alpes': {'lat': 45.75, 'lon': 4.85},
+            'Nouvelle-Aquitaine': {'lat': 44.8378, 'lon': -0.5792},
+            'Occitanie': {'lat': 43.6, 'lon': 1.4333},
+            'Hauts-de-France': {'lat': 50.6292, 'lon': 3.0573},
+            'Provence-Alpes-Côte d\'Azur': {'lat': 43.3, 'lon': 5.37},
+            'Pays de la Loire': {'lat': 47.2181, 'lon': -1.5528},
+            'Bretagne': {'lat': 48.1173, 'lon': -1.6778},
+            'Normandie': {'lat': 49.18, 'lon': -0.37},
+            'Grand Est': {'lat': 48.5734, 'lon': 7.7521},
+            'Bourgogne-Franche-Comté': {'lat': 47.24, 'lon': 6.02},
+            'Centre-Val de Loire': {'lat': 47.9, 'lon': 1.9},
+            'Corse': {'lat': 42.15, 'lon': 9.08}
+        }
+        
+        # Créer un DataFrame avec les coordonnées
+        coords_df = pd.DataFrame.from_dict(regional_coords, orient='index').reset_index()
+        coords_df.columns = ['region', 'lat', 'lon']
+        
+        # Fusionner avec les données régionales (une fois par version, partagé entre sessions)
+        regional_with_coords = self.datasets.derived('regions_coordonnees',
+                                                     lambda: pd.merge(regional_data, coords_df, on='region'))
+        
+        # Créer une carte scatter_geo
+        fig = px.scatter_geo(regional_with_coords,
+                            lat='lat',
+                            lon='lon',
                             color='prevalence_2023',
+                            size='prevalence_2023',
+                            hover_name='region',
+                            hover_data={'prevalence_2023': True, 'evolution_2010_2023': True},
+                            title='Prévalence du Tabagisme par Région - 2023',
                             color_continuous_scale='RdYlGn_r')
-                st.plotly_chart(fig, use_container_width=True)
-            
-            with col2:
-                # Évolution régionale
-                fig = px.bar(self.regional_data.sort_values('evolution_2010_2023'), 
-                            x='evolution_2010_2023', 
-                            y='region',
-                            orientation='h',
-                            title='Évolution de la Prévalence 2010-2023 (points de %)',
-                            color='evolution_2010_2023',
-                            color_continuous_scale='RdYlGn')
-                st.plotly_chart(fig, use_container_width=True)
-        
-        with tab3:
-            # Analyse par catégories socio-démographiques
-            st.subheader("Profil des Fumeurs")
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.markdown("""
-                ### 👥 Par Catégorie Socio-professionnelle
-                
-                **Taux les plus élevés:**
-                • Ouvriers: 28.5%  
-                • Employés: 24.2%  
-                • Chômeurs: 32.1%  
-                
-                **Taux les plus bas:**
-                • Cadres: 15.8%  
-                • Professions intermédiaires: 18.9%  
-                • Retraités: 12.4%  
-                """)
-            
-            with col2:
-                st.markdown("""
-                ### 🎂 Par Tranche d'Âge
-                
-                **15-24 ans:** 21.8%  
-                **25-34 ans:** 26.4%  
-                **35-44 ans:** 23.9%  
-                **45-54 ans:** 21.2%  
-                **55-64 ans:** 16.7%  
-                **65+ ans:** 8.9%  
-                
-                **Âge moyen d'initiation:** 14.2 ans
-                """)
+        
+        # Ajuster la vue sur la France
+        fig.update_geos(
+            visible=False,
+            resolution=50,
+            scope='europe',
+            showcountries=True,
+            countrycolor="Black",
+            showsubunits=True,
+            subunitcolor="Blue",
+            lonaxis_range=[-5, 10],
+            lataxis_range=[40, 52]
+        )
+        
+        fig.update_layout(
+            geo=dict(
+                bgcolor='rgba(0,0,0,0)',
+                lakecolor='#0E1117',
+                landcolor='#0E1117'
+            )
+        )
+        return fig
+    
+    def _regional_disparities_tab(self):
+        """Onglet « Disparités Régionales »"""
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            # Classement des régions
+            self.show_figure('regional', 'classement')
+        
+        with col2:
+            # Évolution régionale
+            self.show_figure('regional', 'evolution')
     
+    def figure_regional_classement(self):
+        """Classement des régions"""
+        import plotly.express as px
+        regional_data = self.datasets.sorted_frame('regional_data', 'prevalence_2023', ['region', 'prevalence_2023'])
+        fig = px.bar(regional_data, 
+                    x='prevalence_2023', 
+                    y='region',
+                    orientation='h',
+                    title='Prévalence du Tabagisme par Région - 2023',
+                    color='prevalence_2023',
+                    color_continuous_scale='RdYlGn_r')
+        return fig
+    
+    def figure_regional_evolution(self):
+        """Évolution régionale"""
+        import plotly.express as px
+        regional_data = self.datasets.sorted_frame('regional_data', 'evolution_2010_2023',
+                                                   ['region', 'evolution_2010_2023'])
+        fig = px.bar(regional_data, 
+                    x='evolution_2010_2023', 
+                    y='region',
+                    orientation='h',
+                    title='Évolution de la Prévalence 2010-2023 (points de %)',
+                    color='evolution_2010_2023',
+                    color_continuous_scale='RdYlGn')
+        return fig
+    
+    def _regional_demographics_tab(self):
+        """Onglet « Analyse Démographique »"""
+        # Analyse par catégories socio-démographiques
+        st.subheader("Profil des Fumeurs")
+        
+        self.show_text(narrative.DEMOGRAPHICS)
+    
+    @timed
     def create_international_comparison(self):
         """Analyse comparative internationale"""
         st.markdown('<h3 class="section-header">🌍 COMPARAISON INTERNATIONALE</h3>', 
                    unsafe_allow_html=True)
         
-        tab1, tab2, tab3 = st.tabs(["Prévalence", "Politiques", "Performances"])
+        self.render_tabs("international", [
+            ("Prévalence", self._international_prevalence_tab),
+            ("Politiques", self._international_policies_tab),
+            ("Performances", self._international_performance_tab),
+        ])
+    
+    def _international_prevalence_tab(self):
+        """Onglet « Prévalence »"""
+        col1, col2 = st.columns(2)
         
-        with tab1:
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                # Prévalence comparée
-                fig = px.bar(self.international_comparison.sort_values('prevalence_tabagisme'), 
-                            x='pays', 
-                            y='prevalence_tabagisme',
-                            title='Prévalence du Tabagisme - Comparaison Internationale',
-                            color='prevalence_tabagisme',
-                            color_continuous_scale='RdYlGn_r')
-                st.plotly_chart(fig, use_container_width=True)
-            
-            with col2:
-                # Prix vs prévalence
-                fig = px.scatter(self.international_comparison, 
-                               x='prix_paquet_eur', 
-                               y='prevalence_tabagisme',
-                               size='mortalite_liee_tabac',
-                               color='pays',
-                               hover_name='pays',
-                               title='Relation Prix vs Prévalence',
-                               size_max=30)
-                st.plotly_chart(fig, use_container_width=True)
-        
-        with tab2:
-            # Comparaison des politiques
-            st.subheader("Stratégies Nationales de Lutte Anti-Tabac")
-            
-            policy_comparison = [
-                {'pays': 'France', 'paquet_neutre': 1, 'interdiction_pub': 1, 'prix_eleve': 1, 'remboursement_aides': 1},
-                {'pays': 'Australie', 'paquet_neutre': 1, 'interdiction_pub': 1, 'prix_eleve': 1, 'remboursement_aides': 1},
-                {'pays': 'Royaume-Uni', 'paquet_neutre': 1, 'interdiction_pub': 1, 'prix_eleve': 1, 'remboursement_aides': 1},
-                {'pays': 'Allemagne', 'paquet_neutre': 0, 'interdiction_pub': 0, 'prix_eleve': 0, 'remboursement_aides': 0},
-                {'pays': 'États-Unis', 'paquet_neutre': 0, 'interdiction_pub': 0, 'prix_eleve': 0, 'remboursement_aides': 0},
-            ]
-            
-            policy_df = pd.DataFrame(policy_comparison)
-            
-            fig = px.imshow(policy_df.set_index('pays'),
-                          title='Comparaison des Politiques Anti-Tabac',
-                          color_continuous_scale='RdYlGn')
-            st.plotly_chart(fig, use_container_width=True)
-        
-        with tab3:
-            # Performance des stratégies
-            st.subheader("Performance des Stratégies Nationales")
-            
-            performance_data = [
-                {'pays': 'Australie', 'reduction_10ans': -8.2, 'investissement_prevention': 2.1, 'classement': 1},
-                {'pays': 'Royaume-Uni', 'reduction_10ans': -6.9, 'investissement_prevention': 1.2, 'classement': 2},
-                {'pays': 'France', 'reduction_10ans': -5.8, 'investissement_prevention': 0.8, 'classement': 3},
-                {'pays': 'Canada', 'reduction_10ans': -5.2, 'investissement_prevention': 1.5, 'classement': 4},
-                {'pays': 'États-Unis', 'reduction_10ans': -3.1, 'investissement_prevention': 1.5, 'classement': 5},
-                {'pays': 'Allemagne', 'reduction_10ans': -2.8, 'investissement_prevention': 0.5, 'classement': 6},
-            ]
-            
-            perf_df = pd.DataFrame(performance_data)
-            
-            # CORRECTION : Utiliser une colonne positive pour la taille
-            perf_df['reduction_absolue'] = perf_df['reduction_10ans'].abs()
-            
-            fig = px.scatter(perf_df, 
-                           x='investissement_prevention', 
-                           y='reduction_10ans',
-                           size='reduction_absolue',  # Utiliser les valeurs absolues
-                           color='pays',
-                           hover_name='pays',
-                           title='Investissement vs Réduction de la Prévalence',
-                           size_max=30)
-            st.plotly_chart(fig, use_container_width=True)
+        with col1:
+            # Prévalence comparée
+            self.show_figure('international', 'prevalence')
+        
+        with col2:
+            # Prix vs prévalence
+            self.show_figure('international', 'prix_prevalence')
+    
+    def figure_international_prevalence(self):
+        """Prévalence comparée"""
+        import plotly.express as px
+        panel = self.datasets.international_panel()
+        year = self.end_year(panel.last_year)
+        ranking = panel.year_table('prevalence_tabagisme', year)
+        ranking['donnees'] = np.where(ranking['pays'].map(panel.interpolated(year)).fillna(False).astype(bool),
+                                      'interpolées', 'observées')
+        fig = px.bar(ranking, 
+                    x='pays', 
+                    y='prevalence_tabagisme',
+                    title=f'Prévalence du Tabagisme - Comparaison Internationale ({year})',
+                    color='prevalence_tabagisme',
+                    hover_data=['classement', 'centile', VARIATION, 'donnees'],
+                    color_continuous_scale='RdYlGn_r')
+        return fig
+    
+    def figure_international_prix_prevalence(self):
+        """Prix vs prévalence"""
+        import plotly.express as px
+        international_comparison = self.dataset('international_comparison', ['pays', 'prix_paquet_eur', 'prevalence_tabagisme', 'mortalite_liee_tabac'])
+        fig = px.scatter(international_comparison, 
+                       x='prix_paquet_eur', 
+                       y='prevalence_tabagisme',
+                       size='mortalite_liee_tabac',
+                       color='pays',
+                       hover_name='pays',
+                       title='Relation Prix vs Prévalence',
+                       size_max=30)
+        return fig
+    
+    def _international_policies_tab(self):
+        """Onglet « Politiques »"""
+        # Comparaison des politiques
+        st.subheader("Stratégies Nationales de Lutte Anti-Tabac")
+        
+        self.show_figure('international', 'politiques')
+    
+    def figure_international_politiques(self):
+        """Comparaison des politiques nationales"""
+        import plotly.express as px
+        policy_comparison = [
+            {'pays': 'France', 'paquet_neutre': 1, 'interdiction_pub': 1, 'prix_eleve': 1, 'remboursement_aides': 1},
+            {'pays': 'Australie', 'paquet_neutre': 1, 'interdiction_pub': 1, 'prix_eleve': 1, 'remboursement_aides': 1},
+            {'pays': 'Royaume-Uni', 'paquet_neutre': 1, 'interdiction_pub': 1, 'prix_eleve': 1, 'remboursement_aides': 1},
+            {'pays': 'Allemagne', 'paquet_neutre': 0, 'interdiction_pub': 0, 'prix_eleve': 0, 'remboursement_aides': 0},
+            {'pays': 'États-Unis', 'paquet_neutre': 0, 'interdiction_pub': 0, 'prix_eleve': 0, 'remboursement_aides': 0},
+        ]
+        
+        policy_df = pd.DataFrame(policy_comparison)
+        
+        fig = px.imshow(policy_df.set_index('pays'),
+                      title='Comparaison des Politiques Anti-Tabac',
+                      color_continuous_scale='RdYlGn')
+        return fig
+    
+    def _international_performance_tab(self):
+        """Onglet « Performances »"""
+        # Performance des stratégies
+        st.subheader("Performance des Stratégies Nationales")
+        
+        self.show_figure('international', 'performances')
+    
+    def figure_international_performances(self):
+        """Performance des stratégies nationales"""
+        import plotly.express as px
+        panel = self.datasets.international_panel()
+        year = self.end_year(panel.last_year)
+        perf_df = panel.year_table('prevalence_tabagisme', year).dropna(subset=[VARIATION])
+        perf_df['investissement_prevention'] = perf_df['pays'].map(panel.latest('depenses_prevention', year))
+        perf_df = perf_df.dropna(subset=['investissement_prevention']).sort_values('classement_variation')
+        
+        # CORRECTION : Utiliser une colonne positive pour la taille
+        perf_df['reduction_absolue'] = perf_df[VARIATION].abs()
+        # Variation dont l'une des deux bornes est interpolée
+        interpolated = panel.interpolated(year) | panel.interpolated(year - VARIATION_YEARS)
+        perf_df['donnees'] = np.where(perf_df['pays'].map(interpolated).fillna(False).astype(bool),
+                                      'interpolées', 'observées')
+        
+        fig = px.scatter(perf_df, 
+                       x='investissement_prevention', 
+                       y=VARIATION,
+                       size='reduction_absolue',  # Utiliser les valeurs absolues
+                       color='centile_variation',  # une seule trace, quel que soit le nombre de pays
+                       color_continuous_scale='RdYlGn',
+                       hover_name='pays',
+                       hover_data=['classement_variation', 'donnees'],
+                       title=f'Investissement vs Réduction de la Prévalence ({year - VARIATION_YEARS}-{year})',
+                       size_max=30)
+        if perf_df.empty:
+            fig.add_annotation(text=f"Pas de série de {VARIATION_YEARS} ans avec dépenses de prévention en {year}",
+                               showarrow=False, xref='paper', yref='paper', x=0.5, y=0.5)
+        return fig
     
+    @timed
     def create_strategic_recommendations(self):
         """Recommandations stratégiques"""
         st.markdown('<h3 class="section-header">🎯 RECOMMANDATIONS STRATÉGIQUES</h3>', 
                    unsafe_allow_html=True)
         
-        tab1, tab2, tab3 = st.tabs(["Objectifs 2030", "Stratégies Prioritaires", "Feuille de Route"])
+        self.render_tabs("strategies", [
+            ("Objectifs 2030", self._strategy_objectives_tab),
+            ("Stratégies Prioritaires", self._strategy_priorities_tab),
+            ("Feuille de Route", self._strategy_roadmap_tab),
+            ("Simulateur de Prix", self._strategy_simulator_tab),
+        ])
+    
+    def _strategy_objectives_tab(self):
+        """Onglet « Objectifs 2030 »"""
+        st.subheader("Objectifs Nationaux 2030")
         
-        with tab1:
-            st.subheader("Objectifs Nationaux 2030")
-            
+        self.show_text(narrative.OBJECTIVES)
+    
+    def _strategy_priorities_tab(self):
+        """Onglet « Stratégies Prioritaires »"""
+        st.subheader("Stratégies Prioritaires")
+        
+        self.show_text(narrative.PRIORITIES)
+    
+    def _strategy_roadmap_tab(self):
+        """Onglet « Feuille de Route »"""
+        st.subheader("Feuille de Route Détaillée")
+        
+        for step in narrative.ROADMAP:
+            with st.expander(f"📅 {step['periode']}"):
+                for action in step['actions']:
+                    st.write(f"• {action}")
+        
+        # Graphique de projection
+        if not self.show_projections:
+            st.caption("Projections masquées (option « Afficher les projections » de la sidebar).")
+            return
+        
+        territoires = ['France'] + self.datasets.frame('regional_data', ['region'])['region'].tolist()
+        serie = st.selectbox("Territoire projeté", territoires, key="projection_territoire")
+        self.show_figure('strategies', 'projection', serie=serie)
+        
+        projection = self.projection(serie)
+        if len(projection):
+            final = projection.iloc[-1]
+            st.caption(
+                f"Médiane {int(final['annee'])} : {final['q50']:.1f}% "
+                f"(90% des trajectoires entre {final['q05']:.1f}% et {final['q95']:.1f}%) · "
+                f"probabilité d'atteindre l'objectif de {OBJECTIF:.0f}% : {final['p_objectif']:.0%}"
+            )
+    
+    def _strategy_simulator_tab(self):
+        """Onglet « Simulateur de Prix » : un réglage des curseurs ne relance que ce fragment"""
+        surface = self.price_scenarios()
+        model = surface.model
+        
+        @st.fragment
+        def simulator():
             col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                st.markdown("""
-                ### 🎯 Objectif Principal
-                
-                **Génération sans tabac d'ici 2030**
-                
-                • Prévalence < 5%  
-                • 200 000 fumeurs en moins par an  
-                • Prévention dès le plus jeune âge  
-                """)
-            
-            with col2:
-                st.markdown("""
-                ### 📊 Cibles Intermédiaires
-                
-                **2025:**
-                • Prévalence < 15%  
-                • Paquet à 13€  
-                • 100% de couverture des aides  
-                
-                **2027:**
-                • Prévalence < 10%  
-                • Paquet à 15€  
-                • Espace sans tabac généralisé  
-                """)
-            
+            bounds = [(float(axis[0]), float(axis[-1])) for axis in surface.target_prices]
+            prices = []
+            for column, year, (low, high), default in zip((col1, col2), TARGET_YEARS, bounds, (13.0, 15.0)):
+                with column:
+                    if low == high:
+                        # Année cible déjà observée : pas de curseur, le prix est celui des données
+                        st.metric(f"Prix du paquet en {model['annee']} (dernier observé)", f"{low:.2f} €")
+                        st.caption(f"{year} est déjà dans les données : la simulation part de {model['annee']}.")
+                        st.session_state[f"scenario_prix_{year}"] = low
+                        prices.append(low)
+                    else:
+                        prices.append(st.slider(f"Prix du paquet en {year} (€)", low, high,
+                                                value=min(max(default, low), high), step=0.1,
+                                                key=f"scenario_prix_{year}"))
+            prix_2025, prix_2027 = prices
             with col3:
-                st.markdown("""
-                ### 📈 Indicateurs de Suivi
-                
-                • Prévalence mensuelle  
-                • Ventes de tabac  
-                • Utilisation des aides  
-                • Exposition des jeunes  
-                • Inégalités sociales  
-                """)
-        
-        with tab2:
-            st.subheader("Stratégies Prioritaires")
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.markdown("""
-                ### 🚨 Actions Immédiates (2024-2025)
-                
-                **1. Augmentation des prix**
-                • Objectif: paquet à 13€ en 2025  
-                • Hausse progressive mais significative  
-                
-                **2. Renforcement de la prévention**
-                • Campagnes choc renouvelées  
-                • Ciblage des populations vulnérables  
-                
-                **3. Amélioration de l'accès aux aides**
-                • Simplification des démarches  
-                • Formation des professionnels  
-                """)
-            
-            with col2:
-                st.markdown("""
-                ### 🏗️ Réformes Structurelles (2026-2030)
-                
-                **1. Généralisation des espaces sans tabac**
-                • Parcs, plages, abribus  
-                • Périmètres autour des écoles  
-                
-                **2. Régulation des nouveaux produits**
-                • Cigarettes électroniques  
-                • Produits du tabac chauffé  
-                
-                **3. Lutte contre le commerce illicite**
-                • Renforcement des contrôles  
-                • Collaboration internationale  
-                """)
-        
-        with tab3:
-            st.subheader("Feuille de Route Détaillée")
-            
-            roadmap = [
-                {'periode': '2024', 'actions': ['Hausse prix à 12€', 'Campagne jeunes', 'Extension espaces sans tabac']},
-                {'periode': '2025', 'actions': ['Paquet à 13€', 'Généralisation paquet neutre', 'Formation médecins']},
-                {'periode': '2026-2027', 'actions': ['Nouvelle hausse prix', 'Interdiction arômes menthol', 'Renforcement contrôles']},
-                {'periode': '2028-2030', 'actions': ['Objectif 5% prévalence', 'Évaluation stratégique', 'Adaptation politiques']},
-            ]
-            
-            for step in roadmap:
-                with st.expander(f"📅 {step['periode']}"):
-                    for action in step['actions']:
-                        st.write(f"• {action}")
+                elasticite = st.slider("Hypothèse d'élasticité (x élasticité estimée)",
+                                       float(surface.multipliers[0]), float(surface.multipliers[-1]),
+                                       value=1.0, step=0.05, key="scenario_elasticite")
             
-            # Graphique de projection
-            years_projection = list(range(2020, 2031))
-            prevalence_projection = [21.4, 20.9, 19.5, 18.0, 16.5, 15.0, 13.5, 11.0, 8.5, 6.0, 5.0]
+            scenario = surface.scenario((prix_2025, prix_2027), elasticite)
+            final = scenario.iloc[-1]
+            col1, col2, col3 = st.columns(3)
+            col1.metric(f"Consommation {int(final['annee'])}", f"{final['consommation']:.1f} Md",
+                        f"{final['consommation'] - model['consommation']:+.1f} Md", delta_color="inverse")
+            col2.metric(f"Prévalence {int(final['annee'])}", f"{final['prevalence']:.1f}%",
+                        f"{final['prevalence'] - model['prevalence']:+.1f} pts", delta_color="inverse")
+            col3.metric(f"Recettes fiscales {int(final['annee'])}", f"{final['recettes']:.1f} Md€",
+                        f"{final['recettes'] - model['recettes']:+.1f} Md€")
             
-            fig = px.line(x=years_projection, y=prevalence_projection,
-                         title='Projection de la Prévalence du Tabagisme 2020-2030',
-                         markers=True)
-            fig.add_hrect(y0=0, y1=5, line_width=0, fillcolor="green", opacity=0.2,
-                         annotation_text="Objectif 2030")
-            fig.update_layout(yaxis_title="Prévalence (%)", xaxis_title="Année")
-            st.plotly_chart(fig, use_container_width=True)
+            self.show_figure('strategies', 'scenario', prix_2025=round(prix_2025, 1),
+                             prix_2027=round(prix_2027, 1), elasticite=round(elasticite, 2))
+            self.show_figure('strategies', 'surface', elasticite=round(elasticite, 2))
+            st.caption(
+                f"Élasticités estimées sur l'historique : consommation {model['elasticite_consommation']:.2f}, "
+                f"prévalence {model['elasticite_prevalence']:.2f} ; bandes = hypothèses d'élasticité "
+                f"de x{surface.multipliers[0]:.1f} à x{surface.multipliers[-1]:.1f}."
+            )
+        
+        simulator()
+    
+    def price_scenarios(self):
+        """Surface de réponse des scénarios de prix (une fois par version des données)"""
+        return self.datasets.derived('scenarios_prix', lambda: build_surface(self.datasets.frame(
+            'historical_data', ['annee', 'prix_moyen', 'consommation_cigarettes', 'prevalence_tabagisme',
+                                'recettes_fiscales'])))
+    
+    def figure_strategies_scenario(self, prix_2025=13.0, prix_2027=15.0, elasticite=1.0):
+        """Consommation, prévalence et recettes d'un scénario de prix, avec fourchette d'élasticité"""
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
+        surface = self.price_scenarios()
+        scenario = surface.scenario((prix_2025, prix_2027), elasticite)
+        prix_2025, prix_2027 = surface.grid_prices((prix_2025, prix_2027))
+        panels = (('consommation', 'Consommation (milliards)'), ('prevalence', 'Prévalence (%)'),
+                  ('recettes', 'Recettes fiscales (Md€)'))
+        fig = make_subplots(rows=1, cols=3, subplot_titles=[title for _, title in panels])
+        for col, (name, title) in enumerate(panels, start=1):
+            fig.add_trace(go.Scatter(x=scenario['annee'], y=scenario[f"{name}_haut"], mode='lines',
+                                     line=dict(width=0), showlegend=False, hoverinfo='skip'), row=1, col=col)
+            fig.add_trace(go.Scatter(x=scenario['annee'], y=scenario[f"{name}_bas"], mode='lines',
+                                     line=dict(width=0), fill='tonexty', fillcolor='rgba(139, 0, 0, 0.15)',
+                                     name="Fourchette d'élasticité", showlegend=col == 1), row=1, col=col)
+            fig.add_trace(go.Scatter(x=scenario['annee'], y=scenario[name], mode='lines+markers',
+                                     line=dict(color='darkred'), name=title, showlegend=False,
+                                     customdata=scenario['prix'],
+                                     hovertemplate='%{x} : %{y:.2f} (paquet à %{customdata:.2f} €)<extra></extra>'),
+                          row=1, col=col)
+        fig.update_layout(title=f"Scénario : paquet à {prix_2025:.2f} € en {TARGET_YEARS[0]}, "
+                                f"{prix_2027:.2f} € en {TARGET_YEARS[1]} (élasticité x{elasticite:.2f})")
+        return fig
+    
+    def figure_strategies_surface(self, elasticite=1.0):
+        """Prévalence finale selon les deux prix cibles (surface de réponse)"""
+        import plotly.graph_objects as go
+        surface = self.price_scenarios()
+        fig = go.Figure(go.Heatmap(
+            x=surface.target_prices[1], y=surface.target_prices[0],
+            z=surface.final_surface('prevalence', elasticite), colorscale='RdYlGn_r',
+            colorbar=dict(title='Prévalence (%)'),
+            hovertemplate=f'{TARGET_YEARS[0]} : %{{y:.1f}} € · {TARGET_YEARS[1]} : %{{x:.1f}} €'
+                          '<br>Prévalence : %{z:.1f}%<extra></extra>'))
+        fig.update_layout(title=f"Prévalence {int(surface.years[-1])} selon les prix cibles "
+                                f"(élasticité x{elasticite:.2f})",
+                          xaxis_title=f"Prix {TARGET_YEARS[1]} (€)", yaxis_title=f"Prix {TARGET_YEARS[0]} (€)")
+        return fig
+    
+    def projections(self):
+        """Projections Monte-Carlo de la France et de chaque région (une fois par version des données)"""
+        series = (self.datasets.frame('regional_series', ['region', 'annee', 'prevalence'])
+                  if self.datasets.loader.available('regional_series') else None)
+        return self.datasets.derived('projections', lambda: forecast_prevalence(
+            self.datasets.frame('historical_data', ['annee', 'prevalence_tabagisme']),
+            self.datasets.frame('regional_data'), series=series,
+        ))
+    
+    def projection(self, serie):
+        """Quantiles projetés d'une série (France ou région), par année"""
+        projections = self.projections()
+        return projections[projections['serie'] == serie]
+    
+    @staticmethod
+    def add_fan_traces(fig, projection, color='139, 0, 0'):
+        """Éventail de projection : bandes 5-95% et 25-75%, puis médiane"""
+        import plotly.graph_objects as go
+        for low, high, opacity, name in (('q05', 'q95', 0.15, 'Projection 5-95%'),
+                                         ('q25', 'q75', 0.3, 'Projection 25-75%')):
+            fig.add_trace(go.Scatter(x=projection['annee'], y=projection[high], mode='lines',
+                                     line=dict(width=0), showlegend=False, hoverinfo='skip'))
+            fig.add_trace(go.Scatter(x=projection['annee'], y=projection[low], mode='lines',
+                                     line=dict(width=0), fill='tonexty',
+                                     fillcolor=f'rgba({color}, {opacity})', name=name))
+        fig.add_trace(go.Scatter(x=projection['annee'], y=projection['q50'], mode='lines',
+                                 line=dict(color=f'rgb({color})', dash='dash'), name='Projection médiane'))
+        return fig
+    
+    def figure_strategies_projection(self, serie='France'):
+        """Projection de la prévalence en éventail (Monte-Carlo)"""
+        import plotly.graph_objects as go
+        projection = self.projection(serie)
+        
+        fig = go.Figure()
+        if serie == 'France':
+            historical_data = self.series('historical_data', ['annee', 'prevalence_tabagisme'])
+            Scatter = scatter_class(len(historical_data))
+            fig.add_trace(Scatter(x=historical_data['annee'], y=historical_data['prevalence_tabagisme'],
+                                  mode='lines+markers', name='Observé', line=dict(color='gray')))
+        if not len(projection):
+            return fig
+        self.add_fan_traces(fig, projection)
+        fig.add_hrect(y0=0, y1=OBJECTIF, line_width=0, fillcolor="green", opacity=0.2,
+                     annotation_text="Objectif 2030")
+        fig.update_layout(title=f'Projection de la Prévalence du Tabagisme - {serie} '
+                                f'{int(projection["annee"].min())}-{int(projection["annee"].max())}',
+                          yaxis_title="Prévalence (%)", xaxis_title="Année")
+        return fig
+    
+    @timed
+    def create_synthesis(self):
+        """Synthèse stratégique"""
+        st.markdown("## 💡 SYNTHÈSE STRATÉGIQUE")
+        
+        self.show_text(narrative.SYNTHESIS)
     
     def create_sidebar(self):
         """Crée la sidebar avec les contrôles"""
@@ -791,12 +1754,18 @@ class TobaccoDashboard:
         
         # Période d'analyse
         st.sidebar.markdown("### 📅 Période d'analyse")
+        year_index = self.datasets.year_index('historical_data')
+        years = list(range(year_index.first, year_index.last + 1))
         annee_debut = st.sidebar.selectbox("Année de début", 
-                                         list(range(2000, 2024)), 
+                                         years, 
                                          index=0)
+        # Par défaut, la dernière année dont la prévalence est connue (pas une année de ventes seules)
         annee_fin = st.sidebar.selectbox("Année de fin", 
-                                       list(range(2000, 2024)), 
-                                       index=23)
+                                       years, 
+                                       index=years.index(min(self.datasets.reference_year(), years[-1])))
+        if annee_debut > annee_fin:
+            st.sidebar.warning("L'année de début est postérieure à l'année de fin : période inversée.")
+            annee_debut, annee_fin = annee_fin, annee_debut
         
         # Focus d'analyse
         st.sidebar.markdown("### 🎯 Focus d'analyse")
@@ -810,23 +1779,121 @@ class TobaccoDashboard:
         st.sidebar.markdown("### ⚙️ Options")
         show_projections = st.sidebar.checkbox("Afficher les projections", value=True)
         auto_refresh = st.sidebar.checkbox("Rafraîchissement automatique", value=False)
+        lazy_sections = st.sidebar.checkbox("Rendu à la demande des onglets", value=True,
+                                            help="Ne calcule que l'onglet affiché")
+        compact_figures = st.sidebar.checkbox("Encodage compact des figures", value=COMPACT_FIGURES,
+                                              help="Tableaux typés et précision arrondie : "
+                                                   "moins d'octets envoyés au navigateur")
         
         # Bouton d'export
-        if st.sidebar.button("📊 Exporter l'analyse"):
-            st.sidebar.success("Export réalisé avec succès!")
+        export = st.sidebar.button("📊 Exporter l'analyse")
+        
+        # Statistiques du cache de figures
+        with st.sidebar.expander("🗄️ Cache des figures"):
+            stats = self.figure_cache.stats()
+            st.caption(
+                f"Hits mémoire: {stats['hits']} · Hits disque: {stats['disk_hits']} · "
+                f"Miss: {stats['misses']} · Évictions: {stats['evictions']}"
+            )
+            st.caption(f"{stats['entries']} figures · {stats['memory_bytes'] / 1e6:.1f} / "
+                       f"{stats['max_memory_bytes'] / 1e6:.0f} Mo en mémoire")
+            if self.lazy_sections and WARMUP_WORKERS > 0:
+                warmup = get_warmup_scheduler().stats()
+                st.caption(f"Préchauffage : {warmup['construites']} construites · "
+                           f"{warmup['en_attente']} en attente · {warmup['annulees']} annulées")
+            self.payload_panel = st.empty()
+        
+        # Panneau de débogage : temps de rendu agrégés sur toutes les sessions du processus
+        with st.sidebar.expander("⏱️ Performances"):
+            if PERF.enabled:
+                st.caption("Mesures activées pour tout le processus (TABAC_PERF)")
+            else:
+                PERF.enable_session(st.checkbox("Mesurer les temps de rendu de cette session",
+                                                key="perf_enabled"))
+            self.perf_panel = st.empty()
+        
+        # Mémoire partagée du processus et mémoire propre à chaque session
+        with st.sidebar.expander("🧠 Mémoire"):
+            self.memory_panel = st.empty()
         
         return {
             'annee_debut': annee_debut,
             'annee_fin': annee_fin,
             'focus_analysis': focus_analysis,
             'show_projections': show_projections,
-            'auto_refresh': auto_refresh
+            'auto_refresh': auto_refresh,
+            'lazy_sections': lazy_sections,
+            'compact_figures': compact_figures,
+            'export': export
         }
     
+    def apply_controls(self, controls):
+        """Applique les contrôles de la sidebar (période, mode de rendu, projections)"""
+        self.lazy_sections = controls.get('lazy_sections', True)
+        self.compact_figures = controls.get('compact_figures', COMPACT_FIGURES)
+        self.show_projections = controls.get('show_projections', True)
+        self.year_range = (controls['annee_debut'], controls['annee_fin'])
+        self.figure_controls['periode'] = self.year_range
+    
+    def export_panel(self, controls):
+        """Lance l'export en arrière-plan et propose l'archive une fois prête"""
+        engine = get_export_engine()
+        
+        if controls['export']:
+            # Les figures sont exportées telles que les onglets les affichent (série, curseurs…)
+            figures = self.warmup_figures()
+            # Simulateur jamais ouvert : scénario et surface aux valeurs par défaut
+            shown = {(section, figure_id) for section, figure_id, _ in figures}
+            figures += [('strategies', figure_id, {}) for figure_id in ('scenario', 'surface')
+                        if ('strategies', figure_id) not in shown]
+            request = {
+                'version': self.datasets.version,
+                'annee_debut': controls['annee_debut'],
+                'annee_fin': controls['annee_fin'],
+                'projections': controls['show_projections'],
+                'encodage_compact': controls['compact_figures'],
+                'parametres': {f"{section}.{figure_id}": {name: value for name, value in params.items()
+                                                          if isinstance(value, (str, int, float))}
+                               for section, figure_id, params in figures if params},
+            }
+            # Les contours (chemin, date) n'entrent que dans la clé, pas dans le manifeste
+            key = FigureCache.make_key(*request.values(), figures)
+            datasets = {name: self.dataset(name) for name in SharedDatasets.EXPORTED}
+            # Mêmes contrôles que les onglets : période, projections et encodage des figures
+            figure_controls = {name: controls[name] for name in ('annee_debut', 'annee_fin', 'show_projections',
+                                                                 'compact_figures')}
+            engine.submit(key, figures, figure_controls, datasets, request)
+            st.session_state['export_job'] = key
+        
+        key = st.session_state.get('export_job')
+        job = engine.job(key) if key else None
+        if job is None:
+            return
+        
+        if not job.done():
+            @st.fragment(run_every=1)
+            def poll_export():
+                if job.done():
+                    st.rerun()
+                st.caption("⏳ Export en cours…")
+            
+            with st.sidebar:
+                poll_export()
+        elif job.exception() is not None:
+            st.sidebar.error(f"Échec de l'export : {job.exception()}")
+        else:
+            with open(job.result(), 'rb') as archive:
+                st.sidebar.download_button("⬇️ Télécharger l'export (zip)", archive,
+                                           file_name="analyse_tabac_france.zip",
+                                           mime="application/zip")
+    
+    @timed
     def run_dashboard(self):
         """Exécute le dashboard complet"""
         # Sidebar
         controls = self.create_sidebar()
+        self.apply_controls(controls)
+        self.export_panel(controls)
         
         # Header
         self.display_header()
@@ -835,93 +1902,135 @@ class TobaccoDashboard:
         self.display_key_metrics()
         
         # Navigation par onglets
-        tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
-            "📈 Historique", 
-            "🏛️ Politiques", 
-            "🗺️ Régional", 
-            "🌍 International", 
-            "🎯 Stratégies",
-            "💡 Synthèse"
+        self.render_tabs("sections", [
+            (label, getattr(self, method)) for label, _, method in self.SECTIONS
         ])
         
-        with tab1:
-            self.create_historical_analysis()
+        # Rafraîchissement automatique
+        if controls['auto_refresh']:
+            self.watch_data_changes()
         
-        with tab2:
-            self.create_policy_analysis()
+        # Les tables dérivées calculées pendant ce rendu rejoignent l'instantané
+        self.datasets.save_snapshot(snapshot_path(self.datasets.version))
+        self.warm_up()
+        self.display_payload_bytes()
+        self.display_memory_report()
+        self.display_perf_metrics()
+    
+    def warmup_figures(self):
+        """Figures (section, id, paramètres) que les onglets afficheraient avec l'état actuel des contrôles"""
+        state = st.session_state
+        params = {
+            ('historique', 'prevalence'): {'projections': self.show_projections},
+            ('politiques', 'impact_prevalence'): {'serie': state.get('impact_serie', 'France')},
+            ('politiques', 'delai_impact'): {'serie': state.get('impact_serie', 'France')},
+            ('strategies', 'projection'): {'serie': state.get('projection_territoire', 'France')},
+        }
+        # Le simulateur n'est préchauffé qu'une fois ses curseurs initialisés
+        if 'scenario_elasticite' in state:
+            elasticite = round(state['scenario_elasticite'], 2)
+            params[('strategies', 'scenario')] = {'prix_2025': round(state['scenario_prix_2025'], 1),
+                                                  'prix_2027': round(state['scenario_prix_2027'], 1),
+                                                  'elasticite': elasticite}
+            params[('strategies', 'surface')] = {'elasticite': elasticite}
+        skipped = {('strategies', 'scenario'), ('strategies', 'surface')} - set(params)
+        if not self.show_projections:
+            skipped.add(('strategies', 'projection'))
         
-        with tab3:
-            self.create_regional_analysis()
+        figures = [(section, figure_id, params.get((section, figure_id), {}))
+                   for section, ids in self.FIGURES.items() for figure_id in ids
+                   if (section, figure_id) not in skipped]
+        level = state.get('niveau_carte', 'region')
+        geometry_path = cached_level_path(level)
+        if geometry_path and self.datasets.loader.available(MAP_LEVEL_DATASETS[level]):
+            figures.append(('regional', 'choroplethe',
+                            {'niveau': level, 'geometrie': (geometry_path, os.path.getmtime(geometry_path))}))
+        return figures
+    
+    def warm_up(self):
+        """Construit en arrière-plan les figures des onglets non affichés, pour l'état actuel des contrôles
         
-        with tab4:
-            self.create_international_comparison()
+        Une copie du dashboard (mêmes données et même cache, contrôles figés) sert
+        aux constructions ; un nouvel état de la session annule celles de l'ancien.
+        """
+        ctx = get_script_run_ctx()
+        if not self.lazy_sections or WARMUP_WORKERS <= 0 or ctx is None:
+            return
+        worker = copy.copy(self)
+        worker.figure_controls = dict(self.figure_controls)
+        worker.payload_bytes = {}
         
-        with tab5:
-            self.create_strategic_recommendations()
+        figures = [(self.figure_key(section, figure_id, **params), section, figure_id, params)
+                   for section, figure_id, params in self.warmup_figures()]
+        tasks = [(key, lambda s=section, f=figure_id, p=params: worker.figure_json(s, f, **p))
+                 for key, section, figure_id, params in figures if key not in self.figure_cache]
+        get_warmup_scheduler().schedule(ctx.session_id, tuple(key for key, *_ in figures), tasks)
+    
+    def display_payload_bytes(self):
+        """Octets de figures envoyés au navigateur par section pendant ce rerun"""
+        if not self.payload_bytes or self.payload_panel is None:
+            return
+        sizes = " · ".join(f"{section}: {size / 1e3:.1f} Ko" for section, size in self.payload_bytes.items())
+        mode = "compact" if self.compact_figures else "standard"
+        self.payload_panel.caption(f"Figures envoyées ({mode}) — {sizes}")
+
+    def display_memory_report(self):
+        """Mémoire partagée du processus et mémoire propre de chaque session (dimensionnement des workers)"""
+        own = {name: value for name, value in vars(self).items() if name not in self.SHARED_ATTRIBUTES}
+        session_bytes = owned_bytes({'session_state': dict(st.session_state), 'dashboard': own},
+                                    self.datasets.shared_buffers())
+        sessions = get_session_memory()
+        ctx = get_script_run_ctx()
+        if ctx is not None:
+            sessions.record(ctx.session_id, session_bytes)
+        if self.memory_panel is None:
+            return
+        shared = self.datasets.memory_usage()
+        summary = sessions.summary()
+        typed = self.datasets.loader.schema_report()
+        saved = sum(sizes['avant'] - sizes['apres'] for sizes in typed.values())
+        typed_sizes = ' · '.join(f"{name} {format_bytes(sizes['avant'])} → {format_bytes(sizes['apres'])}"
+                                 for name, sizes in typed.items())
+        self.memory_panel.caption(
+            f"Partagé : {format_bytes(sum(shared.values()))} "
+            f"({' · '.join(f'{name} {format_bytes(size)}' for name, size in shared.items())})  \n"
+            f"Types compacts : {format_bytes(saved)} économisés "
+            f"({typed_sizes})  \n"
+            f"Cette session : {format_bytes(session_bytes)}  \n"
+            f"Sessions actives : {summary['sessions']} · moyenne {format_bytes(summary['mean_bytes'])} · "
+            f"max {format_bytes(summary['max_bytes'])}"
+        )
+    
+    def display_perf_metrics(self):
+        """Quantiles des temps de rendu (ms) et export pour un scraping local"""
+        if not PERF.active:
+            return
+        summary = PERF.summary()
+        if summary and self.perf_panel is not None:
+            table = pd.DataFrame.from_dict(summary, orient='index')
+            quantiles = (table[['p50', 'p95', 'p99']] * 1000).round(1).add_suffix(' (ms)')
+            self.perf_panel.dataframe(table[['count']].join(quantiles), use_container_width=True)
+        PERF.write(PERF_METRICS_DIR, min_interval=PERF_WRITE_SECONDS)
+    
+    def watch_data_changes(self):
+        """Relance le dashboard quand les données changent, sans bloquer la session"""
+        monitor = get_refresh_monitor()
         
-        with tab6:
-            st.markdown("## 💡 SYNTHÈSE STRATÉGIQUE")
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.markdown("""
-                ### ✅ SUCCÈS ET PROGRÈS
-                
-                **Baisse continue depuis 20 ans:**
-                • Prévalence divisée par 1.5  
-                • Paquet neutre généralisé  
-                • Interdictions efficaces  
-                • Prise de conscience collective  
-                
-                **Politiques efficaces:**
-                • Hausse des prix  
-                • Interdiction publicité  
-                • Espaces sans tabac  
-                • Campagnes choc  
-                """)
-            
-            with col2:
-                st.markdown("""
-                ### ⚠️ DÉFIS PERSISTANTS
-                
-                **Inégalités sociales:**
-                • Écart ouvriers/cadres: 12 points  
-                • Territorialité marquée  
-                • Jeunes vulnérables  
-                
-                **Nouveaux enjeux:**
-                • Cigarettes électroniques  
-                • Commerce illicite  
-                • Industrie du tabac adaptative  
-                • Produits nouveaux  
-                """)
-            
-            st.markdown("""
-            ### 🚨 ALERTES ET RECOMMANDATIONS
-            
-            **Niveau d'Alerte: MODÉRÉ**
-            
-            **Points de Vigilance:**
-            • Stagnation possible de la baisse  
-            • Résistance des populations vulnérables  
-            • Nouveaux produits attractifs pour les jeunes  
-            • Commerce parallèle croissant  
-            
-            **Recommandations Immédiates:**
-            1. Accélération des hausses de prix  
-            2. Renforcement de la prévention jeune  
-            3. Lutte contre les inégalités sociales  
-            4. Régulation des nouveaux produits  
-            5. Coordination européenne renforcée  
-            """)
+        @st.fragment(run_every=SESSION_POLL_SECONDS)
+        def poll_data_version():
+            if version_changed(st.session_state, monitor.version):
+                st.rerun()
+            st.caption(f"🔄 Données vérifiées à {monitor.last_check:%H:%M:%S}")
         
-        # Rafraîchissement automatique
-        if controls['auto_refresh']:
-            time.sleep(300)
-            st.rerun()
+        with st.sidebar:
+            poll_data_version()
 
 # Lancement du dashboard
 if __name__ == "__main__":
+    configure_page()
+    # Les chargements du début du rendu sont mesurés si la session l'a demandé
+    PERF.enable_session(st.session_state.get('perf_enabled', False))
+    if API_PORT:
+        get_data_api()
     dashboard = TobaccoDashboard()
     dashboard.run_dashboard()
\ No newline at end of file
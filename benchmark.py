@@ -0,0 +1,281 @@
+"""Banc d'essai headless du dashboard
+
+Mesure, sur des jeux de données synthétiques à l'échelle 1x/10x/100x :
+- le démarrage à froid (construction de TobaccoDashboard et chargement des données),
+- display_key_metrics et chaque section create_* (cache de figures froid puis chaud),
+- le coût de construction et la taille sérialisée de chaque figure,
+- une exécution complète de run_dashboard via AppTest, puis un rerun.
+
+Pour chaque mesure : temps (ms), pic d'allocations (Ko, tracemalloc) et octets émis.
+
+Usage :
+    python benchmark.py --scales 1 10 100 --save benchmarks/baseline.json
+    python benchmark.py --compare benchmarks/baseline.json --tolerance 0.25
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# En dessous de ce seuil, un écart de temps est considéré comme du bruit
+NOISE_FLOOR_MS = 5.0
+DEFAULT_SCALES = [1, 10, 100]
+# Fenêtre des années synthétiques : dates des politiques valides à toutes les échelles
+FIRST_YEAR, LAST_YEAR = 1990, 2023
+# Nombre d'entités à l'échelle 1x
+BASE_SIZES = {'politiques': 10, 'regions': 13, 'pays': 8, 'pays_panel': 190}
+
+
+def synthetic_datasets(scale, seed=0, sizes=BASE_SIZES):
+    """Jeux de données aux colonnes du dashboard, `scale` fois plus d'entités que `sizes`
+
+    Les séries restent dans la fenêtre FIRST_YEAR-LAST_YEAR : l'échelle multiplie
+    les politiques, régions et pays (et leurs séries annuelles), pas les années.
+    """
+    rng = np.random.default_rng(seed)
+
+    years = np.arange(FIRST_YEAR, LAST_YEAR + 1)
+    trend = np.linspace(35, 21, len(years)) + rng.normal(0, 0.3, len(years))
+    historical = pd.DataFrame({
+        'annee': years,
+        'prevalence_tabagisme': trend,
+        'fumeurs_quotidiens': trend * 0.83,
+        'consommation_cigarettes': np.linspace(95, 53, len(years)),
+        'prix_moyen': np.linspace(4.2, 12.5, len(years)),
+        'recettes_fiscales': np.linspace(10.2, 17.1, len(years)),
+    })
+
+    health_years = years[-14:]
+    health = pd.DataFrame({
+        'annee': health_years,
+        'deces_tabac': np.linspace(73, 60, len(health_years)).round().astype(int),
+        'cancers_poumon': np.linspace(31, 44, len(health_years)).round().astype(int),
+        'maladies_cardiovasculaires': np.linspace(25, 12, len(health_years)).round().astype(int),
+        'couts_sante': np.linspace(26.5, 30.4, len(health_years)),
+        'annees_vie_perdues': np.linspace(1.8, 1.15, len(health_years)),
+    })
+
+    n_policies = sizes['politiques'] * scale
+    policy_years = rng.integers(FIRST_YEAR, LAST_YEAR + 1, n_policies)
+    policy_months = rng.integers(1, 13, n_policies)
+    policies = pd.DataFrame({
+        'date': sorted(f"{year}-{month:02d}-01" for year, month in zip(policy_years, policy_months)),
+        'type': rng.choice(['regulation', 'tax', 'ban', 'prevention'], n_policies),
+        'titre': [f"Mesure {i}" for i in range(n_policies)],
+        'description': [f"Description de la mesure {i}" for i in range(n_policies)],
+    })
+
+    n_regions = sizes['regions'] * scale
+    region_names = [f"Région {i:04d}" for i in range(n_regions)]
+    regional = pd.DataFrame({
+        'region': region_names,
+        'prevalence_2023': rng.uniform(18, 27, n_regions),
+        'evolution_2010_2023': rng.uniform(-7, -4, n_regions),
+        'fumeurs_quotidiens': rng.uniform(14, 23, n_regions),
+        'tabagisme_passif': rng.uniform(11, 20, n_regions),
+    })
+    # Séries régionales (région, année) sur la fenêtre
+    region_start = rng.uniform(25, 35, n_regions)
+    regional_series = pd.DataFrame({
+        'region': np.repeat(region_names, len(years)),
+        'annee': np.tile(years, n_regions),
+        'prevalence': (region_start[:, None] - np.outer(rng.uniform(0.1, 0.4, n_regions),
+                                                        np.arange(len(years)))).ravel().clip(3, None),
+    })
+
+    n_countries = sizes['pays'] * scale
+    international = pd.DataFrame({
+        'pays': [f"Pays {i:04d}" for i in range(n_countries)],
+        'prevalence_tabagisme': rng.uniform(10, 26, n_countries),
+        'prix_paquet_eur': rng.uniform(4, 22, n_countries),
+        'mortalite_liee_tabac': rng.integers(20, 481, n_countries),
+        'depenses_prevention': rng.uniform(0.3, 2.1, n_countries),
+        'interdiction_publicite': rng.integers(0, 2, n_countries),
+    })
+
+    # Panel (pays, année) : pays x années de la fenêtre
+    n_panel = sizes['pays_panel'] * scale
+    panel_start = rng.uniform(15, 40, n_panel)
+    panel_slope = rng.uniform(-0.6, 0.1, n_panel)
+    panel = pd.DataFrame({
+        'pays': np.repeat([f"Pays {i:05d}" for i in range(n_panel)], len(years)),
+        'annee': np.tile(years, n_panel),
+        'prevalence_tabagisme': (panel_start[:, None] + np.outer(panel_slope, np.arange(len(years)))).ravel()
+                                .clip(3, None),
+        'depenses_prevention': rng.uniform(0.3, 2.1, n_panel * len(years)),
+    })
+
+    return {
+        'historique.arrow': historical,
+        'sante.arrow': health,
+        'politiques.arrow': policies,
+        'regions.arrow': regional,
+        'regions_series.arrow': regional_series,
+        'international.arrow': international,
+        'international_panel.arrow': panel,
+    }
+
+
+def write_datasets(datasets, data_dir):
+    os.makedirs(data_dir, exist_ok=True)
+    for filename, frame in datasets.items():
+        frame.to_feather(os.path.join(data_dir, filename), compression='uncompressed')
+
+
+def measure(run, reset=None):
+    """Temps d'exécution puis pic d'allocations (deux passes, état réinitialisé entre elles)"""
+    if reset:
+        reset()
+    start = time.perf_counter()
+    result = run()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if reset:
+        reset()
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'ms': round(elapsed_ms, 2), 'alloc_kb': round(peak / 1024, 1)}, result
+
+
+def bench_scale(scale, workdir, sizes=BASE_SIZES):
+    """Mesures pour une échelle ; les caches sont isolés dans `workdir`"""
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    from static_site import TABS
+
+    data_dir = os.path.join(workdir, f"data_{scale}x")
+    write_datasets(synthetic_datasets(scale, sizes=sizes), data_dir)
+    os.environ['TABAC_DATA_DIR'] = data_dir
+    os.environ['TABAC_CACHE_DIR'] = os.path.join(workdir, f"cache_{scale}x")
+
+    import importlib
+    import Dashboard
+    Dashboard = importlib.reload(Dashboard)
+    controls = {'annee_debut': 0, 'annee_fin': 9999, 'lazy_sections': False}
+
+    def cold():
+        st.cache_resource.clear()
+        Dashboard.get_figure_cache().cache_dir = None
+
+    def new_dashboard():
+        dashboard = Dashboard.TobaccoDashboard()
+        for name in Dashboard.SharedDatasets.EXPORTED:
+            dashboard.datasets.frame(name)
+        return dashboard
+
+    results = {}
+    results['cold_start'], _ = measure(new_dashboard, reset=cold)
+
+    cold()
+    dashboard = new_dashboard()
+    dashboard.apply_controls(controls)
+    results['display_key_metrics'], _ = measure(dashboard.display_key_metrics)
+
+    # Figures de chaque section avec les paramètres de leurs onglets à l'ouverture
+    tab_figures = {section: [figure for _, figures, _ in tabs for figure in figures]
+                   for section, tabs in TABS.items()}
+
+    # Construction et taille de chaque figure (hors cache)
+    for section, figures in tab_figures.items():
+        for figure_id, params in figures:
+            builder = getattr(dashboard, f"figure_{section}_{figure_id}")
+            stats, payload = measure(lambda: builder(**params).to_json())
+            results[f"figure.{section}.{figure_id}"] = dict(stats, bytes=len(payload))
+
+    # Sections complètes, cache froid puis chaud
+    for _, key, method in dashboard.SECTIONS:
+        def render(method=method):
+            section_dashboard = Dashboard.TobaccoDashboard()
+            section_dashboard.apply_controls(controls)
+            getattr(section_dashboard, method)()
+        stats, _ = measure(render, reset=lambda: Dashboard.get_figure_cache().clear())
+        payload = sum(len(dashboard.figure_json(key, figure_id, **params))
+                      for figure_id, params in tab_figures.get(key, []))
+        results[f"section.{key}.cold"] = dict(stats, bytes=payload)
+        results[f"section.{key}.warm"], _ = measure(render)
+
+    # Exécution complète puis rerun, comme dans un navigateur
+    st.cache_resource.clear()
+    app = AppTest.from_file(os.path.join(BASE_DIR, 'Dashboard.py'), default_timeout=120)
+    for label in ('run_dashboard.cold', 'run_dashboard.rerun'):
+        start = time.perf_counter()
+        app.run()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if app.exception:
+            raise RuntimeError(f"{label}: {app.exception[0].value}")
+        payload = sum(len(chart.proto.spec) for chart in app.get('plotly_chart'))
+        results[label] = {'ms': round(elapsed_ms, 2), 'bytes': payload}
+
+    return results
+
+
+def compare(current, baseline, tolerance):
+    """Régressions : temps ou octets au-delà de la tolérance par rapport à la référence"""
+    regressions = []
+    for scale, metrics in current.items():
+        for name, values in metrics.items():
+            reference = baseline.get(scale, {}).get(name)
+            if reference is None:
+                continue
+            if 'ms' in values and 'ms' in reference:
+                limit = max(reference['ms'] * (1 + tolerance), reference['ms'] + NOISE_FLOOR_MS)
+                if values['ms'] > limit:
+                    regressions.append(f"{scale} {name}: {values['ms']:.1f} ms > {limit:.1f} ms")
+            if 'bytes' in values and 'bytes' in reference and values['bytes'] > reference['bytes'] * (1 + tolerance):
+                regressions.append(f"{scale} {name}: {values['bytes']} octets > {reference['bytes']}")
+    return regressions
+
+
+def print_report(results):
+    for scale, metrics in results.items():
+        print(f"\n=== Échelle {scale} ===")
+        print(f"{'mesure':<45}{'ms':>10}{'alloc Ko':>12}{'octets':>12}")
+        for name, values in metrics.items():
+            print(f"{name:<45}{values.get('ms', ''):>10}{values.get('alloc_kb', ''):>12}{values.get('bytes', ''):>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Banc d'essai headless du dashboard")
+    parser.add_argument('--scales', nargs='+', type=int, default=DEFAULT_SCALES)
+    parser.add_argument('--save', help="enregistre les résultats comme référence (JSON)")
+    parser.add_argument('--compare', help="compare à une référence et échoue en cas de régression")
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+    sys.path.insert(0, BASE_DIR)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for scale in args.scales:
+            results[f"{scale}x"] = bench_scale(scale, workdir)
+    print_report(results)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nRéférence enregistrée: {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\nRégressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+        print("\nAucune régression.")
+
+
+if __name__ == '__main__':
+    main()
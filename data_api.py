@@ -0,0 +1,401 @@
+"""API JSON locale sur les jeux de données du dashboard
+
+Sert les jeux de données exportés du dashboard depuis les données partagées
+du processus (SharedDatasets) :
+
+    GET  /api/datasets
+         jeux de données, colonnes, nombre de lignes et version des données
+    GET  /api/datasets/<nom>?annee_debut=2010&annee_fin=2020&region=Bretagne,Corse&colonnes=region,prevalence_2023
+         tranche d'un jeu de données (période, valeurs de region / pays, colonnes)
+    POST /api/batch  {"requetes": [{"dataset": "historical_data", "annee_debut": 2015}, ...]}
+         plusieurs tranches en un aller-retour
+
+Chaque réponse porte un ETag fort (version des données, requête normalisée et
+encodage) : un client qui renvoie If-None-Match reçoit 304 sans corps. Les
+corps sont compressés en gzip si le client l'accepte et gardés dans un cache
+mémoire borné : une même tranche n'est sérialisée qu'une fois par version.
+
+Usage :
+    python data_api.py [--host 127.0.0.1] [--port 8765]
+    python data_api.py --load-test http://127.0.0.1:8765 [--requests 2000] [--concurrency 16]
+
+Le dashboard démarre aussi l'API dans son propre processus si TABAC_API_PORT est défini.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from dataset_schema import decimal_floats
+from figure_cache import FigureCache
+
+DEFAULT_PORT = 8765
+# Colonnes filtrables par liste de valeurs (paramètre du même nom)
+FILTER_COLUMNS = ('region', 'pays')
+# Tranches au plus par requête groupée
+MAX_BATCH = 50
+# En dessous de cette taille, le corps n'est pas compressé
+GZIP_MIN_BYTES = 1024
+# Taille maximale du corps d'une requête groupée
+MAX_BODY_BYTES = 1024 * 1024
+CACHE_BYTES = 32 * 1024 * 1024
+
+logger = logging.getLogger(__name__)
+
+
+class ApiError(Exception):
+    """Erreur renvoyée au client avec son statut HTTP"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def normalized_query(params):
+    """Requête d'une tranche sous forme canonique (même tranche = même clé)
+
+    Les paramètres viennent de l'URL (chaînes) ou d'un lot JSON (types libres) :
+    tout paramètre d'un type inattendu est une erreur 400, jamais une exception.
+    """
+    if not isinstance(params, dict):
+        raise ApiError(400, f"Une tranche doit être un objet JSON, pas {type(params).__name__}")
+
+    def as_list(name):
+        value = params.get(name)
+        if value is None:
+            return []
+        if isinstance(value, str):
+            values = value.split(',')
+        elif isinstance(value, list) and all(isinstance(v, (str, int, float)) and not isinstance(v, bool)
+                                             for v in value):
+            values = value
+        else:
+            raise ApiError(400, f"{name} doit être une chaîne (valeurs séparées par des virgules) "
+                                f"ou une liste de valeurs: {value!r}")
+        return [str(v).strip() for v in values if str(v).strip()]
+
+    def as_year(name):
+        value = params.get(name)
+        if value in (None, ''):
+            return None
+        if isinstance(value, str):
+            value = value.strip()
+        elif isinstance(value, float) and value.is_integer():
+            value = int(value)
+        if isinstance(value, bool) or not isinstance(value, (str, int)):
+            raise ApiError(400, f"{name} doit être une année: {value!r}")
+        try:
+            return int(value)
+        except ValueError:
+            raise ApiError(400, f"{name} doit être une année: {value!r}")
+
+    dataset = params.get('dataset')
+    if not dataset or not isinstance(dataset, str):
+        raise ApiError(400, "Paramètre dataset manquant ou invalide")
+    filters = {column: sorted(as_list(column)) for column in FILTER_COLUMNS}
+    return {
+        'dataset': dataset,
+        'annee_debut': as_year('annee_debut'),
+        'annee_fin': as_year('annee_fin'),
+        'colonnes': as_list('colonnes'),
+        'filtres': {column: values for column, values in filters.items() if values},
+    }
+
+
+class DataAPI:
+    """Réponses de l'API, calculées depuis les jeux de données partagés du processus"""
+
+    def __init__(self, datasets_provider, max_cache_bytes=CACHE_BYTES):
+        # Appelé à chaque requête : renvoie les SharedDatasets de la version courante
+        self.datasets_provider = datasets_provider
+        self.cache = FigureCache(max_memory_bytes=max_cache_bytes)
+        self.server = None
+
+    def validate(self, datasets, query):
+        """Colonnes de la tranche désignée par une requête normalisée ; ApiError si elle n'existe pas"""
+        name = query['dataset']
+        if name not in datasets.EXPORTED:
+            raise ApiError(404, f"Jeu de données inconnu: {name}")
+        available = list(datasets.frame(name).columns)
+        columns = query['colonnes'] or available
+        unknown = [column for column in [*columns, *query['filtres']] if column not in available]
+        if unknown:
+            raise ApiError(400, f"Colonnes absentes de {name}: {', '.join(unknown)}")
+        if (query['annee_debut'] is not None or query['annee_fin'] is not None) \
+                and name not in datasets.YEAR_COLUMNS:
+            raise ApiError(400, f"{name} n'a pas de colonne d'année")
+        return columns
+
+    def slice(self, datasets, query):
+        """Tranche d'un jeu de données (DataFrame) selon une requête normalisée"""
+        name = query['dataset']
+        columns = self.validate(datasets, query)
+        years = None
+        if query['annee_debut'] is not None or query['annee_fin'] is not None:
+            years = (query['annee_debut'], query['annee_fin'])
+        needed = list(dict.fromkeys([*columns, *query['filtres']]))
+        frame = datasets.frame(name, needed, years)
+        if query['filtres']:
+            mask = np.ones(len(frame), dtype=bool)
+            for column, values in query['filtres'].items():
+                mask &= frame[column].astype(str).isin(values).to_numpy()
+            frame = frame[mask]
+        return frame[columns]
+
+    def slice_json(self, datasets, query):
+        """Corps JSON d'une tranche"""
+        frame = self.slice(datasets, query)
+        records = decimal_floats(frame).to_json(orient='records', force_ascii=False, date_format='iso')
+        header = json.dumps({'dataset': query['dataset'], 'version': datasets.version,
+                             'lignes': len(frame), 'colonnes': list(frame.columns)}, ensure_ascii=False)
+        return f'{header[:-1]}, "donnees": {records}}}'
+
+    def catalog_json(self, datasets):
+        entries = []
+        for name in datasets.EXPORTED:
+            frame = datasets.frame(name)
+            entries.append({'dataset': name, 'colonnes': list(frame.columns), 'lignes': len(frame),
+                            'colonne_annee': datasets.YEAR_COLUMNS.get(name),
+                            'filtres': [column for column in FILTER_COLUMNS if column in frame.columns]})
+        return json.dumps({'version': datasets.version, 'datasets': entries}, ensure_ascii=False)
+
+    def batch_json(self, datasets, requests):
+        """Corps JSON d'une requête groupée ; une tranche en erreur n'empêche pas les autres"""
+        results = []
+        for request in requests:
+            try:
+                results.append(self.slice_json(datasets, normalized_query(request)))
+            except ApiError as error:
+                results.append(json.dumps({'erreur': str(error), 'statut': error.status}, ensure_ascii=False))
+        return f'{{"version": {json.dumps(datasets.version)}, "resultats": [{", ".join(results)}]}}'
+
+    def respond(self, method, path, query_string='', body=b'', headers=None):
+        """(statut, en-têtes, corps) d'une requête HTTP"""
+        headers = headers or {}
+        try:
+            datasets = self.datasets_provider()
+            key, build = self._route(datasets, method, path, query_string, body)
+        except ApiError as error:
+            return error_response(error)
+
+        use_gzip = 'gzip' in headers.get('Accept-Encoding', '')
+        etag = f'"{key[:20]}{"-gz" if use_gzip else ""}"'
+        response_headers = {'ETag': etag, 'Vary': 'Accept-Encoding', 'Cache-Control': 'no-cache'}
+        if etag_matches(headers.get('If-None-Match'), etag):
+            return 304, response_headers, b''
+
+        try:
+            payload = self.cache.get_or_build(etag, lambda: self._encode(build(), use_gzip))
+        except ApiError as error:
+            return error_response(error)
+        response_headers['Content-Type'] = 'application/json; charset=utf-8'
+        if use_gzip and payload[:2] == b'\x1f\x8b':
+            response_headers['Content-Encoding'] = 'gzip'
+        return 200, response_headers, payload
+
+    def _route(self, datasets, method, path, query_string, body):
+        """Clé (version + requête normalisée) et construction du corps d'une ressource existante
+
+        Toute erreur de ressource (jeu de données, colonnes, filtres) est levée ici, avant le
+        test If-None-Match de respond : `*` ne correspond qu'à une représentation existante.
+        """
+        path = path.rstrip('/')
+        if method == 'GET' and path == '/api/datasets':
+            return response_key(datasets.version, 'catalogue'), lambda: self.catalog_json(datasets)
+        if method == 'GET' and path.startswith('/api/datasets/'):
+            params = {name: values[-1] for name, values in parse_qs(query_string).items()}
+            query = normalized_query(dict(params, dataset=path[len('/api/datasets/'):]))
+            # Validée avant le test If-None-Match : une tranche inexistante répond 404/400, jamais 304
+            self.validate(datasets, query)
+            return response_key(datasets.version, query), lambda: self.slice_json(datasets, query)
+        if method == 'POST' and path == '/api/batch':
+            try:
+                requests = json.loads(body or b'{}').get('requetes', [])
+            except (ValueError, AttributeError):
+                raise ApiError(400, "Corps JSON attendu: {\"requetes\": [...]}")
+            if not isinstance(requests, list) or len(requests) > MAX_BATCH:
+                raise ApiError(400, f"requetes doit être une liste d'au plus {MAX_BATCH} tranches")
+            key = response_key(datasets.version, 'lot', requests)
+            return key, lambda: self.batch_json(datasets, requests)
+        if path.startswith('/api/'):
+            raise ApiError(404 if method in ('GET', 'POST') else 405, f"{method} {path} non pris en charge")
+        raise ApiError(404, f"Chemin inconnu: {path}")
+
+    @staticmethod
+    def _encode(text, use_gzip):
+        payload = text.encode('utf-8')
+        if use_gzip and len(payload) >= GZIP_MIN_BYTES:
+            return gzip.compress(payload, compresslevel=6, mtime=0)
+        return payload
+
+    def serve(self, host='127.0.0.1', port=DEFAULT_PORT):
+        """Démarre le serveur dans un thread d'arrière-plan ; retourne le serveur"""
+        self.server = ApiServer((host, port), request_handler(self))
+        threading.Thread(target=self.server.serve_forever, name='api-donnees', daemon=True).start()
+        return self.server
+
+
+def error_response(error):
+    """(statut, en-têtes, corps) d'une erreur renvoyée au client"""
+    payload = json.dumps({'erreur': str(error)}, ensure_ascii=False).encode('utf-8')
+    return error.status, {'Content-Type': 'application/json; charset=utf-8'}, payload
+
+
+def response_key(version, *parts):
+    """Clé stable d'une réponse : version des données et requête normalisée"""
+    return hashlib.sha1(json.dumps([version, *parts], sort_keys=True, ensure_ascii=False,
+                                   default=str).encode('utf-8')).hexdigest()
+
+
+def etag_matches(header, etag):
+    """Vrai si If-None-Match désigne `etag` (comparaison faible, comme le prévoit HTTP)"""
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(',')]
+    return '*' in candidates or etag in [candidate.removeprefix('W/') for candidate in candidates]
+
+
+class ApiServer(ThreadingHTTPServer):
+    """Serveur HTTP à un thread par connexion, file d'attente à la mesure d'un test de charge"""
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def request_handler(api):
+    """Classe de gestionnaire HTTP liée à une instance de l'API"""
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _handle(self, method):
+            url = urlsplit(self.path)
+            try:
+                length = int(self.headers.get('Content-Length') or 0)
+            except ValueError:
+                length = -1
+            if not 0 <= length <= MAX_BODY_BYTES:
+                # Corps illisible : la connexion ne peut pas être réutilisée
+                self.close_connection = True
+                status, headers, payload = error_response(
+                    ApiError(400 if length < 0 else 413, "Content-Length invalide ou trop grand"))
+            else:
+                body = self.rfile.read(length) if length else b''
+                try:
+                    status, headers, payload = api.respond(method, url.path, url.query, body, dict(self.headers))
+                except Exception:
+                    logger.exception("Échec de %s %s", method, self.path)
+                    status, headers, payload = error_response(ApiError(500, "Erreur interne"))
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            if payload:
+                self.wfile.write(payload)
+
+        def do_GET(self):
+            self._handle('GET')
+
+        def do_POST(self):
+            self._handle('POST')
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def load_test(base_url, requests=2000, concurrency=16):
+    """Charge l'API (tranches, catalogue, lots ; moitié des requêtes conditionnelles) et mesure les latences"""
+    base_url = base_url.rstrip('/')
+    targets = [
+        ('GET', '/api/datasets', None),
+        ('GET', '/api/datasets/historical_data', None),
+        ('GET', '/api/datasets/historical_data?annee_debut=2015&annee_fin=2023&colonnes=annee,prevalence_tabagisme',
+         None),
+        ('GET', '/api/datasets/regional_data?region=Bretagne,Corse', None),
+        ('GET', '/api/datasets/health_impact_data?annee_debut=2018', None),
+        ('POST', '/api/batch', {'requetes': [{'dataset': 'historical_data', 'annee_debut': 2020},
+                                             {'dataset': 'international_comparison', 'pays': 'France'},
+                                             {'dataset': 'policy_timeline'}]}),
+    ]
+    etags = {}
+    lock = threading.Lock()
+
+    def call(i):
+        method, path, payload = targets[i % len(targets)]
+        headers = {'Accept-Encoding': 'gzip'}
+        with lock:
+            if i % 2 and path in etags:
+                headers['If-None-Match'] = etags[path]
+        data = json.dumps(payload).encode('utf-8') if payload is not None else None
+        request = urllib.request.Request(base_url + path, data=data, headers=headers, method=method)
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                status, etag = response.status, response.headers.get('ETag')
+        except urllib.error.HTTPError as error:
+            status, etag = error.code, error.headers.get('ETag')
+        except OSError:
+            status, etag = 'erreur_reseau', None
+        elapsed = (time.perf_counter() - start) * 1000
+        if etag:
+            with lock:
+                etags[path] = etag
+        return status, elapsed
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(call, range(requests)))
+    duration = time.perf_counter() - start
+
+    latencies = np.array([elapsed for _, elapsed in results])
+    statuses = {}
+    for status, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    return {
+        'requetes': requests,
+        'req_par_s': round(requests / duration, 1),
+        'p50_ms': round(float(np.percentile(latencies, 50)), 2),
+        'p95_ms': round(float(np.percentile(latencies, 95)), 2),
+        'p99_ms': round(float(np.percentile(latencies, 99)), 2),
+        'statuts': statuses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API JSON locale sur les jeux de données du dashboard")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--load-test', metavar='URL', help="charge une API déjà démarrée")
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    args = parser.parse_args()
+
+    if args.load_test:
+        print(json.dumps(load_test(args.load_test, args.requests, args.concurrency), indent=2))
+        return
+
+    from Dashboard import current_data_version, load_shared_datasets
+    api = DataAPI(lambda: load_shared_datasets(current_data_version()))
+    server = api.serve(args.host, args.port)
+    print(f"API des données sur http://{args.host}:{args.port}/api/datasets")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,261 @@
+"""Chargement colonnaire des jeux de données du dashboard
+
+Chaque jeu de données est une entrée du chargeur : un fichier Arrow (Feather v2)
+ou Parquet lu par memory mapping, avec projection de colonnes, et une source
+intégrée utilisée tant que le fichier n'existe pas. Seules les colonnes
+demandées sont matérialisées, et chaque projection n'est lue qu'une fois.
+
+Le magasin est partagé par toutes les sessions et immuable : les colonnes
+reposent sur des tampons Arrow en lecture seule (sources intégrées comprises)
+et chaque appel reçoit une vue ; avec le copy-on-write de pandas, seule une
+session qui modifie sa vue en obtient une copie.
+
+Un schéma de types (dataset_schema.py) peut être déclaré par jeu de données :
+il est appliqué et validé au chargement, et les octets avant / après typage
+sont relevés par jeu de données.
+"""
+import hashlib
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from dataset_schema import apply_schema
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow est optionnel : repli sur les sources intégrées
+    pa = None
+    feather = None
+    pq = None
+
+
+def shared_view(value):
+    """Vue d'une table partagée (copie superficielle, sans copie des données)"""
+    return value.copy(deep=False) if isinstance(value, pd.DataFrame) else value
+
+
+def arrow_backed(frame):
+    """Même table, colonnes déplacées dans des tampons Arrow immuables"""
+    if pa is None:
+        return frame
+    return pa.Table.from_pandas(frame, preserve_index=False).to_pandas(split_blocks=True)
+
+
+class ColumnarDataLoader:
+    """Registre de jeux de données colonnaires chargés à la demande"""
+
+    def __init__(self, data_dir, schemas=None):
+        self.data_dir = data_dir
+        # Types déclarés par jeu de données (dataset_schema.SCHEMAS)
+        self.schemas = schemas or {}
+        self._sources = {}
+        self._frames = {}
+        # Octets (avant, après) typage de la table complète, par (nom, signature)
+        self._typed_bytes = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, filename, builtin=None):
+        """Déclare un jeu de données : fichier colonnaire et source intégrée de repli"""
+        self._sources[name] = (filename, builtin)
+
+    @property
+    def names(self):
+        return list(self._sources)
+
+    def available(self, name):
+        """Vrai si le jeu de données a un fichier ou une source intégrée"""
+        return self._file_signature(name) is not None or self._sources[name][1] is not None
+
+    def path(self, name):
+        return os.path.join(self.data_dir, self._sources[name][0])
+
+    def _file_signature(self, name):
+        if feather is None:
+            return None
+        try:
+            stat = os.stat(self.path(name))
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def signature(self, name):
+        """Signature d'un jeu de données : taille et date du fichier, ou 'builtin'"""
+        signature = self._file_signature(name)
+        return f"{signature[0]}:{signature[1]}" if signature else 'builtin'
+
+    def fingerprint(self):
+        """Empreinte des fichiers présents (taille, date) : change dès qu'un fichier change"""
+        parts = [f"{name}:{self.signature(name)}" for name in self._sources]
+        return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()[:10]
+
+    def load(self, name, columns=None):
+        """Retourne le jeu de données, restreint aux colonnes demandées"""
+        columns = tuple(columns) if columns is not None else None
+        signature = self._file_signature(name)
+        key = (name, columns, signature)
+
+        with self._lock:
+            frame = self._frames.get(key)
+        if frame is not None:
+            return shared_view(frame)
+
+        if signature is not None:
+            frame, sizes = self._typed(name, self._read_file(self.path(name), columns), columns is None)
+        else:
+            frame, sizes = self._read_builtin(name, columns), None
+
+        with self._lock:
+            # Les projections d'une version précédente du fichier sont libérées
+            for stale in [k for k in self._frames if k[0] == name and k[2] not in (signature, None)]:
+                del self._frames[stale]
+            for stale in [k for k in self._typed_bytes if k[0] == name and k[1] not in (signature, None)]:
+                del self._typed_bytes[stale]
+            self._frames[key] = frame
+            # Une projection ne compte pas : le rapport porte sur la table complète
+            if sizes is not None and columns is None:
+                self._typed_bytes[(name, signature)] = sizes
+        return shared_view(frame)
+
+    def _typed(self, name, frame, complete):
+        """Table aux types déclarés du jeu de données, et ses octets (avant, après)"""
+        schema = self.schemas.get(name)
+        if not schema:
+            return frame, None
+        typed = apply_schema(frame, schema, name, complete)
+        return typed, (int(frame.memory_usage(deep=True).sum()), int(typed.memory_usage(deep=True).sum()))
+
+    def _read_file(self, path, columns):
+        columns = list(columns) if columns is not None else None
+        if path.endswith('.parquet'):
+            table = pq.read_table(path, columns=columns, memory_map=True)
+        else:
+            table = feather.read_table(path, columns=columns, memory_map=True)
+        return table.to_pandas(split_blocks=True)
+
+    def _read_builtin(self, name, columns):
+        builtin = self._sources[name][1]
+        if builtin is None:
+            raise FileNotFoundError(f"Jeu de données introuvable: {self.path(name)}")
+
+        # La source intégrée complète est construite une seule fois
+        full_key = (name, None, None)
+        with self._lock:
+            frame = self._frames.get(full_key)
+        if frame is None:
+            frame, sizes = self._typed(name, pd.DataFrame(builtin()), True)
+            frame = arrow_backed(frame)
+            with self._lock:
+                self._frames[full_key] = frame
+                if sizes is not None:
+                    self._typed_bytes[(name, None)] = sizes
+        return frame if columns is None else frame[list(columns)]
+
+    def builtin_frames(self):
+        """Sources intégrées déjà construites, par jeu de données"""
+        with self._lock:
+            return {name: frame for (name, columns, signature), frame in self._frames.items()
+                    if columns is None and signature is None}
+
+    def builtin_typed_bytes(self):
+        """Octets (avant, après) typage des sources intégrées déjà construites"""
+        with self._lock:
+            return {name: sizes for (name, signature), sizes in self._typed_bytes.items()
+                    if signature is None}
+
+    def preload(self, frames, typed_bytes=None):
+        """Reprend des sources intégrées construites ailleurs (instantané d'un autre processus)"""
+        with self._lock:
+            for name, frame in frames.items():
+                if name in self._sources and (name, None, None) not in self._frames:
+                    self._frames[(name, None, None)] = frame
+                    if typed_bytes and name in typed_bytes:
+                        self._typed_bytes[(name, None)] = typed_bytes[name]
+
+    def export(self, name, path=None):
+        """Écrit le jeu de données courant au format Arrow (non compressé, mappable)"""
+        if feather is None:
+            raise ImportError("pyarrow est requis pour écrire les fichiers Arrow")
+        path = path or self.path(name)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        feather.write_feather(self.load(name), path, compression='uncompressed')
+        return path
+
+    def frames(self):
+        """Tables chargées (toutes projections), pour repérer les tampons partagés"""
+        with self._lock:
+            return list(self._frames.values())
+
+    def schema_report(self):
+        """Octets avant / après typage de la table complète, par jeu de données
+
+        Un seul chiffre par jeu de données, quel que soit le nombre de projections
+        en cache ; le fichier courant l'emporte sur la source intégrée. Les jeux
+        de données dont seules des projections ont été lues n'y figurent pas.
+        """
+        with self._lock:
+            items = list(self._typed_bytes.items())
+            signatures = {name: signature for (name, _, signature) in self._frames if signature is not None}
+        report = {}
+        for (name, signature), (before, after) in items:
+            if signature == signatures.get(name):
+                report[name] = {'avant': before, 'apres': after}
+        return report
+
+    def memory_usage(self):
+        """Octets résidents des projections chargées, par jeu de données"""
+        usage = {}
+        with self._lock:
+            items = list(self._frames.items())
+        for (name, _, _), frame in items:
+            usage[name] = usage.get(name, 0) + int(frame.memory_usage(deep=True).sum())
+        return usage
+
+
+class SortedYearIndex:
+    """Index trié sur les années d'un jeu de données
+
+    Les bornes d'une période sont trouvées par recherche dichotomique ; quand
+    les lignes sont déjà triées, le résultat est une tranche positionnelle
+    (une vue) plutôt qu'un masque booléen sur toute la table.
+    """
+
+    def __init__(self, years):
+        years = np.asarray(years)
+        if len(years) > 1 and not bool(np.all(years[:-1] <= years[1:])):
+            self.order = np.argsort(years, kind='stable')
+            self.keys = years[self.order]
+        else:
+            self.order = None
+            self.keys = years
+
+    @property
+    def first(self):
+        return int(self.keys[0]) if len(self.keys) else None
+
+    @property
+    def last(self):
+        return int(self.keys[-1]) if len(self.keys) else None
+
+    def bounds(self, start=None, end=None):
+        """Positions [lo, hi) des lignes dont l'année est comprise dans [start, end]"""
+        lo = 0 if start is None else int(np.searchsorted(self.keys, start, side='left'))
+        hi = len(self.keys) if end is None else int(np.searchsorted(self.keys, end, side='right'))
+        return lo, max(lo, hi)
+
+    def slice(self, frame, start=None, end=None):
+        """Lignes de `frame` dans la période, sans parcourir toute la table"""
+        lo, hi = self.bounds(start, end)
+        if self.order is None:
+            return frame.iloc[lo:hi]
+        return frame.take(self.order[lo:hi])
+
+    def row(self, frame, year):
+        """Ligne d'une année donnée, ou None si l'année est absente"""
+        lo, hi = self.bounds(year, year)
+        if lo == hi:
+            return None
+        return frame.iloc[lo if self.order is None else int(self.order[lo])]
@@ -0,0 +1,161 @@
+"""Types compacts déclarés par jeu de données
+
+Les sources intégrées et les fichiers arrivent en float64 / int64 / chaînes ;
+chaque jeu de données déclare ici le type de ses colonnes, appliqué et validé
+au chargement par ColumnarDataLoader :
+
+- catégories pour les libellés répétés (région, pays, type de politique),
+- float32 pour les mesures (7 chiffres significatifs, au-delà de la précision des sources),
+- float64 pour les montants en euros (recettes, coûts, ventes),
+- int16 / int8 pour les années et les mois, int32 pour les effectifs,
+- float64 pour les volumes cumulés (paquets vendus), au-delà de int32,
+- datetime64 pour les dates des politiques.
+
+Une valeur qui ne tient pas dans le type déclaré (année non entière, effectif
+hors bornes, date illisible…) lève SchemaError plutôt que d'être tronquée. Les
+colonnes non déclarées (textes libres, codes uniques) gardent leur type.
+
+Usage :
+    python dataset_schema.py        octets avant / après typage, par jeu de données
+"""
+import numpy as np
+import pandas as pd
+
+YEAR = 'int16'
+MONTH = 'int8'
+COUNT = 'int32'
+FLAG = 'int8'
+MEASURE = 'float32'
+# Montants en euros : la précision de float32 (7 chiffres) ne suffit pas
+AMOUNT = 'float64'
+# Volumes cumulés (paquets vendus) : un total annuel dépasse int32 ; float64 comme à l'ingestion
+# des extraits, entier exact jusqu'à 2**53
+LARGE_COUNT = 'float64'
+LABEL = 'category'
+DATE = 'datetime64[s]'
+# Chiffres significatifs restitués d'une mesure float32
+FLOAT32_DIGITS = 7
+
+SCHEMAS = {
+    'historical_data': {
+        'annee': YEAR, 'prevalence_tabagisme': MEASURE, 'fumeurs_quotidiens': MEASURE,
+        'consommation_cigarettes': MEASURE, 'prix_moyen': MEASURE, 'recettes_fiscales': AMOUNT,
+    },
+    'policy_timeline': {'date': DATE, 'type': LABEL},
+    'regional_data': {
+        'region': LABEL, 'prevalence_2023': MEASURE, 'evolution_2010_2023': MEASURE,
+        'fumeurs_quotidiens': MEASURE, 'tabagisme_passif': MEASURE,
+    },
+    'international_comparison': {
+        'pays': LABEL, 'prevalence_tabagisme': MEASURE, 'prix_paquet_eur': MEASURE,
+        'mortalite_liee_tabac': COUNT, 'depenses_prevention': MEASURE, 'interdiction_publicite': FLAG,
+    },
+    'international_panel': {
+        'pays': LABEL, 'annee': YEAR, 'prevalence_tabagisme': MEASURE, 'depenses_prevention': MEASURE,
+    },
+    'health_impact_data': {
+        'annee': YEAR, 'deces_tabac': COUNT, 'cancers_poumon': COUNT, 'maladies_cardiovasculaires': COUNT,
+        'couts_sante': AMOUNT, 'annees_vie_perdues': MEASURE,
+    },
+    'ventes_mensuelles': {
+        'source': LABEL, 'annee': YEAR, 'mois': MONTH, 'paquets': LARGE_COUNT,
+        'montant_ttc': AMOUNT, 'montant_taxes': AMOUNT,
+    },
+    'departemental_data': {'prevalence': MEASURE},
+    'communal_data': {'prevalence': MEASURE},
+    'regional_series': {'region': LABEL, 'annee': YEAR, 'prevalence': MEASURE},
+}
+
+
+class SchemaError(ValueError):
+    """Jeu de données incompatible avec son schéma déclaré"""
+
+
+def cast_column(values, dtype):
+    """Colonne convertie au type déclaré, ou SchemaError si la conversion perdrait des valeurs"""
+    if str(values.dtype) == dtype:
+        return values
+    if dtype == LABEL:
+        return values.astype('category')
+    if dtype.startswith('datetime64'):
+        try:
+            return pd.to_datetime(values, format='ISO8601').astype(dtype)
+        except (TypeError, ValueError) as error:
+            raise SchemaError(f"dates illisibles ({error})")
+
+    numbers = pd.to_numeric(values, errors='coerce')
+    invalid = numbers.isna() & values.notna()
+    if invalid.any():
+        raise SchemaError(f"valeurs non numériques: {values[invalid].head(3).tolist()}")
+    array = numbers.to_numpy(dtype=float)
+    finite = array[np.isfinite(array)]
+    if np.issubdtype(np.dtype(dtype), np.integer):
+        info = np.iinfo(dtype)
+        if len(finite) < len(array):
+            raise SchemaError(f"valeurs manquantes dans une colonne {dtype}")
+        if not np.array_equal(finite, np.round(finite)):
+            raise SchemaError(f"valeurs non entières dans une colonne {dtype}")
+        if len(finite) and (finite.min() < info.min or finite.max() > info.max):
+            raise SchemaError(f"valeurs hors de [{info.min}, {info.max}] ({dtype})")
+    elif len(finite) and np.abs(finite).max() > np.finfo(dtype).max:
+        raise SchemaError(f"valeurs hors de la plage de {dtype}")
+    return pd.Series(array.astype(dtype), index=values.index, name=values.name)
+
+
+def apply_schema(frame, schema, name='', complete=True):
+    """Table aux types déclarés ; `complete` : toutes les colonnes du schéma doivent être présentes"""
+    missing = [column for column in schema if column not in frame.columns]
+    if complete and missing:
+        raise SchemaError(f"{name}: colonnes absentes du schéma déclaré: {', '.join(missing)}")
+    columns = {}
+    for column, dtype in schema.items():
+        if column not in frame.columns or str(frame[column].dtype) == dtype:
+            continue
+        try:
+            columns[column] = cast_column(frame[column], dtype)
+        except SchemaError as error:
+            raise SchemaError(f"{name}.{column}: {error}") from None
+    return frame.assign(**columns) if columns else frame
+
+
+def decimal_values(values):
+    """Valeurs en float64 ; un float32 est arrondi à ses 7 chiffres significatifs (20.9 et non 20.8999996)"""
+    array = np.asarray(values)
+    if array.dtype != np.float32:
+        return pd.to_numeric(pd.Series(array), errors='coerce').to_numpy(dtype=float)
+    wide = array.astype(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        magnitude = np.floor(np.log10(np.abs(wide)))
+        scale = 10.0 ** np.where(np.isfinite(magnitude), FLOAT32_DIGITS - 1 - magnitude, 0)
+        return np.where(np.isfinite(magnitude), np.round(wide * scale) / scale, wide)
+
+
+def decimal_floats(frame):
+    """Table aux colonnes float32 élargies par decimal_values"""
+    columns = {column: decimal_values(frame[column].to_numpy())
+               for column in frame.columns if frame[column].dtype == np.float32}
+    return frame.assign(**columns) if columns else frame
+
+
+def main():
+    from Dashboard import get_data_loader
+    from memory_report import format_bytes
+
+    loader = get_data_loader()
+    for name in loader.names:
+        if loader.available(name):
+            loader.load(name)
+    report = loader.schema_report()
+    width = max(map(len, report), default=0)
+    for name, sizes in report.items():
+        saved = sizes['avant'] - sizes['apres']
+        share = saved / sizes['avant'] if sizes['avant'] else 0
+        print(f"{name:<{width}}  {format_bytes(sizes['avant']):>9} -> {format_bytes(sizes['apres']):>9}"
+              f"  économie {format_bytes(saved)} ({share:.0%})")
+    before = sum(sizes['avant'] for sizes in report.values())
+    after = sum(sizes['apres'] for sizes in report.values())
+    print(f"{'total':<{width}}  {format_bytes(before):>9} -> {format_bytes(after):>9}")
+
+
+if __name__ == '__main__':
+    main()
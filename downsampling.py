@@ -0,0 +1,148 @@
+"""Sous-échantillonnage des séries temporelles longues (LTTB)
+
+Largest-Triangle-Three-Buckets : le premier et le dernier point sont gardés, les
+autres sont répartis en seaux de taille égale ; dans chaque seau, on retient le
+point qui forme le plus grand triangle avec le point retenu au seau précédent et
+la moyenne du seau suivant. Les pics et les creux survivent, contrairement à un
+pas régulier.
+
+Le choix dans un seau dépend du seau précédent ; ici tous les seaux sont traités
+à la fois, par passes successives (ancre = moyenne du seau précédent, puis point
+qu'il a retenu à la passe précédente) jusqu'à ce que plus aucun choix ne change :
+ce point fixe est le résultat de l'algorithme séquentiel. Il peut demander
+jusqu'à une passe par seau (séries plates ou binaires, où les ex aequo se
+propagent de proche en proche) : au-delà de MAX_PASSES passes sans convergence,
+les choix sont refaits seau par seau, dans l'ordre.
+
+Une pyramide de résolutions (MAX_POINTS, x4, x16, ...) est précalculée par
+série ; l'affichage d'une période prend le niveau le plus fin qui tient dans le
+budget de points de la vue.
+"""
+import numpy as np
+
+# Points par trace au-delà desquels une série est sous-échantillonnée
+MAX_POINTS = 2000
+# Rapport de taille entre deux niveaux de la pyramide
+LEVEL_FACTOR = 4
+# Points par trace au-delà desquels le rendu passe en WebGL (Scattergl)
+WEBGL_THRESHOLD = 1000
+# Passes vectorisées avant le repli séquentiel (quelques-unes suffisent en général)
+MAX_PASSES = 32
+
+
+def numeric_axis(values):
+    """Axe x en flottants (dates en nanosecondes)"""
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        values = values.astype('datetime64[ns]').astype(np.int64)
+    return values.astype(float)
+
+
+def lttb_indices(x, y, n_out):
+    """Positions des n_out points retenus (x trié), en ordre croissant"""
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1])
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    # Seaux [edges[i], edges[i+1]) sur les points intérieurs, en matrice complétée : (seaux, largeur)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    starts, stops = edges[:-1], edges[1:]
+    width = int((stops - starts).max())
+    members = starts[:, None] + np.arange(width)
+    inside = members < stops[:, None]
+    members = np.minimum(members, n - 2)
+    bx, by = x[members], y[members]
+    valid = inside & np.isfinite(by)
+
+    # Moyenne de chaque seau ; le seau qui suit le dernier est le dernier point
+    counts = np.maximum(valid.sum(axis=1), 1)
+    mean_x = np.where(valid, bx, 0.0).sum(axis=1) / counts
+    mean_y = np.where(valid, by, 0.0).sum(axis=1) / counts
+    next_x = np.append(mean_x[1:], x[-1])
+    next_y = np.append(mean_y[1:], y[-1] if np.isfinite(y[-1]) else mean_y[-1])
+
+    anchor_x = np.insert(mean_x[:-1], 0, x[0])
+    anchor_y = np.insert(mean_y[:-1], 0, y[0] if np.isfinite(y[0]) else mean_y[0])
+    picked = None
+    for _ in range(MAX_PASSES):
+        area = np.abs((anchor_x - next_x)[:, None] * (by - anchor_y[:, None])
+                      - (anchor_x[:, None] - bx) * (next_y - anchor_y)[:, None])
+        chosen = np.argmax(np.where(valid, area, -1.0), axis=1)
+        previous, picked = picked, members[np.arange(len(members)), chosen]
+        if previous is not None and np.array_equal(previous, picked):
+            break
+        anchor_x = np.insert(x[picked[:-1]], 0, x[0])
+        anchor_y = np.insert(y[picked[:-1]], 0, anchor_y[0])
+    else:
+        # Pas de point fixe : les seaux qui suivent le premier choix instable sont refaits dans l'ordre
+        unstable = np.flatnonzero(previous != picked)
+        picked = sequential_picks(x, y, members, valid, next_x, next_y, picked, int(unstable[0]),
+                                  anchor_y[0])
+    return np.concatenate([[0], picked, [n - 1]])
+
+
+def sequential_picks(x, y, members, valid, next_x, next_y, picked, first, start_y):
+    """Choix LTTB seau par seau à partir du seau `first`, ceux qui le précèdent étant acquis"""
+    picked = picked.copy()
+    for i in range(first, len(members)):
+        ax, ay = (x[0], start_y) if i == 0 else (x[picked[i - 1]], y[picked[i - 1]])
+        bx, by = x[members[i]], y[members[i]]
+        area = np.abs((ax - next_x[i]) * (by - ay) - (ax - bx) * (next_y[i] - ay))
+        picked[i] = members[i][np.argmax(np.where(valid[i], area, -1.0))]
+    return picked
+
+
+class ResolutionPyramid:
+    """Niveaux LTTB précalculés d'un jeu de données (axe x, colonnes y)
+
+    Chaque niveau est un ensemble de positions de lignes triées par x : l'union
+    des points retenus pour chaque colonne, de sorte qu'une seule table serve à
+    toutes les traces d'une figure.
+    """
+
+    def __init__(self, x, columns, max_points=MAX_POINTS, factor=LEVEL_FACTOR):
+        x = np.asarray(x)
+        self.order = np.argsort(x, kind='stable')
+        self.keys = x[self.order]
+        self.max_points = max_points
+        numeric = numeric_axis(self.keys)
+        n = len(numeric)
+
+        sizes = []
+        size = max_points
+        while size < n:
+            sizes.append(size)
+            size *= factor
+        # levels[k] : positions (dans l'ordre trié) du niveau k, du plus grossier au plus fin
+        self.levels = []
+        for size in sizes:
+            picked = [lttb_indices(numeric, values[self.order], size) for values in columns.values()]
+            self.levels.append(np.unique(np.concatenate(picked)) if picked else np.arange(n))
+        self.n_columns = max(len(columns), 1)
+
+    def rows(self, start=None, end=None, max_points=None):
+        """Positions des lignes à afficher pour la période [start, end]"""
+        budget = (max_points or self.max_points) * self.n_columns
+        lo = 0 if start is None else int(np.searchsorted(self.keys, start, side='left'))
+        hi = len(self.keys) if end is None else int(np.searchsorted(self.keys, end, side='right'))
+        if hi - lo <= budget:
+            return self.order[lo:hi]
+        for level in reversed(self.levels):
+            first, last = np.searchsorted(level, [lo, hi])
+            if last - first <= budget or level is self.levels[0]:
+                return self.order[level[first:last]]
+        return self.order[lo:hi]
+
+    def view(self, frame, start=None, end=None, max_points=None):
+        """Lignes de `frame` (la table complète) à afficher pour la période"""
+        return frame.take(self.rows(start, end, max_points))
+
+
+def scatter_class(points):
+    """Classe de trace adaptée au nombre de points (WebGL au-delà de WEBGL_THRESHOLD)"""
+    import plotly.graph_objects as go
+    return go.Scattergl if points > WEBGL_THRESHOLD else go.Scatter
@@ -0,0 +1,133 @@
+"""Export complet de l'analyse : figures HTML/JSON et données CSV dans une archive zip
+
+Les figures sont construites en parallèle dans un pool de processus (qui
+réutilise le cache disque des figures) et écrites dans l'archive au fil de
+l'eau. L'export tourne dans un thread d'arrière-plan : la session interactive
+ne fait que consulter l'état de la tâche.
+"""
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from dataset_schema import decimal_floats
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_worker_dashboard = None
+
+
+def entry_name(section, figure_id, params):
+    """Nom de fichier d'une figure ; les paramètres scalaires (série, niveau…) le distinguent"""
+    suffix = ''.join(f"_{value}" for _, value in sorted(params.items())
+                     if isinstance(value, (str, int, float)) and not isinstance(value, bool))
+    return f"{section}_{figure_id}{suffix}".replace(' ', '-').replace('/', '-')
+
+
+def render_figure(section, figure_id, params, controls):
+    """Construit une figure dans un processus du pool ; retourne (nom, html, json)
+
+    `params` sont les paramètres de l'onglet (série, territoire, curseurs du
+    simulateur…), passés tels quels à figure_<section>_<id>.
+    """
+    global _worker_dashboard
+    import plotly.io as pio
+
+    if _worker_dashboard is None:
+        from Dashboard import TobaccoDashboard
+        _worker_dashboard = TobaccoDashboard()
+    _worker_dashboard.apply_controls(controls)
+
+    payload = _worker_dashboard.figure_json(section, figure_id, **params)
+    html = pio.from_json(payload).to_html(include_plotlyjs='directory', full_html=True)
+    return entry_name(section, figure_id, params), html, payload
+
+
+class ExportEngine:
+    """Exports exécutés en arrière-plan, mémoïsés par (version des données, contrôles)"""
+
+    def __init__(self, export_dir, max_workers=None):
+        self.export_dir = export_dir
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self._pool = None
+        self._runner = ThreadPoolExecutor(max_workers=1, thread_name_prefix='export')
+        self._jobs = {}
+        self._lock = threading.Lock()
+        os.makedirs(export_dir, exist_ok=True)
+
+    def _process_pool(self):
+        # spawn : le serveur Streamlit est multi-thread, fork n'y est pas sûr
+        if self._pool is None:
+            # Les processus lancés héritent de sys.path : ils doivent trouver le dashboard
+            if BASE_DIR not in sys.path:
+                sys.path.insert(0, BASE_DIR)
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                             mp_context=multiprocessing.get_context('spawn'))
+        return self._pool
+
+    def submit(self, key, figures, controls, datasets, metadata):
+        """Lance (ou réutilise) l'export ; retourne un Future du chemin de l'archive"""
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None or self._failed(job):
+                job = self._jobs[key] = self._runner.submit(
+                    self._export, key, figures, controls, datasets, metadata)
+            return job
+
+    @staticmethod
+    def _failed(job):
+        """Tâche terminée en erreur, ou dont l'archive a disparu"""
+        return job.done() and (job.exception() is not None or not os.path.exists(job.result()))
+
+    def job(self, key):
+        with self._lock:
+            return self._jobs.get(key)
+
+    def _export(self, key, figures, controls, datasets, metadata):
+        import plotly.offline
+
+        path = os.path.join(self.export_dir, f"analyse_tabac_{key[:12]}.zip")
+        tmp_path = f"{path}.tmp"
+        pool = self._process_pool()
+        futures = [pool.submit(render_figure, section, figure_id, params, controls)
+                   for section, figure_id, params in figures]
+
+        entries = []
+        try:
+            with zipfile.ZipFile(tmp_path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+                archive.writestr('figures/plotly.min.js', plotly.offline.get_plotlyjs())
+                for name, frame in datasets.items():
+                    archive.writestr(f'donnees/{name}.csv', decimal_floats(frame).to_csv(index=False))
+
+                # Chaque figure est écrite dès qu'elle est prête
+                for future in as_completed(futures):
+                    name, html, payload = future.result()
+                    archive.writestr(f'figures/{name}.html', html)
+                    archive.writestr(f'figures/{name}.json', payload)
+                    entries.append(name)
+
+                entries.sort()
+                links = ''.join(f'<li><a href="figures/{name}.html">{name}</a> '
+                                f'(<a href="figures/{name}.json">json</a>)</li>' for name in entries)
+                archive.writestr('index.html', '<!DOCTYPE html><html><head><meta charset="utf-8">'
+                                               '<title>Analyse Tabac France</title></head><body>'
+                                               f'<h1>Analyse Tabac France</h1><ul>{links}</ul></body></html>')
+                archive.writestr('manifest.json', json.dumps(
+                    dict(metadata, figures=entries, genere_le=datetime.now().isoformat(timespec='seconds')),
+                    ensure_ascii=False, indent=2))
+        except Exception:
+            # Archive incomplète : supprimée, et les figures non commencées abandonnées
+            for future in futures:
+                future.cancel()
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        os.replace(tmp_path, path)
+        return path
@@ -0,0 +1,197 @@
+"""Cache à deux niveaux des figures Plotly sérialisées
+
+Niveau 1 : LRU en mémoire borné en octets.
+Niveau 2 : fichiers JSON sur disque, qui survivent aux redémarrages du serveur.
+Les entrées évincées de la mémoire restent disponibles sur le disque ; une
+lecture sur disque rafraîchit la date du fichier, si bien que l'élagage du disque
+supprime les figures les moins récemment utilisées.
+
+Une figure demandée par plusieurs threads à la fois n'est construite qu'une
+fois : les autres attendent sa construction puis la lisent dans le cache.
+
+L'occupation du disque est tenue à jour à chaque écriture ; le répertoire n'est
+parcouru que lorsqu'elle dépasse le budget (on redescend alors sous
+DISK_PRUNE_TARGET du budget) ou toutes les DISK_RESYNC_WRITES écritures, pour
+prendre en compte les fichiers écrits par les autres processus.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+# Après dépassement du budget disque, part du budget à laquelle on redescend
+DISK_PRUNE_TARGET = 0.9
+# Écritures entre deux parcours du répertoire (fichiers des autres processus)
+DISK_RESYNC_WRITES = 500
+
+
+class FigureCache:
+    """Mémoïse les figures sérialisées par clé (section, figure, version, contrôles)"""
+
+    def __init__(self, max_memory_bytes=64 * 1024 * 1024, cache_dir=None,
+                 max_disk_bytes=512 * 1024 * 1024):
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()
+        # Constructions en cours, par clé : les demandes concurrentes attendent l'événement
+        self._building = {}
+        self._memory_bytes = 0
+        # Octets sur disque (None : pas encore mesurés) et écritures depuis le dernier parcours
+        self._disk_bytes = None
+        self._disk_writes = 0
+        self._lock = threading.Lock()
+        self.counters = {'hits': 0, 'disk_hits': 0, 'misses': 0,
+                         'evictions': 0, 'disk_evictions': 0}
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(*parts):
+        """Clé stable (indépendante du processus) à partir des composantes"""
+        return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+    def get_or_build(self, key, build):
+        """Retourne la figure JSON en cache, ou la construit via `build()`"""
+        while True:
+            with self._lock:
+                payload = self._entries.get(key)
+                if payload is not None:
+                    self._entries.move_to_end(key)
+                    self.counters['hits'] += 1
+                    return payload
+                building = self._building.get(key)
+                if building is None:
+                    building = self._building[key] = threading.Event()
+                    break
+            # Construite par un autre thread : on la relit une fois prête (ou on la construit s'il a échoué)
+            building.wait()
+
+        try:
+            payload = self._read_disk(key)
+            if payload is not None:
+                with self._lock:
+                    self.counters['disk_hits'] += 1
+                    self._store_memory(key, payload)
+                return payload
+
+            payload = build()
+            with self._lock:
+                self.counters['misses'] += 1
+                self._store_memory(key, payload)
+            self._write_disk(key, payload)
+            return payload
+        finally:
+            with self._lock:
+                del self._building[key]
+            building.set()
+
+    def __contains__(self, key):
+        with self._lock:
+            if key in self._entries:
+                return True
+        return bool(self.cache_dir) and os.path.exists(self._path(key))
+
+    def stats(self):
+        """Compteurs et occupation du cache"""
+        with self._lock:
+            return dict(self.counters,
+                        entries=len(self._entries),
+                        memory_bytes=self._memory_bytes,
+                        max_memory_bytes=self.max_memory_bytes)
+
+    def clear(self):
+        """Vide le niveau mémoire (le disque est conservé)"""
+        with self._lock:
+            self._entries.clear()
+            self._memory_bytes = 0
+
+    def _store_memory(self, key, payload):
+        size = len(payload)
+        if size > self.max_memory_bytes:
+            return
+        if key in self._entries:
+            self._memory_bytes -= len(self._entries.pop(key))
+        self._entries[key] = payload
+        self._memory_bytes += size
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self.counters['evictions'] += 1
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _read_disk(self, key):
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                payload = f.read()
+        except OSError:
+            return None
+        try:
+            # Date d'accès pour l'élagage : le disque est un LRU, pas une file
+            os.utime(path)
+        except OSError:
+            pass
+        return payload
+
+    def _write_disk(self, key, payload):
+        if not self.cache_dir:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(payload)
+            size = os.path.getsize(tmp_path)
+            try:
+                # Un fichier remplacé libère sa taille
+                size -= os.path.getsize(path)
+            except OSError:
+                pass
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+        with self._lock:
+            self._disk_writes += 1
+            if self._disk_bytes is not None:
+                self._disk_bytes += size
+            rescan = (self._disk_bytes is None or self._disk_bytes > self.max_disk_bytes
+                      or self._disk_writes >= DISK_RESYNC_WRITES)
+        if rescan:
+            self._prune_disk()
+
+    def _prune_disk(self):
+        """Mesure le répertoire et supprime les fichiers les moins récemment utilisés au-delà du budget disque"""
+        try:
+            files = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+                     if name.endswith('.json')]
+        except OSError:
+            return
+        stats = []
+        for path in files:
+            try:
+                stats.append((os.stat(path), path))
+            except OSError:
+                continue
+        stats.sort(key=lambda item: item[0].st_mtime)
+        total = sum(stat.st_size for stat, _ in stats)
+        target = self.max_disk_bytes * DISK_PRUNE_TARGET if total > self.max_disk_bytes else total
+        evicted = 0
+        for stat, path in stats:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= stat.st_size
+            evicted += 1
+        with self._lock:
+            self._disk_bytes = total
+            self._disk_writes = 0
+            self.counters['disk_evictions'] += evicted
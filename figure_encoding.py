@@ -0,0 +1,191 @@
+"""Encodage compact des figures Plotly envoyées au navigateur
+
+Les tableaux numériques des traces sont réécrits au plus court :
+- précision arrondie par tableau (décimales natives de la métrique, sinon
+  SIGNIFICANT_DIGITS chiffres significatifs),
+- entiers en tableaux typés base64 (int8/16/32),
+- coordonnées flottantes en float32 base64 quand c'est plus court que la liste JSON,
+- axe x régulier (années, mois) remplacé par x0/dx.
+
+Plotly.js décode nativement les tableaux typés ({"dtype", "bdata"}).
+
+Avant tout encodage, decimal_figure_json ramène les valeurs issues de colonnes
+float32 à leurs 7 chiffres significatifs (20.9 et non 20.899999618530273) :
+Plotly les sérialise en f4, ou en f8 une fois élargies (text, customdata).
+
+Un axe x irrégulier (ou de libellés) partagé par plusieurs traces reste répété
+dans chacune : le JSON Plotly n'a pas de référence entre tableaux, et les
+données d'un template ne sont pas reprises par les traces. Seuls les axes
+réguliers, les plus courants ici, sont ainsi dédupliqués.
+"""
+import base64
+import json
+from functools import lru_cache
+
+import numpy as np
+
+from dataset_schema import decimal_values
+
+SIGNIFICANT_DIGITS = 4
+MAX_DECIMALS = 3
+# En dessous de cette taille, un tableau est laissé tel quel
+MIN_LENGTH = 4
+# Tableaux dont les valeurs sont affichées via le format de l'axe (float32 sans effet visible)
+AXIS_KEYS = {'x', 'y', 'z', 'lat', 'lon', 'base'}
+# Traces qui acceptent x0/dx à la place de x
+REGULAR_X_TYPES = {'scatter', 'scattergl', 'bar'}
+INT_DTYPES = [('i1', np.int8), ('i2', np.int16), ('i4', np.int32)]
+
+
+def decode_array(value):
+    """Tableau NumPy d'un tableau typé ou d'une liste de nombres ; None sinon"""
+    if isinstance(value, dict) and 'bdata' in value and 'dtype' in value:
+        array = np.frombuffer(base64.b64decode(value['bdata']), dtype=value['dtype'])
+        if 'shape' in value:
+            array = array.reshape([int(n) for n in str(value['shape']).split(',')])
+        return array
+    if isinstance(value, list) and value and all(
+            isinstance(v, (int, float)) and not isinstance(v, bool) for v in value):
+        return np.asarray(value, dtype=float)
+    return None
+
+
+def typed_array(array, dtype):
+    spec = {'dtype': dtype, 'bdata': base64.b64encode(np.ascontiguousarray(array).tobytes()).decode('ascii')}
+    if array.ndim > 1:
+        spec['shape'] = ', '.join(str(n) for n in array.shape)
+    return spec
+
+
+def metric_decimals(array):
+    """Décimales utiles d'une métrique : celles des données si elles sont courtes, sinon significatives"""
+    finite = array[np.isfinite(array)]
+    if not finite.size:
+        return MAX_DECIMALS
+    for decimals in range(MAX_DECIMALS + 1):
+        if np.allclose(np.round(finite, decimals), finite, rtol=0, atol=1e-9):
+            return decimals
+    magnitude = int(np.floor(np.log10(max(float(np.abs(finite).max()), 1e-12))))
+    return max(0, SIGNIFICANT_DIGITS - 1 - magnitude)
+
+
+def encode_array(array, key):
+    """Représentation la plus courte d'un tableau numérique"""
+    array = np.asarray(array, dtype=float)
+    finite = np.isfinite(array)
+    rounded = np.round(array, metric_decimals(array))
+
+    if finite.all() and np.array_equal(rounded, np.round(rounded)):
+        for dtype, numpy_type in INT_DTYPES:
+            info = np.iinfo(numpy_type)
+            if rounded.min() >= info.min and rounded.max() <= info.max:
+                return typed_array(rounded.astype(numpy_type), dtype)
+
+    as_list = [float(v) if f else None for v, f in zip(rounded.ravel(), finite.ravel())]
+    as_list = [int(v) if v is not None and v.is_integer() else v for v in as_list]
+    if key not in AXIS_KEYS:
+        # Affiché tel quel dans les survols (customdata…) : pas de float32, décimales exactes en f8
+        return as_list if array.ndim == 1 else typed_array(rounded, 'f8')
+    as_typed = typed_array(rounded.astype(np.float32), 'f4')
+    if array.ndim == 1 and len(json.dumps(as_list)) <= len(json.dumps(as_typed)):
+        return as_list
+    return as_typed
+
+
+def decimal_array(array):
+    """Tableau float64 dont les valeurs représentables en float32 sont arrondies à 7 chiffres significatifs
+
+    Une valeur float64 exactement représentable en float32 vient (à l'arrondi
+    près de float32, donc sans effet visible) d'une colonne float32 élargie.
+    """
+    array = np.asarray(array)
+    if array.dtype == np.float32:
+        return decimal_values(array)
+    array = array.astype(float)
+    with np.errstate(over='ignore', invalid='ignore'):
+        narrow = array.astype(np.float32)
+        exact = np.isfinite(array) & (narrow.astype(float) == array) & (array != np.round(array))
+    if exact.any():
+        array = array.copy()
+        array[exact] = decimal_values(narrow[exact])
+    return array
+
+
+def decimal_value(value):
+    """Tableaux typés flottants, listes et nombres d'un objet JSON de figure, sans artefacts float32"""
+    if isinstance(value, dict):
+        if value.get('dtype') in ('f4', 'f8') and 'bdata' in value:
+            return dict(value, **typed_array(decimal_array(decode_array(value)), 'f8'))
+        return {key: decimal_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        array = decode_array(value)
+        if array is None:
+            return [decimal_value(item) for item in value]
+        widened = decimal_array(array).tolist()
+        return [item if isinstance(item, int) else wide for item, wide in zip(value, widened)]
+    if isinstance(value, float):
+        return decimal_array(np.array([value]))[0].item()
+    return value
+
+
+def decimal_figure_json(payload):
+    """Figure JSON (celle de fig.to_json()) aux valeurs float32 élargies en décimales"""
+    figure = json.loads(payload)
+    figure['data'] = decimal_value(figure.get('data', []))
+    # Le template (styles par défaut de Plotly) n'a pas de données
+    figure['layout'] = {key: value if key == 'template' else decimal_value(value)
+                        for key, value in figure.get('layout', {}).items()}
+    return json.dumps(figure)
+
+
+def regular_step(array):
+    """Pas constant d'une suite arithmétique, ou None"""
+    if array.ndim != 1 or len(array) < 3 or not np.isfinite(array).all():
+        return None
+    steps = np.diff(array)
+    if steps[0] != 0 and np.allclose(steps, steps[0], rtol=0, atol=1e-9):
+        return steps[0].item()
+    return None
+
+
+def compact_trace(trace):
+    """Réécrit les tableaux numériques d'une trace (et de ses sous-objets, ex. marker)"""
+    compact = {}
+    for key, value in trace.items():
+        if isinstance(value, dict) and 'bdata' not in value:
+            compact[key] = compact_trace(value)
+            continue
+        array = decode_array(value)
+        if array is None or array.size < MIN_LENGTH:
+            compact[key] = value
+            continue
+        compact[key] = encode_array(array, key)
+
+    x = decode_array(trace.get('x'))
+    if trace.get('type') in REGULAR_X_TYPES and x is not None and 'x0' not in trace:
+        step = regular_step(x)
+        if step is not None:
+            del compact['x']
+            compact['x0'] = x[0].item()
+            compact['dx'] = int(step) if float(step).is_integer() else step
+    return compact
+
+
+def compact_figure_json(payload):
+    """Figure JSON (celle de fig.to_json()) réencodée en mode compact"""
+    figure = json.loads(payload)
+    figure['data'] = [compact_trace(trace) for trace in figure.get('data', [])]
+    return json.dumps(figure, separators=(',', ':'))
+
+
+@lru_cache(maxsize=512)
+def wire_bytes(payload):
+    """Octets du spec que st.plotly_chart envoie pour cette figure JSON
+
+    Streamlit valide la figure (go.Figure) puis la resérialise : c'est cette
+    seconde sérialisation qui part vers le navigateur, pas `payload` lui-même.
+    """
+    import plotly.graph_objects as go
+    import plotly.io as pio
+    figure = go.Figure(**json.loads(payload)).to_dict()
+    return len(pio.to_json(figure, validate=False).encode('utf-8'))
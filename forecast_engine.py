@@ -0,0 +1,175 @@
+"""Projections de prévalence par simulation de Monte-Carlo
+
+Chaque série (France entière et chaque région) suit une marche aléatoire avec
+dérive en log-odds, estimée sur l'historique : la prévalence projetée reste dans ]0, 100[.
+Les trajectoires combinent l'incertitude sur la pente et des chocs annuels
+cumulés. Toutes les trajectoires et toutes les séries d'un bloc sont simulées
+en une seule opération NumPy ; les quantiles alimentent des graphiques en éventail.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+N_PATHS = 4000
+HORIZON_END = 2030
+# Objectif de prévalence (%) dont on estime la probabilité d'atteinte
+OBJECTIF = 5.0
+# Nombre maximal de valeurs simulées en mémoire à la fois (trajectoires x séries x années)
+BLOCK_VALUES = 4_000_000
+# Colonnes de regional_data : niveau d'une année, évolution entre deux années
+LEVEL_COLUMN = re.compile(r'prevalence_(\d{4})')
+EVOLUTION_COLUMN = re.compile(r'evolution_(\d{4})_(\d{4})')
+
+
+def logit(prevalence):
+    p = np.clip(np.asarray(prevalence, dtype=float) / 100, 1e-4, 1 - 1e-4)
+    return np.log(p / (1 - p))
+
+
+def expit(x):
+    return 100 / (1 + np.exp(-x))
+
+
+def fit_trend(years, prevalence):
+    """Marche aléatoire avec dérive en log-odds
+
+    Retourne (niveau observé la dernière année, dérive annuelle, erreur type
+    de la dérive, écart type des variations annuelles).
+    """
+    order = np.argsort(np.asarray(years))
+    y = logit(np.asarray(prevalence, dtype=float)[order])
+    steps = np.diff(y)
+    if len(steps) < 2:
+        return float(y[-1]), float(steps.mean()) if len(steps) else 0.0, 0.0, 0.0
+    drift = float(steps.mean())
+    sigma = float(steps.std(ddof=1))
+    return float(y[-1]), drift, sigma / np.sqrt(len(steps)), sigma
+
+
+def simulate(levels, drifts, drift_se, sigmas, horizon, n_paths=N_PATHS, rng=None):
+    """Trajectoires simulées en log-odds, de forme (trajectoires, séries, années)
+
+    float32 : la précision suffit pour des quantiles et divise la mémoire par deux.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    levels, drifts, drift_se, sigmas = (np.asarray(values, dtype=np.float32)[:, None]
+                                        for values in (levels, drifts, drift_se, sigmas))
+    n_series = len(levels)
+
+    paths = rng.standard_normal((n_paths, n_series, horizon), dtype=np.float32)
+    paths *= sigmas
+    paths += drifts + drift_se * rng.standard_normal((n_paths, n_series, 1), dtype=np.float32)
+    np.cumsum(paths, axis=-1, out=paths)
+    paths += levels
+    return paths
+
+
+def forecast_series(last_years, levels, drifts, drift_se, sigmas, labels,
+                    end_year=HORIZON_END, n_paths=N_PATHS, seed=0):
+    """Quantiles et probabilité d'atteindre l'objectif, par série et par année projetée
+
+    `last_years` : dernière année observée, commune ou propre à chaque série ;
+    chaque série est projetée de l'année suivante à `end_year`. Les séries sont
+    simulées par blocs pour borner la mémoire ; à l'intérieur d'un bloc, aucune
+    boucle sur les trajectoires ni sur les séries.
+    """
+    last_years = np.broadcast_to(np.asarray(last_years, dtype=int), (len(labels),))
+    horizons = end_year - last_years
+    horizon = int(horizons.max()) if len(labels) else 0
+    if horizon <= 0:
+        return pd.DataFrame(columns=['serie', 'annee', *quantile_columns(), 'p_objectif'])
+    steps = np.arange(horizon)
+
+    rng = np.random.default_rng(seed)
+    ranks = np.rint(np.asarray(QUANTILES) * (n_paths - 1)).astype(int)
+    block = max(1, BLOCK_VALUES // (n_paths * horizon))
+    frames = []
+    for start in range(0, len(labels), block):
+        part = slice(start, start + block)
+        paths = simulate(levels[part], drifts[part], drift_se[part], sigmas[part],
+                         horizon, n_paths, rng)
+        reached = (paths <= logit(OBJECTIF)).mean(axis=0)  # (séries, années)
+        # La transformation logistique est croissante : quantiles en log-odds, puis conversion.
+        # Un tri complet est plus rapide que np.quantile/np.partition sur ces volumes
+        paths.sort(axis=0)
+        quantiles = expit(paths[ranks].astype(float))  # (quantiles, séries, années)
+        # Pas k d'une série : année last_year + 1 + k, jusqu'à end_year
+        keep = (steps[None, :] < horizons[part][:, None]).ravel()
+        frame = pd.DataFrame({
+            'serie': np.repeat(np.asarray(labels[part], dtype=object), horizon)[keep],
+            'annee': (last_years[part][:, None] + 1 + steps).ravel()[keep],
+            'p_objectif': reached.ravel()[keep],
+        })
+        for column, values in zip(quantile_columns(), quantiles):
+            frame[column] = values.ravel()[keep]
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)[['serie', 'annee', *quantile_columns(), 'p_objectif']]
+
+
+def quantile_columns():
+    return [f"q{round(q * 100):02d}" for q in QUANTILES]
+
+
+def regional_trends(regional, series=None):
+    """Niveau (log-odds), dérive annuelle et dernière année observée de chaque région
+
+    Une région présente dans `series` (region, annee, prevalence) avec au moins
+    deux années y est ajustée et part de sa propre dernière année. Les autres
+    partent de regional_data : le niveau de la colonne prevalence_<année>, la
+    dérive de evolution_<début>_<fin> rapportée à son nombre d'années.
+    """
+    labels, levels, drifts, last_years = [], [], [], []
+    fitted = set()
+    if series is not None and len(series):
+        series = series.dropna(subset=['prevalence'])
+        for region, group in series.groupby('region', sort=False, observed=True):
+            if group['annee'].nunique() < 2:
+                continue
+            level, drift, _, _ = fit_trend(group['annee'], group['prevalence'])
+            labels.append(region)
+            levels.append(level)
+            drifts.append(drift)
+            last_years.append(int(group['annee'].max()))
+            fitted.add(region)
+
+    if regional is not None and len(regional):
+        level_columns = [(int(match[1]), column) for column in regional.columns
+                         if (match := LEVEL_COLUMN.fullmatch(column))]
+        evolution_columns = [(int(match[1]), int(match[2]), column) for column in regional.columns
+                             if (match := EVOLUTION_COLUMN.fullmatch(column))]
+        if level_columns and evolution_columns:
+            year, level_column = max(level_columns)
+            # Évolution se terminant à l'année du niveau, de préférence
+            start, end, evolution_column = max(evolution_columns, key=lambda item: (item[1] == year, item[1]))
+            rows = regional[~regional['region'].isin(fitted)]
+            current = rows[level_column].to_numpy(dtype=float)
+            previous = current - rows[evolution_column].to_numpy(dtype=float)
+            labels += rows['region'].tolist()
+            levels += list(logit(current))
+            drifts += list((logit(current) - logit(previous)) / max(end - start, 1))
+            last_years += [year] * len(rows)
+    return labels, levels, drifts, last_years
+
+
+def forecast_prevalence(historical, regional, national_label='France', series=None,
+                        end_year=HORIZON_END, n_paths=N_PATHS, seed=0):
+    """Projections nationale et régionales à partir de historical_data et regional_data
+
+    Les régions sans série propre (`series`, jeu regional_series) n'ont qu'un
+    niveau et une évolution : leur dérive en découle (regional_trends). Chaque
+    série part de sa dernière année observée ; l'incertitude (dérive, chocs
+    annuels) est celle estimée sur la série nationale.
+    """
+    historical = historical.dropna(subset=['prevalence_tabagisme'])
+    level, drift, drift_se, sigma = fit_trend(historical['annee'], historical['prevalence_tabagisme'])
+    last_year = int(historical['annee'].max())
+
+    labels, levels, drifts, last_years = regional_trends(regional, series)
+    labels = [national_label, *labels]
+    n_series = len(labels)
+    return forecast_series(np.array([last_year, *last_years], dtype=int),
+                           np.array([level, *levels], dtype=float), np.array([drift, *drifts], dtype=float),
+                           np.full(n_series, drift_se), np.full(n_series, sigma), labels,
+                           end_year=end_year, n_paths=n_paths, seed=seed)
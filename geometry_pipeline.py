@@ -0,0 +1,172 @@
+"""Préparation hors ligne des contours géographiques pour les cartes choroplèthes
+
+Les GeoJSON sources (pleine résolution) sont simplifiés avec une tolérance
+adaptée à l'échelle de chaque niveau (région, département, commune), leurs
+coordonnées sont quantifiées, puis le GeoJSON encodé est mis en cache par
+niveau. Le dashboard ne fait ensuite qu'une lecture de ce cache.
+
+Usage :
+    python geometry_pipeline.py [--levels region departement commune]
+"""
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE_DIR = os.path.join(BASE_DIR, 'geo')
+CACHE_DIR = os.path.join(os.environ.get('TABAC_CACHE_DIR', os.path.join(BASE_DIR, '.cache')), 'geo')
+
+# Paramètres par niveau : tolérance de simplification (degrés), décimales conservées,
+# propriété identifiant chaque entité
+LEVELS = {
+    'region': {'source': 'regions.geojson', 'tolerance': 0.01, 'decimals': 3, 'id_property': 'nom'},
+    'departement': {'source': 'departements.geojson', 'tolerance': 0.004, 'decimals': 3,
+                    'id_property': 'code'},
+    'commune': {'source': 'communes.geojson', 'tolerance': 0.0008, 'decimals': 4,
+                'id_property': 'code'},
+}
+
+
+def simplify_line(points, tolerance):
+    """Douglas-Peucker itératif ; les distances d'un segment sont calculées en bloc"""
+    n = len(points)
+    if n <= 2 or tolerance <= 0:
+        return points
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        i, j = stack.pop()
+        if j <= i + 1:
+            continue
+        start, end = points[i], points[j]
+        segment = points[i + 1:j]
+        direction = end - start
+        length = np.hypot(direction[0], direction[1])
+        if length == 0:
+            distances = np.hypot(segment[:, 0] - start[0], segment[:, 1] - start[1])
+        else:
+            distances = np.abs(direction[0] * (segment[:, 1] - start[1])
+                               - direction[1] * (segment[:, 0] - start[0])) / length
+        k = int(np.argmax(distances))
+        if distances[k] > tolerance:
+            keep[i + 1 + k] = True
+            stack.append((i, i + 1 + k))
+            stack.append((i + 1 + k, j))
+    return points[keep]
+
+
+def quantize(points, decimals):
+    """Arrondit les coordonnées et supprime les points consécutifs devenus identiques"""
+    points = np.round(points, decimals)
+    if len(points) > 1:
+        distinct = np.any(np.diff(points, axis=0) != 0, axis=1)
+        points = points[np.concatenate(([True], distinct))]
+    return points
+
+
+def ring_area(ring):
+    """Aire absolue d'un anneau (formule du lacet), indépendante du sens de parcours"""
+    points = np.asarray(ring, dtype=float)
+    x, y = points[:, 0], points[:, 1]
+    return abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))) / 2
+
+
+def simplify_ring(ring, tolerance, decimals):
+    """Anneau simplifié et quantifié, ou None s'il disparaît à cette échelle"""
+    points = quantize(simplify_line(np.asarray(ring, dtype=float), tolerance), decimals)
+    if len(points) < 4:
+        return None
+    if not np.array_equal(points[0], points[-1]):
+        points = np.vstack([points, points[:1]])
+    return points.tolist()
+
+
+def simplify_polygon(rings, tolerance, decimals):
+    exterior = simplify_ring(rings[0], tolerance, decimals)
+    if exterior is None:
+        return None
+    holes = [hole for hole in (simplify_ring(r, tolerance, decimals) for r in rings[1:]) if hole]
+    return [exterior] + holes
+
+
+def simplify_geometry(geometry, tolerance, decimals):
+    """Simplifie un Polygon ou MultiPolygon sans jamais faire disparaître l'entité"""
+    if geometry['type'] == 'Polygon':
+        polygons = [geometry['coordinates']]
+    elif geometry['type'] == 'MultiPolygon':
+        polygons = geometry['coordinates']
+    else:
+        return geometry
+
+    simplified = [p for p in (simplify_polygon(rings, tolerance, decimals) for rings in polygons) if p]
+    if not simplified:
+        # Entité plus petite que la tolérance : on garde son plus grand contour, quantifié
+        largest = max(polygons, key=lambda rings: ring_area(rings[0]))
+        simplified = [[np.round(np.asarray(largest[0], dtype=float), decimals).tolist()]]
+    if len(simplified) == 1:
+        return {'type': 'Polygon', 'coordinates': simplified[0]}
+    return {'type': 'MultiPolygon', 'coordinates': simplified}
+
+
+def _cache_path(level, cache_dir):
+    params = json.dumps(LEVELS[level], sort_keys=True).encode('utf-8')
+    return os.path.join(cache_dir, f"{level}-{hashlib.sha1(params).hexdigest()[:8]}.geojson")
+
+
+def build_level(level, source_dir=SOURCE_DIR, cache_dir=CACHE_DIR, force=False):
+    """Simplifie, quantifie et met en cache les contours d'un niveau"""
+    params = LEVELS[level]
+    source = os.path.join(source_dir, params['source'])
+    target = _cache_path(level, cache_dir)
+    if not force and os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(source):
+        return target
+
+    with open(source, encoding='utf-8') as f:
+        collection = json.load(f)
+
+    features = []
+    for feature in collection['features']:
+        properties = feature.get('properties') or {}
+        features.append({
+            'type': 'Feature',
+            'properties': {key: properties[key] for key in ('code', 'nom') if key in properties},
+            'geometry': simplify_geometry(feature['geometry'], params['tolerance'], params['decimals']),
+        })
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{target}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'type': 'FeatureCollection', 'features': features}, f, separators=(',', ':'))
+    os.replace(tmp_path, target)
+    return target
+
+
+def cached_level_path(level, cache_dir=CACHE_DIR):
+    """Chemin du GeoJSON encodé d'un niveau, ou None s'il n'a pas été construit"""
+    path = _cache_path(level, cache_dir)
+    return path if os.path.exists(path) else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Préparation des contours pour les cartes")
+    parser.add_argument('--levels', nargs='+', choices=list(LEVELS), default=list(LEVELS))
+    parser.add_argument('--source-dir', default=SOURCE_DIR)
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--force', action='store_true', help="reconstruit même si le cache est à jour")
+    args = parser.parse_args()
+
+    for level in args.levels:
+        source = os.path.join(args.source_dir, LEVELS[level]['source'])
+        if not os.path.exists(source):
+            print(f"{level}: source absente ({source})")
+            continue
+        path = build_level(level, args.source_dir, args.cache_dir, force=args.force)
+        print(f"{level}: {os.path.getsize(source) / 1e6:.1f} Mo -> {os.path.getsize(path) / 1e6:.2f} Mo ({path})")
+
+
+if __name__ == '__main__':
+    main()
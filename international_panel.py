@@ -0,0 +1,127 @@
+"""Panel international : indicateurs par (pays, année)
+
+Chaque indicateur est rangé dans une matrice dense (pays x années), pays et
+années étant repérés par position. Classements, centiles et variations sur
+VARIATION_YEARS ans sont calculés en une opération pour tous les pays et
+toutes les années, à la première demande de l'indicateur ; le panel étant
+partagé par les sessions d'une version des données, chaque indicateur n'est
+calculé qu'une fois par version.
+
+Une colonne facultative INTERPOLATED (0/1) marque les valeurs interpolées
+entre deux années observées ; les figures la reprennent dans leurs survols.
+
+Le classement 1 revient à la valeur la plus basse (ascending=True, cas de la
+prévalence) ; la variation est classée dans le même sens : la plus forte baisse
+est première.
+"""
+import numpy as np
+import pandas as pd
+
+from dataset_schema import decimal_values
+
+VARIATION_YEARS = 10
+KEY_COLUMNS = ('pays', 'annee')
+INTERPOLATED = 'interpole'
+VARIATION = f"variation_{VARIATION_YEARS}ans"
+
+
+def ranked(values, ascending=True):
+    """Classement (1 = meilleur, ex aequo au rang le plus haut) et centile de chaque colonne, NaN ignorés"""
+    ranks = pd.DataFrame(values).rank(axis=0, method='min', ascending=ascending).to_numpy()
+    counts = np.isfinite(values).sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        centiles = np.where(counts > 1, 100 * (counts - ranks) / (counts - 1), 100.0)
+    return ranks, np.where(np.isnan(ranks), np.nan, centiles)
+
+
+class InternationalPanel:
+    """Matrices (pays, années) des indicateurs du panel, et leurs statistiques par indicateur"""
+
+    def __init__(self, frame):
+        frame = pd.DataFrame(frame)
+        codes, countries = pd.factorize(frame['pays'], sort=True)
+        years = frame['annee'].to_numpy(dtype=int)
+        self.countries = np.asarray(countries)
+        self.first_year = int(years.min()) if len(years) else 0
+        self.n_years = int(years.max()) - self.first_year + 1 if len(years) else 0
+        self.indicators = [column for column in frame.columns if column not in KEY_COLUMNS]
+        self.has_interpolated = INTERPOLATED in frame.columns
+        self._frame = frame
+        self._positions = (codes, years - self.first_year)
+        self._matrices = {}
+        self._statistics = {}
+
+    @property
+    def last_year(self):
+        return self.first_year + self.n_years - 1 if self.n_years else None
+
+    def matrix(self, indicator):
+        """Valeurs (pays, années) d'un indicateur, NaN pour les couples absents"""
+        values = self._matrices.get(indicator)
+        if values is None:
+            if indicator not in self.indicators:
+                raise KeyError(f"Indicateur absent du panel: {indicator}")
+            values = np.full((len(self.countries), self.n_years), np.nan)
+            values[self._positions] = decimal_values(self._frame[indicator])
+            self._matrices[indicator] = values
+        return values
+
+    def statistics(self, indicator, ascending=True):
+        """Matrices (pays, années) : valeur, classement, centile, variation et son classement"""
+        key = (indicator, ascending)
+        stats = self._statistics.get(key)
+        if stats is None:
+            values = self.matrix(indicator)
+            variation = np.full_like(values, np.nan)
+            # Arrondi au-delà de la précision des données : -3.1 et non -3.1000000000000014
+            variation[:, VARIATION_YEARS:] = np.round(values[:, VARIATION_YEARS:] - values[:, :-VARIATION_YEARS], 9)
+            rank, centile = ranked(values, ascending)
+            variation_rank, variation_centile = ranked(variation, ascending)
+            stats = self._statistics[key] = {
+                'valeur': values,
+                'classement': rank,
+                'centile': centile,
+                VARIATION: variation,
+                'classement_variation': variation_rank,
+                'centile_variation': variation_centile,
+            }
+        return stats
+
+    def year_table(self, indicator, year=None, ascending=True):
+        """Pays présents pour l'année (dernière par défaut) avec leurs statistiques, par classement"""
+        year = self.last_year if year is None else year
+        column = year - self.first_year
+        if not 0 <= column < self.n_years:
+            return pd.DataFrame(columns=['pays', 'annee', indicator, 'classement', 'centile', VARIATION,
+                                         'classement_variation', 'centile_variation'])
+        stats = self.statistics(indicator, ascending)
+        present = np.isfinite(stats['valeur'][:, column])
+        table = pd.DataFrame({'pays': self.countries[present], 'annee': year})
+        for name, values in stats.items():
+            table[indicator if name == 'valeur' else name] = values[present, column]
+        return table.sort_values('classement', kind='stable').reset_index(drop=True)
+
+    def at(self, indicator, year):
+        """Valeur de chaque pays pour l'année exacte (Series indexée par pays, NaN si absente)"""
+        column = year - self.first_year
+        values = self.matrix(indicator)[:, column] if 0 <= column < self.n_years \
+            else np.full(len(self.countries), np.nan)
+        return pd.Series(values, index=self.countries, name=indicator)
+
+    def interpolated(self, year):
+        """Pays dont une valeur de l'année est interpolée (Series booléenne indexée par pays)"""
+        if not self.has_interpolated:
+            return pd.Series(False, index=self.countries)
+        return self.at(INTERPOLATED, year).fillna(0) > 0
+
+    def latest(self, indicator, year=None):
+        """Dernière valeur connue de chaque pays jusqu'à l'année incluse (Series indexée par pays)"""
+        year = self.last_year if year is None else year
+        values = self.matrix(indicator)[:, :max(0, min(year - self.first_year + 1, self.n_years))]
+        known = np.isfinite(values)
+        last = values.shape[1] - 1 - np.argmax(known[:, ::-1], axis=1) if values.shape[1] \
+            else np.zeros(len(self.countries), dtype=int)
+        found = known.any(axis=1)
+        result = np.full(len(self.countries), np.nan)
+        result[found] = values[np.flatnonzero(found), last[found]]
+        return pd.Series(result, index=self.countries, name=indicator)
@@ -0,0 +1,115 @@
+"""Mémoire partagée par le processus et mémoire propre à chaque session
+
+Les jeux de données sont chargés une fois par processus (tampons Arrow
+immuables) ; une session n'en détient que des vues. La mémoire d'une session est
+estimée en parcourant ses objets (état de session, attributs du dashboard) et en
+ne comptant que les tampons qui n'appartiennent pas au magasin partagé.
+
+Dimensionnement d'un worker : partagé + sessions x mémoire par session.
+"""
+import bisect
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+# Une session sans rerun depuis SESSION_TTL secondes n'est plus comptée
+SESSION_TTL = 600
+
+
+def column_buffers(series):
+    """(adresse, taille) des tampons d'une colonne, NumPy ou Arrow"""
+    values = series.array
+    if hasattr(values, '__arrow_array__'):
+        import pyarrow as pa
+        chunks = pa.chunked_array(values.__arrow_array__()).chunks
+        return [(buffer.address, buffer.size) for chunk in chunks for buffer in chunk.buffers()
+                if buffer is not None]
+    array = series.to_numpy(copy=False)
+    if isinstance(array, np.ndarray):
+        return [(array.__array_interface__['data'][0], array.nbytes)]
+    return []
+
+
+class SharedBuffers:
+    """Plages d'adresses des tampons du magasin partagé"""
+
+    def __init__(self, frames=()):
+        ranges = sorted((address, address + size) for frame in frames
+                        for column in frame.columns for address, size in column_buffers(frame[column]))
+        self.starts = [start for start, _ in ranges]
+        self.ends = [end for _, end in ranges]
+
+    def __contains__(self, series):
+        buffers = column_buffers(series)
+        return bool(buffers) and all(self._covers(address) for address, size in buffers if size)
+
+    def _covers(self, address):
+        position = bisect.bisect_right(self.starts, address) - 1
+        return position >= 0 and address < self.ends[position]
+
+
+def owned_bytes(value, shared=None, seen=None):
+    """Octets détenus en propre par `value` (conteneurs, DataFrames, tableaux), hors tampons partagés"""
+    shared = shared if shared is not None else SharedBuffers()
+    seen = seen if seen is not None else set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    if isinstance(value, pd.DataFrame):
+        return sum(owned_bytes(value[column], shared, seen) for column in value.columns)
+    if isinstance(value, pd.Series):
+        return 0 if value in shared else int(value.memory_usage(deep=True, index=False))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        return size + sum(owned_bytes(k, shared, seen) + owned_bytes(v, shared, seen) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(owned_bytes(item, shared, seen) for item in value)
+    return size
+
+
+def format_bytes(nbytes):
+    """Taille lisible (Ko, Mo, Go)"""
+    for unit, scale in (('Go', 1e9), ('Mo', 1e6)):
+        if nbytes >= scale:
+            return f"{nbytes / scale:.1f} {unit}"
+    return f"{nbytes / 1e3:.1f} Ko"
+
+
+def frame_bytes(value):
+    """Octets d'une table partagée (DataFrame) ; 0 pour les autres objets"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True, index=True).sum())
+    return 0
+
+
+class SessionMemory:
+    """Dernière mesure de chaque session active du processus"""
+
+    def __init__(self, ttl=SESSION_TTL):
+        self.ttl = ttl
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def record(self, session_id, nbytes):
+        with self._lock:
+            self._sessions[session_id] = (nbytes, time.monotonic())
+
+    def summary(self):
+        """Sessions actives et leur mémoire propre (moyenne, maximum, total)"""
+        now = time.monotonic()
+        with self._lock:
+            for session_id in [s for s, (_, seen) in self._sessions.items() if now - seen > self.ttl]:
+                del self._sessions[session_id]
+            sizes = [nbytes for nbytes, _ in self._sessions.values()]
+        return {
+            'sessions': len(sizes),
+            'mean_bytes': int(np.mean(sizes)) if sizes else 0,
+            'max_bytes': max(sizes, default=0),
+            'total_bytes': sum(sizes),
+        }
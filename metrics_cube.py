@@ -0,0 +1,110 @@
+"""Cube des indicateurs clés : (année, indicateur, région)
+
+Les valeurs sont rangées dans un tableau dense indexé par position : l'année
+donne la ligne par simple différence avec la première année, indicateur et
+région par dictionnaire. Chaque case porte la valeur, l'écart à l'année
+précédente, la variation relative et la moyenne mobile sur ROLLING_YEARS ans ;
+la lecture d'une carte d'indicateur est donc en O(1).
+
+Les années postérieures à la dernière année du cube sont ajoutées sans
+recalculer les précédentes : seules les ROLLING_YEARS dernières lignes servent
+au calcul des écarts et moyennes des nouvelles.
+"""
+import numpy as np
+
+ROLLING_YEARS = 3
+MEASURES = ('valeur', 'ecart', 'variation', 'moyenne_mobile')
+NATIONAL = 'France'
+
+
+def long_format(frame, indicators, region=NATIONAL, year_column='annee'):
+    """Table large (une colonne par indicateur) en format long : annee, indicateur, region, valeur"""
+    present = [column for column in indicators if column in frame.columns]
+    melted = frame[[year_column, *present]].melt(id_vars=year_column, var_name='indicateur',
+                                                 value_name='valeur')
+    return melted.rename(columns={year_column: 'annee'}).assign(region=region)
+
+
+def changes(values, previous):
+    """Écarts, variations et moyennes mobiles de `values`, précédées des lignes `previous`"""
+    padding = np.full((ROLLING_YEARS, *values.shape[1:]), np.nan)
+    stacked = np.concatenate([padding, previous, values], axis=0)
+    offset = ROLLING_YEARS + len(previous)
+    before = stacked[offset - 1:-1]
+    ecart = values - before
+    windows = np.stack([stacked[offset - lag:len(stacked) - lag] for lag in range(ROLLING_YEARS)])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variation = ecart / np.abs(before)
+    return ecart, variation, windows.mean(axis=0)
+
+
+class MetricsCube:
+    """Valeurs et variations par (année, indicateur, région), lues par position"""
+
+    def __init__(self, first_year, indicators, regions, data):
+        self.first_year = first_year
+        self.indicators = {name: i for i, name in enumerate(indicators)}
+        self.regions = {name: i for i, name in enumerate(regions)}
+        # data : (mesures, années, indicateurs, régions)
+        self.data = data
+
+    @classmethod
+    def build(cls, long):
+        """Cube complet à partir d'une table longue (annee, indicateur, region, valeur)"""
+        indicators = list(dict.fromkeys(long['indicateur']))
+        regions = list(dict.fromkeys(long['region']))
+        empty = cls(int(long['annee'].min()) if len(long) else 0, indicators, regions,
+                    np.empty((len(MEASURES), 0, len(indicators), len(regions))))
+        return empty.append(long)
+
+    @property
+    def years(self):
+        return np.arange(self.first_year, self.first_year + self.data.shape[1])
+
+    @property
+    def last_year(self):
+        return self.first_year + self.data.shape[1] - 1 if self.data.shape[1] else None
+
+    def append(self, long):
+        """Nouveau cube avec les années de `long` postérieures à la dernière année (self inchangé)"""
+        if self.last_year is not None:
+            long = long[long['annee'] > self.last_year]
+        if not len(long):
+            return self
+        unknown = (set(long['indicateur']) - set(self.indicators)) | (set(long['region']) - set(self.regions))
+        if unknown:
+            raise ValueError(f"Indicateurs ou régions absents du cube: {sorted(map(str, unknown))}")
+
+        first_new = self.last_year + 1 if self.last_year is not None else int(long['annee'].min())
+        values = self.dense(long, first_new, int(long['annee'].max()) - first_new + 1)
+
+        previous = self.data[0, max(0, self.data.shape[1] - ROLLING_YEARS):]
+        block = np.stack([values, *changes(values, previous)])
+        return MetricsCube(self.first_year if self.data.shape[1] else first_new, list(self.indicators),
+                           list(self.regions), np.concatenate([self.data, block], axis=1))
+
+    def dense(self, long, first_year, n_years):
+        """Valeurs de `long` rangées en (années, indicateurs, régions), NaN pour les cases absentes"""
+        values = np.full((n_years, len(self.indicators), len(self.regions)), np.nan)
+        values[long['annee'].to_numpy(dtype=int) - first_year,
+               long['indicateur'].map(self.indicators).to_numpy(dtype=int),
+               long['region'].map(self.regions).to_numpy(dtype=int)] = long['valeur'].to_numpy(dtype=float)
+        return values
+
+    def synced(self, long):
+        """Cube à jour avec `long` : seules les nouvelles années sont calculées si les autres sont inchangées"""
+        if self.last_year is None or set(long['indicateur']) - set(self.indicators) \
+                or set(long['region']) - set(self.regions) or long['annee'].min() != self.first_year:
+            return MetricsCube.build(long)
+        known = long[long['annee'] <= self.last_year]
+        if not np.array_equal(self.dense(known, self.first_year, self.data.shape[1]), self.data[0], equal_nan=True):
+            return MetricsCube.build(long)
+        return self.append(long)
+
+    def cell(self, year, indicator, region=NATIONAL):
+        """{mesure: valeur} d'une case, ou None si l'année, l'indicateur ou la région est absent"""
+        row = year - self.first_year
+        i, r = self.indicators.get(indicator), self.regions.get(region)
+        if i is None or r is None or not 0 <= row < self.data.shape[1]:
+            return None
+        return dict(zip(MEASURES, self.data[:, row, i, r].tolist()))
@@ -0,0 +1,172 @@
+"""Textes rédactionnels des onglets, partagés par le dashboard et le site statique
+
+Chaque texte est une liste de lignes ; une ligne est la liste des blocs
+Markdown affichés côte à côte (un bloc par colonne).
+"""
+
+# Régional — « Analyse Démographique »
+DEMOGRAPHICS = [
+    [
+        """\
+### 👥 Par Catégorie Socio-professionnelle
+
+**Taux les plus élevés:**
+• Ouvriers: 28.5%  
+• Employés: 24.2%  
+• Chômeurs: 32.1%  
+
+**Taux les plus bas:**
+• Cadres: 15.8%  
+• Professions intermédiaires: 18.9%  
+• Retraités: 12.4%  
+""",
+        """\
+### 🎂 Par Tranche d'Âge
+
+**15-24 ans:** 21.8%  
+**25-34 ans:** 26.4%  
+**35-44 ans:** 23.9%  
+**45-54 ans:** 21.2%  
+**55-64 ans:** 16.7%  
+**65+ ans:** 8.9%  
+
+**Âge moyen d'initiation:** 14.2 ans
+""",
+    ],
+]
+
+# Stratégies — « Objectifs 2030 »
+OBJECTIVES = [
+    [
+        """\
+### 🎯 Objectif Principal
+
+**Génération sans tabac d'ici 2030**
+
+• Prévalence < 5%  
+• 200 000 fumeurs en moins par an  
+• Prévention dès le plus jeune âge  
+""",
+        """\
+### 📊 Cibles Intermédiaires
+
+**2025:**
+• Prévalence < 15%  
+• Paquet à 13€  
+• 100% de couverture des aides  
+
+**2027:**
+• Prévalence < 10%  
+• Paquet à 15€  
+• Espace sans tabac généralisé  
+""",
+        """\
+### 📈 Indicateurs de Suivi
+
+• Prévalence mensuelle  
+• Ventes de tabac  
+• Utilisation des aides  
+• Exposition des jeunes  
+• Inégalités sociales  
+""",
+    ],
+]
+
+# Stratégies — « Stratégies Prioritaires »
+PRIORITIES = [
+    [
+        """\
+### 🚨 Actions Immédiates (2024-2025)
+
+**1. Augmentation des prix**
+• Objectif: paquet à 13€ en 2025  
+• Hausse progressive mais significative  
+
+**2. Renforcement de la prévention**
+• Campagnes choc renouvelées  
+• Ciblage des populations vulnérables  
+
+**3. Amélioration de l'accès aux aides**
+• Simplification des démarches  
+• Formation des professionnels  
+""",
+        """\
+### 🏗️ Réformes Structurelles (2026-2030)
+
+**1. Généralisation des espaces sans tabac**
+• Parcs, plages, abribus  
+• Périmètres autour des écoles  
+
+**2. Régulation des nouveaux produits**
+• Cigarettes électroniques  
+• Produits du tabac chauffé  
+
+**3. Lutte contre le commerce illicite**
+• Renforcement des contrôles  
+• Collaboration internationale  
+""",
+    ],
+]
+
+# Synthèse (après le titre de la section)
+SYNTHESIS = [
+    [
+        """\
+### ✅ SUCCÈS ET PROGRÈS
+
+**Baisse continue depuis 20 ans:**
+• Prévalence divisée par 1.5  
+• Paquet neutre généralisé  
+• Interdictions efficaces  
+• Prise de conscience collective  
+
+**Politiques efficaces:**
+• Hausse des prix  
+• Interdiction publicité  
+• Espaces sans tabac  
+• Campagnes choc  
+""",
+        """\
+### ⚠️ DÉFIS PERSISTANTS
+
+**Inégalités sociales:**
+• Écart ouvriers/cadres: 12 points  
+• Territorialité marquée  
+• Jeunes vulnérables  
+
+**Nouveaux enjeux:**
+• Cigarettes électroniques  
+• Commerce illicite  
+• Industrie du tabac adaptative  
+• Produits nouveaux  
+""",
+    ],
+    [
+        """\
+### 🚨 ALERTES ET RECOMMANDATIONS
+
+**Niveau d'Alerte: MODÉRÉ**
+
+**Points de Vigilance:**
+• Stagnation possible de la baisse  
+• Résistance des populations vulnérables  
+• Nouveaux produits attractifs pour les jeunes  
+• Commerce parallèle croissant  
+
+**Recommandations Immédiates:**
+1. Accélération des hausses de prix  
+2. Renforcement de la prévention jeune  
+3. Lutte contre les inégalités sociales  
+4. Régulation des nouveaux produits  
+5. Coordination européenne renforcée  
+""",
+    ],
+]
+
+# Stratégies — « Feuille de Route » : actions par période
+ROADMAP = [
+    {'periode': '2024', 'actions': ['Hausse prix à 12€', 'Campagne jeunes', 'Extension espaces sans tabac']},
+    {'periode': '2025', 'actions': ['Paquet à 13€', 'Généralisation paquet neutre', 'Formation médecins']},
+    {'periode': '2026-2027', 'actions': ['Nouvelle hausse prix', 'Interdiction arômes menthol', 'Renforcement contrôles']},
+    {'periode': '2028-2030', 'actions': ['Objectif 5% prévalence', 'Évaluation stratégique', 'Adaptation politiques']},
+]
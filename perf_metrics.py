@@ -0,0 +1,137 @@
+"""Mesures de performance des chemins chauds du dashboard
+
+Les durées sont agrégées par processus (donc toutes sessions confondues) dans
+un réservoir borné par mesure, d'où sont tirés les quantiles p50/p95/p99.
+Désactivé, l'instrumentation se réduit à la lecture d'un booléen.
+
+Activation : variable d'environnement TABAC_PERF=1 pour tout le processus, ou
+case du panneau de la sidebar pour les seuls rendus de la session qui la coche
+(l'activation de session est propre au thread de rendu, via une ContextVar).
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+import numpy as np
+
+QUANTILES = (0.5, 0.95, 0.99)
+# Nombre de mesures conservées par nom pour le calcul des quantiles
+RESERVOIR_SIZE = 2048
+
+
+class PerfRecorder:
+    """Durées par nom de mesure, partagées par les threads du processus"""
+
+    def __init__(self, enabled=False, reservoir_size=RESERVOIR_SIZE):
+        # Activation du processus (TABAC_PERF), réservée à l'administrateur
+        self.enabled = enabled
+        # Activation du rendu en cours (case de la session), sans effet sur les autres sessions
+        self._session = contextvars.ContextVar('perf_session', default=False)
+        self.reservoir_size = reservoir_size
+        self._samples = {}
+        self._totals = {}
+        self._lock = threading.Lock()
+        self._last_write = 0.0
+
+    @property
+    def active(self):
+        """Vrai si les durées du rendu en cours sont enregistrées (processus ou session)"""
+        return self.enabled or self._session.get()
+
+    def enable_session(self, enabled):
+        """Active ou non l'enregistrement pour le rendu en cours (thread de la session)"""
+        self._session.set(bool(enabled))
+
+    def record(self, name, seconds):
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.reservoir_size)
+                self._totals[name] = [0, 0.0]
+            samples.append(seconds)
+            totals = self._totals[name]
+            totals[0] += 1
+            totals[1] += seconds
+
+    @contextmanager
+    def time(self, name):
+        """Chronomètre un bloc (sans effet si l'enregistrement est désactivé)"""
+        if not self.active:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def summary(self):
+        """{nom: {count, sum, p50, p95, p99}} en secondes, trié par nom"""
+        with self._lock:
+            snapshot = {name: (np.fromiter(samples, dtype=float, count=len(samples)), tuple(self._totals[name]))
+                        for name, samples in self._samples.items()}
+        summary = {}
+        for name in sorted(snapshot):
+            values, (count, total) = snapshot[name]
+            quantiles = np.quantile(values, QUANTILES)
+            summary[name] = {'count': count, 'sum': total,
+                             **{f"p{round(q * 100)}": float(v) for q, v in zip(QUANTILES, quantiles)}}
+        return summary
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._totals.clear()
+
+    def to_prometheus(self, metric='tabac_dashboard_duration_seconds'):
+        """Résumé au format texte Prometheus (type summary)"""
+        lines = [f"# HELP {metric} Durée des étapes de rendu du dashboard",
+                 f"# TYPE {metric} summary"]
+        for name, stats in self.summary().items():
+            label = name.replace('\\', '\\\\').replace('"', '\\"')
+            for q in QUANTILES:
+                lines.append(f'{metric}{{step="{label}",quantile="{q}"}} {stats[f"p{round(q * 100)}"]:.6f}')
+            lines.append(f'{metric}_sum{{step="{label}"}} {stats["sum"]:.6f}')
+            lines.append(f'{metric}_count{{step="{label}"}} {stats["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, directory, min_interval=0.0):
+        """Écrit metrics.prom et metrics.json (remplacement atomique), au plus toutes les min_interval s"""
+        now = time.monotonic()
+        if now - self._last_write < min_interval:
+            return False
+        self._last_write = now
+        os.makedirs(directory, exist_ok=True)
+        for filename, content in (('metrics.prom', self.to_prometheus()),
+                                  ('metrics.json', json.dumps(self.summary(), indent=2))):
+            path = os.path.join(directory, filename)
+            # Fichier temporaire propre au processus et au thread : deux exports simultanés ne se mélangent pas
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        return True
+
+
+RECORDER = PerfRecorder(enabled=os.environ.get('TABAC_PERF', '') not in ('', '0'))
+
+
+def timed(func):
+    """Décorateur : enregistre la durée de chaque appel sous le nom de la fonction"""
+    name = func.__name__
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not RECORDER.active:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            RECORDER.record(name, time.perf_counter() - start)
+    return wrapper
@@ -0,0 +1,156 @@
+"""Estimation de l'impact des politiques par régression segmentée
+
+Pour chaque politique et chaque série de prévalence (France, régions), une
+série temporelle interrompue est ajustée sur une fenêtre autour de l'entrée
+en vigueur :
+
+    y = b0 + b1 * t + b2 * D + b3 * (t - délai) * D,   D = 1 si t >= délai
+
+où t est l'écart (en années) à l'entrée en vigueur. Le délai retenu est celui
+(de 0 à MAX_DELAI ans) qui minimise l'erreur quadratique ; l'impact est l'écart
+à la tendance antérieure HORIZON ans après la rupture (b2 + b3 * HORIZON).
+Les intervalles de confiance sont obtenus par bootstrap des résidus.
+
+Toutes les combinaisons politique x série x délai d'un bloc de politiques sont
+estimées ensemble (moindres carrés par lots) ; le bootstrap est linéaire en les résidus et se
+réduit à un produit matriciel par bloc de combinaisons.
+"""
+import numpy as np
+import pandas as pd
+
+FENETRE = 6        # années de part et d'autre de l'entrée en vigueur
+MAX_DELAI = 3      # délai maximal testé entre l'entrée en vigueur et la rupture (années)
+HORIZON = 3        # impact mesuré HORIZON années après la rupture
+N_BOOTSTRAP = 1000
+NIVEAU_CONFIANCE = 0.95
+MIN_AVANT = 3      # observations minimales avant la rupture
+MIN_APRES = 2      # et après
+# Nombre maximal de valeurs en mémoire à la fois (estimation et bootstrap, par bloc)
+BLOCK_VALUES = 4_000_000
+
+COLUMNS = ['serie', 'politique', 'type', 'annee', 'delai_impact', 'impact_prevalence',
+           'ic_bas', 'ic_haut', 'changement_niveau', 'changement_pente', 'n_obs']
+
+
+def policy_years(dates):
+    """Première année pleinement concernée : une mesure du second semestre compte pour l'année suivante"""
+    dates = pd.to_datetime(pd.Series(dates))
+    return (dates.dt.year + (dates.dt.month >= 7)).to_numpy()
+
+
+def design_matrices(offsets, max_delai=MAX_DELAI):
+    """Matrices de régression par délai, de forme (délais, années de la fenêtre, 4)"""
+    lags = np.arange(max_delai + 1)[:, None]
+    after = (offsets[None, :] >= lags).astype(float)
+    return np.stack([np.ones_like(after), np.broadcast_to(offsets, after.shape).astype(float),
+                     after, (offsets[None, :] - lags) * after], axis=-1)
+
+
+def estimate_policy_impacts(series, policies, fenetre=FENETRE, max_delai=MAX_DELAI, horizon=HORIZON,
+                            n_bootstrap=N_BOOTSTRAP, seed=0):
+    """Impacts estimés pour chaque (politique, série)
+
+    series : colonnes serie, annee, prevalence (format long)
+    policies : colonnes date, titre, type
+    Les combinaisons sans assez d'observations autour de la rupture sont omises.
+    """
+    if not len(series) or not len(policies):
+        return pd.DataFrame(columns=COLUMNS)
+
+    # Séries alignées sur une grille d'années commune : (séries, années)
+    grid = series.pivot_table(index='serie', columns='annee', values='prevalence', aggfunc='mean', sort=True)
+    rng = np.random.default_rng(seed)
+    X = design_matrices(np.arange(-fenetre, fenetre + 1), max_delai)
+    block = max(1, BLOCK_VALUES // (X.shape[0] * len(grid) * 16))
+    frames = [estimate_block(grid, policies.iloc[start:start + block], X, fenetre, horizon, n_bootstrap, rng)
+              for start in range(0, len(policies), block)]
+    return pd.concat(frames, ignore_index=True)
+
+
+def estimate_block(grid, policies, X, fenetre, horizon, n_bootstrap, rng):
+    """Estimation pour un bloc de politiques et toutes les séries"""
+    labels = grid.index.to_numpy()
+    years = grid.columns.to_numpy()
+    values = grid.to_numpy(dtype=float)
+
+    # Fenêtre autour de chaque politique, en années relatives : (politiques, séries, fenêtre)
+    starts = policy_years(policies['date'])
+    offsets = np.arange(-fenetre, fenetre + 1)
+    wanted = starts[:, None] + offsets[None, :]
+    positions = np.clip(np.searchsorted(years, wanted), 0, len(years) - 1)
+    found = years[positions] == wanted
+    window = values[:, positions].transpose(1, 0, 2)
+    weights = (found[:, None, :] & ~np.isnan(window)).astype(float)
+    window = np.where(weights > 0, window, 0.0)
+
+    # Moindres carrés pondérés pour tous les délais à la fois : (politiques, délais, séries, 4)
+    xtwx = np.einsum('loi,pso,loj->plsij', X, weights, X)
+    xtwy = np.einsum('loi,pso->plsi', X, weights * window)
+    before = np.einsum('lo,pso->pls', 1 - X[..., 2], weights)
+    after = np.einsum('lo,pso->pls', X[..., 2], weights)
+    valid = (before >= MIN_AVANT) & (after >= MIN_APRES)
+    xtwx = np.where(valid[..., None, None], xtwx, np.eye(4))
+    beta = np.linalg.solve(xtwx, xtwy[..., None])[..., 0]
+    fitted = np.einsum('loi,plsi->plso', X, beta)
+    sse = np.where(valid, np.einsum('pso,plso->pls', weights, (window[:, None] - fitted) ** 2), np.inf)
+
+    # Délai retenu par combinaison
+    lag = np.argmin(sse, axis=1)  # (politiques, séries)
+    keep = np.take_along_axis(valid, lag[:, None], axis=1)[:, 0]
+    p_idx, s_idx = np.nonzero(keep)
+    lag = lag[p_idx, s_idx]
+    beta = beta[p_idx, lag, s_idx]  # (combinaisons, 4)
+    X_sel = X[lag]                  # (combinaisons, fenêtre, 4)
+    w = weights[p_idx, s_idx]       # (combinaisons, fenêtre)
+    residuals = w * (window[p_idx, s_idx] - np.einsum('koi,ki->ko', X_sel, beta))
+    # Résidus ajustés aux degrés de liberté (les résidus bruts sous-estiment la variance)
+    n_obs = w.sum(axis=1)
+    residuals *= np.sqrt(n_obs / np.maximum(n_obs - 4, 1))[:, None]
+
+    contrast = np.array([0.0, 0.0, 1.0, float(horizon)])
+    impact = beta @ contrast
+    # impact* - impact = g . e*, avec g = c (X'WX)^-1 X'W
+    gain = np.einsum('i,kij,koj->ko', contrast, np.linalg.inv(xtwx[p_idx, lag, s_idx]), X_sel) * w
+
+    low, high = bootstrap_interval(impact, gain, residuals, w, n_bootstrap, rng)
+
+    return pd.DataFrame({
+        'serie': labels[s_idx],
+        'politique': policies['titre'].to_numpy()[p_idx],
+        'type': policies['type'].to_numpy()[p_idx],
+        'annee': starts[p_idx],
+        'delai_impact': lag,
+        'impact_prevalence': impact,
+        'ic_bas': low,
+        'ic_haut': high,
+        'changement_niveau': beta[:, 2],
+        'changement_pente': beta[:, 3],
+        'n_obs': n_obs.astype(int),
+    }, columns=COLUMNS)
+
+
+def bootstrap_interval(impact, gain, residuals, weights, n_bootstrap, rng):
+    """Intervalle de confiance par bootstrap des résidus, par bloc de combinaisons
+
+    Les résidus de chaque combinaison sont rééchantillonnés parmi ses seules
+    observations ; l'impact rééchantillonné vaut impact + gain . résidus*.
+    """
+    n_pairs, width = residuals.shape
+    alpha = (1 - NIVEAU_CONFIANCE) / 2
+    low, high = np.empty(n_pairs), np.empty(n_pairs)
+    if not n_pairs:
+        return low, high
+
+    # Observations de chaque combinaison en tête : un tirage uniforme dans [0, n_obs) les désigne
+    order = np.argsort(weights == 0, axis=1, kind='stable')
+    counts = weights.sum(axis=1)
+    block = max(1, BLOCK_VALUES // (n_bootstrap * width))
+    for start in range(0, n_pairs, block):
+        part = slice(start, start + block)
+        draws = (rng.random((n_bootstrap, min(block, n_pairs - start), width))
+                 * counts[part, None]).astype(int)
+        picked = np.take_along_axis(np.broadcast_to(order[part], draws.shape), draws, axis=-1)
+        resampled = np.take_along_axis(np.broadcast_to(residuals[part], draws.shape), picked, axis=-1)
+        samples = impact[part] + np.einsum('bko,ko->bk', resampled, gain[part])
+        low[part], high[part] = np.quantile(samples, [alpha, 1 - alpha], axis=0)
+    return low, high
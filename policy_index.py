@@ -0,0 +1,168 @@
+"""Index d'intervalles des politiques anti-tabac
+
+Chaque politique est en vigueur de sa date d'entrée (colonne date) jusqu'à la
+veille de sa date de fin (colonne date_fin, facultative ; absente = toujours en
+vigueur). Les événements sont triés une fois par date d'entrée :
+
+- « entrées dans la période » et « en vigueur pendant la période » sont des
+  recherches dichotomiques suivies d'une tranche,
+- la jointure avec une série (année, mois ou jour) associe à chaque ligne les
+  politiques entrées dans la même période, sans pd.merge ni reconversion des dates,
+- des événements ajoutés (en fin de table) sont insérés à leur place sans
+  reconvertir ni retrier les autres ; l'index précédent reste intact pour les
+  sessions qui l'utilisent encore.
+"""
+import numpy as np
+import pandas as pd
+
+GRANULARITIES = ('year', 'month', 'day')
+# Date de fin des politiques sans échéance
+OPEN_END = np.datetime64('2262-01-01', 'ns')
+# Colonnes qui identifient un événement
+KEY_COLUMNS = ('date', 'titre')
+
+
+def period_keys(values, granularity):
+    """Clé entière de la période (année, mois ou jour) de chaque valeur"""
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Granularité inconnue: {granularity}")
+    values = pd.Series(values)
+    if pd.api.types.is_integer_dtype(values):
+        if granularity != 'year':
+            raise ValueError("Des années entières ne se joignent qu'à la granularité 'year'")
+        return values.to_numpy(dtype=np.int64)
+    dates = pd.to_datetime(values)
+    if granularity == 'year':
+        return dates.dt.year.to_numpy(dtype=np.int64)
+    if granularity == 'month':
+        return (dates.dt.year * 12 + dates.dt.month - 1).to_numpy(dtype=np.int64)
+    return dates.to_numpy(dtype='datetime64[ns]').astype('datetime64[D]').astype(np.int64)
+
+
+def window_bounds(start, end):
+    """Bornes [début, fin) d'une période : une année couvre l'année entière, une date sa journée"""
+    def bound(value, upper):
+        if value is None:
+            return None
+        if isinstance(value, (int, np.integer)):
+            return np.datetime64(f"{int(value) + upper:04d}-01-01", 'ns')
+        day = pd.Timestamp(value).normalize() + pd.Timedelta(days=upper)
+        return np.datetime64(day.to_datetime64(), 'ns')
+    return bound(start, 0), bound(end, 1)
+
+
+class PolicyIntervalIndex:
+    """Politiques triées par date d'entrée en vigueur, avec leur date de fin"""
+
+    def __init__(self, events=None):
+        events = pd.DataFrame(events if events is not None else {'date': [], 'titre': []})
+        self._assign(prepare_events(events), {column: events[column].to_numpy() for column in KEY_COLUMNS})
+
+    def _assign(self, events, source_keys):
+        self.events = events
+        self.starts = events['date'].to_numpy(dtype='datetime64[ns]')
+        self.ends = end_dates(events)
+        # Colonnes clés dans l'ordre de la source, pour reconnaître un ajout en fin de table
+        self.source_keys = source_keys
+        self._keys = {}
+
+    def __len__(self):
+        return len(self.starts)
+
+    def period_keys(self, granularity):
+        """Clés de période des entrées en vigueur (croissantes), calculées une fois par granularité"""
+        keys = self._keys.get(granularity)
+        if keys is None:
+            keys = self._keys[granularity] = period_keys(self.events['date'], granularity)
+        return keys
+
+    def between(self, start=None, end=None):
+        """Politiques entrées en vigueur pendant la période (une tranche, sans copie)"""
+        lo, hi = window_bounds(start, end)
+        first = 0 if lo is None else int(np.searchsorted(self.starts, lo, side='left'))
+        last = len(self.starts) if hi is None else int(np.searchsorted(self.starts, hi, side='left'))
+        return self.events.iloc[first:max(first, last)]
+
+    def active(self, start=None, end=None):
+        """Politiques en vigueur à un moment de la période"""
+        lo, hi = window_bounds(start, end)
+        last = len(self.starts) if hi is None else int(np.searchsorted(self.starts, hi, side='left'))
+        if lo is None or 'date_fin' not in self.events:
+            return self.events.iloc[:last]
+        return self.events.iloc[:last][self.ends[:last] > lo]
+
+    def merge(self, frame, on='annee', granularity='year'):
+        """Jointure à gauche de `frame` avec les politiques entrées pendant la période de chaque ligne
+
+        Même résultat que pd.merge(frame, politiques, how='left') sur la période :
+        une ligne par politique correspondante, une ligne sans politique sinon.
+        """
+        keys = period_keys(frame[on], granularity)
+        event_keys = self.period_keys(granularity)
+        lo = np.searchsorted(event_keys, keys, side='left')
+        hi = np.searchsorted(event_keys, keys, side='right')
+        counts = np.maximum(hi - lo, 1)
+        rows = np.repeat(np.arange(len(frame)), counts)
+        matched = np.repeat(hi > lo, counts)
+        rank = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+        positions = np.where(matched, np.repeat(lo, counts) + rank, 0)
+
+        left = frame.take(rows).reset_index(drop=True)
+        right = self.events.drop(columns=[c for c in self.events.columns if c in frame.columns])
+        if len(self.events):
+            right = right.take(positions).reset_index(drop=True)
+            right = right.where(np.broadcast_to(matched[:, None], right.shape))
+        else:
+            right = pd.DataFrame(index=left.index, columns=right.columns)
+        return pd.concat([left, right], axis=1)
+
+    def add(self, frame):
+        """Nouvel index avec les événements de `frame` insérés à leur place (self est inchangé)
+
+        Seuls les nouveaux événements sont convertis et triés ; ils sont
+        fusionnés avec les événements déjà triés par recherche dichotomique.
+        """
+        frame = pd.DataFrame(frame)
+        if not len(frame):
+            return self
+        new = prepare_events(frame)
+        positions = np.searchsorted(self.starts, new['date'].to_numpy(dtype='datetime64[ns]'), side='right')
+        order = np.insert(np.arange(len(self)), positions, np.arange(len(self), len(self) + len(new)))
+        events = pd.concat([self.events, new], ignore_index=True).take(order).reset_index(drop=True)
+        # Un index vide n'impose pas son type (float64) aux clés ajoutées (dates, chaînes)
+        source_keys = {column: np.concatenate([values, frame[column].to_numpy()]) if len(values)
+                       else frame[column].to_numpy() for column, values in self.source_keys.items()}
+        index = PolicyIntervalIndex.__new__(PolicyIntervalIndex)
+        index._assign(events, source_keys)
+        return index
+
+    def extends(self, frame):
+        """Vrai si `frame` commence par les événements indexés (ajouts en fin de table seulement)"""
+        n = len(self)
+        if len(frame) < n:
+            return False
+        return all(np.array_equal(frame[column].to_numpy()[:n], values)
+                   for column, values in self.source_keys.items())
+
+    def synced(self, frame):
+        """Index à jour avec `frame` : les lignes ajoutées en fin de table sont insérées, sinon reconstruction"""
+        if self.extends(frame):
+            return self.add(frame.iloc[len(self):])
+        return PolicyIntervalIndex(frame)
+
+
+def prepare_events(frame):
+    """Dates converties et année d'entrée en vigueur, triés par date"""
+    dates = pd.to_datetime(frame['date'])
+    events = frame.assign(date=dates, annee=dates.dt.year)
+    if 'date_fin' in events:
+        events['date_fin'] = pd.to_datetime(events['date_fin'])
+    return events.sort_values('date', kind='stable').reset_index(drop=True)
+
+
+def end_dates(events):
+    """Fin (exclue) de chaque politique : lendemain de date_fin, ou OPEN_END"""
+    if 'date_fin' not in events:
+        return np.full(len(events), OPEN_END)
+    ends = events['date_fin'].to_numpy(dtype='datetime64[ns]') + np.timedelta64(1, 'D')
+    return np.where(np.isnat(ends), OPEN_END, ends)
@@ -0,0 +1,155 @@
+"""Simulateur de scénarios de prix du paquet
+
+Modèle à élasticité constante, ajusté sur historical_data :
+
+    log(consommation) = a + e_c * log(prix)
+    log(prévalence)   = b + e_p * log(prix)
+    recettes          = part fiscale * prix * consommation / 20   (20 cigarettes par paquet)
+
+Toute l'évolution historique est attribuée au prix (pas de tendance propre) : à
+prix constant, les projections restent au niveau de la dernière année observée.
+Un scénario fixe le prix cible de chaque année de TARGET_YEARS (interpolation
+linéaire depuis le dernier prix observé, prix constant ensuite) ; une hypothèse
+d'élasticité multiplie les deux élasticités ajustées. Une année cible déjà
+observée n'est plus réglable : son prix est le dernier prix observé et
+l'interpolation part de la dernière année des données.
+
+Toutes les combinaisons de la grille (prix cibles x hypothèses d'élasticité)
+sont évaluées en une seule opération NumPy : la surface de réponse obtenue est
+calculée une fois par version des données, puis chaque réglage des curseurs
+n'est qu'une lecture dans la grille.
+"""
+import numpy as np
+import pandas as pd
+
+# Années dont le prix cible est réglable, et fin de l'horizon simulé
+TARGET_YEARS = (2025, 2027)
+HORIZON_END = 2030
+# Grille des prix cibles (€/paquet) : du dernier prix observé à PRICE_MAX, au pas PRICE_STEP
+PRICE_STEP = 0.1
+PRICE_MAX = {2025: 18.0, 2027: 22.0}
+# Hypothèses d'élasticité : multiplicateurs des élasticités ajustées
+ELASTICITY_MULTIPLIERS = np.round(np.arange(0.5, 1.5 + 1e-9, 0.05), 2)
+CIGARETTES_PER_PACK = 20
+OUTPUTS = ('consommation', 'prevalence', 'recettes')
+
+
+def fit_elasticities(historical):
+    """Élasticités-prix de la consommation et de la prévalence, part fiscale du prix et point de départ"""
+    historical = historical.dropna(subset=['prix_moyen', 'consommation_cigarettes', 'prevalence_tabagisme'])
+    historical = historical.sort_values('annee')
+    log_price = np.log(historical['prix_moyen'].to_numpy(dtype=float))
+    X = np.column_stack([np.ones_like(log_price), log_price])
+
+    elasticities = {}
+    for name, column in (('consommation', 'consommation_cigarettes'), ('prevalence', 'prevalence_tabagisme')):
+        coef, *_ = np.linalg.lstsq(X, np.log(historical[column].to_numpy(dtype=float)), rcond=None)
+        elasticities[name] = float(coef[1])
+
+    spending = historical['prix_moyen'] * historical['consommation_cigarettes'] / CIGARETTES_PER_PACK
+    last = historical.iloc[-1]
+    return {
+        'elasticite_consommation': elasticities['consommation'],
+        'elasticite_prevalence': elasticities['prevalence'],
+        'part_fiscale': float((historical['recettes_fiscales'] / spending).tail(5).mean()),
+        'annee': int(last['annee']),
+        'prix': float(last['prix_moyen']),
+        'consommation': float(last['consommation_cigarettes']),
+        'prevalence': float(last['prevalence_tabagisme']),
+        'recettes': float(last['recettes_fiscales']),
+    }
+
+
+def interpolation_weights(base_year, target_years, years):
+    """Poids (années, points d'ancrage) de l'interpolation linéaire des prix entre ancrages
+
+    Les années cibles antérieures ou égales à `base_year` (déjà observées) ont un
+    poids nul : l'interpolation part de max(base_year, année cible).
+    """
+    columns = [0] + [column for column, target in enumerate(target_years, start=1) if target > base_year]
+    anchors = np.array([base_year, *target_years], dtype=float)[columns]
+    weights = np.zeros((len(years), len(target_years) + 1))
+    for row, year in enumerate(years):
+        if year >= anchors[-1]:
+            weights[row, columns[-1]] = 1.0
+            continue
+        right = int(np.searchsorted(anchors, year, side='right'))
+        share = (year - anchors[right - 1]) / (anchors[right] - anchors[right - 1])
+        weights[row, columns[right - 1]], weights[row, columns[right]] = 1 - share, share
+    return weights
+
+
+class ScenarioSurface:
+    """Surface de réponse : résultats de chaque scénario de la grille, par année simulée
+
+    Tableaux de forme (prix 2025, prix 2027, élasticités, années), en float32.
+    """
+
+    def __init__(self, model, target_prices, multipliers, years, outputs):
+        self.model = model
+        self.target_prices = target_prices
+        self.multipliers = multipliers
+        self.years = years
+        self.outputs = outputs
+
+    def _position(self, axis, value):
+        return int(np.clip(np.rint((value - axis[0]) / (axis[1] - axis[0]) if len(axis) > 1 else 0),
+                           0, len(axis) - 1))
+
+    def indices(self, prices, multiplier):
+        """Position dans la grille du scénario le plus proche"""
+        return (*(self._position(axis, price) for axis, price in zip(self.target_prices, prices)),
+                self._position(self.multipliers, multiplier))
+
+    def grid_prices(self, prices):
+        """Prix cibles du scénario le plus proche (dernier prix observé pour une année passée)"""
+        return tuple(float(axis[self._position(axis, price)]) for axis, price in zip(self.target_prices, prices))
+
+    def scenario(self, prices, multiplier=1.0):
+        """Trajectoire d'un scénario : prix, consommation, prévalence et recettes par année
+
+        Les colonnes *_bas / *_haut donnent la fourchette sur toutes les hypothèses d'élasticité.
+        """
+        *price_index, elasticity_index = self.indices(prices, multiplier)
+        anchors = [self.model['prix'], *(axis[i] for axis, i in zip(self.target_prices, price_index))]
+        weights = interpolation_weights(self.model['annee'], TARGET_YEARS, self.years)
+        frame = pd.DataFrame({'annee': self.years, 'prix': weights @ np.asarray(anchors)})
+        for name in OUTPUTS:
+            values = self.outputs[name][tuple(price_index)]  # (élasticités, années)
+            frame[name] = values[elasticity_index]
+            frame[f"{name}_bas"] = values.min(axis=0)
+            frame[f"{name}_haut"] = values.max(axis=0)
+        return frame
+
+    def final_surface(self, output, multiplier=1.0):
+        """Résultat de la dernière année pour tous les couples de prix cibles, à élasticité donnée"""
+        return self.outputs[output][:, :, self._position(self.multipliers, multiplier), -1]
+
+
+def build_surface(historical, end_year=HORIZON_END, multipliers=ELASTICITY_MULTIPLIERS):
+    """Évalue toute la grille de scénarios en une passe vectorisée"""
+    model = fit_elasticities(historical)
+    # Au moins une année simulée, même si les données atteignent la fin de l'horizon
+    years = np.arange(model['annee'] + 1, max(end_year, model['annee'] + 1) + 1)
+    # Une année cible déjà observée n'a qu'un prix possible : le dernier observé
+    target_prices = [np.round(np.arange(model['prix'], max(PRICE_MAX[year], model['prix']) + 1e-9, PRICE_STEP), 2)
+                     if year > model['annee'] else np.array([round(model['prix'], 2)])
+                     for year in TARGET_YEARS]
+
+    # Prix de chaque scénario et de chaque année : (prix 2025, prix 2027, années)
+    weights = interpolation_weights(model['annee'], TARGET_YEARS, years)
+    first, second = np.meshgrid(*target_prices, indexing='ij')
+    anchors = np.stack([np.full_like(first, model['prix']), first, second], axis=-1)
+    prices = anchors @ weights.T
+
+    # Ratio de prix élevé aux élasticités de chaque hypothèse : (prix 2025, prix 2027, élasticités, années)
+    log_ratio = np.log(prices / model['prix']).astype(np.float32)[:, :, None, :]
+    scale = np.asarray(multipliers, dtype=np.float32)[None, None, :, None]
+    consumption = model['consommation'] * np.exp(model['elasticite_consommation'] * scale * log_ratio)
+    outputs = {
+        'consommation': consumption,
+        'prevalence': model['prevalence'] * np.exp(model['elasticite_prevalence'] * scale * log_ratio),
+        'recettes': (model['part_fiscale'] / CIGARETTES_PER_PACK) * prices.astype(np.float32)[:, :, None, :]
+                    * consumption,
+    }
+    return ScenarioSurface(model, target_prices, np.asarray(multipliers), years, outputs)
@@ -0,0 +1,71 @@
+"""Détection des changements de données pour le rafraîchissement automatique
+
+Un seul thread par processus interroge périodiquement l'empreinte des sources
+(taille et date des fichiers). Les sessions se contentent de comparer cette
+version partagée à la leur : aucune ne bloque ni n'interroge le disque.
+"""
+import logging
+import threading
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+class DataChangeMonitor:
+    """Surveille l'empreinte des données dans un thread d'arrière-plan"""
+
+    def __init__(self, fingerprint, interval=30.0):
+        self._fingerprint = fingerprint
+        self.interval = interval
+        self.version = fingerprint()
+        self.last_check = datetime.now()
+        self.last_change = None
+        self.checks = 0
+        self.changes = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='data-change-monitor', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception:
+                # Une empreinte défaillante est signalée sans arrêter la surveillance
+                logger.exception("Échec de la vérification des données")
+
+    def check(self):
+        """Recalcule l'empreinte ; retourne True si les données ont changé
+
+        Un fichier illisible pendant le relevé (remplacé, supprimé) est une erreur
+        passagère : la vérification est reportée. Toute autre erreur est levée.
+        """
+        try:
+            version = self._fingerprint()
+        except OSError as error:
+            logger.warning("Empreinte des données illisible, vérification reportée: %s", error)
+            return False
+        self.checks += 1
+        self.last_check = datetime.now()
+        if version == self.version:
+            return False
+        self.version = version
+        self.last_change = self.last_check
+        self.changes += 1
+        return True
+
+    def stop(self):
+        self._stop.set()
+
+
+def version_changed(state, version, key='version_donnees_vue'):
+    """Vrai une seule fois par nouvelle version du moniteur, pour une session
+
+    `state` (st.session_state) retient la dernière version du moniteur prise en
+    compte. La version propre à la session, recalculée depuis les fichiers à
+    chaque rendu, peut devancer celle du moniteur jusqu'à sa prochaine
+    vérification : la comparer au moniteur relancerait le rendu en boucle.
+    """
+    seen = state.get(key)
+    state[key] = version
+    return seen is not None and seen != version
@@ -0,0 +1,193 @@
+"""Ingestion en flux des extraits de ventes des buralistes
+
+Les extraits bruts (CSV de plusieurs Go) sont lus par blocs de taille bornée ;
+chaque bloc est réduit en agrégats mensuels, si bien que la mémoire dépend du
+nombre de mois et non de la taille des fichiers. Les agrégats sont conservés
+par fichier source : un nouveau fichier s'ajoute sans relire l'historique, et
+un fichier modifié remplace uniquement sa propre contribution.
+
+Usage :
+    python sales_ingestion.py ventes_2024_01.csv ventes_2024_02.csv [--data-dir data]
+"""
+import argparse
+import json
+import os
+
+import pandas as pd
+
+# Colonnes attendues dans les extraits de ventes
+SALES_COLUMNS = {
+    'date': 'date',                    # date de la vente (AAAA-MM-JJ)
+    'paquets': 'paquets',              # nombre de paquets vendus
+    'montant_ttc': 'montant_ttc',      # chiffre d'affaires TTC (€)
+    'montant_taxes': 'montant_taxes',  # accises et TVA reversées (€)
+}
+CIGARETTES_PAR_PAQUET = 20
+CHUNK_ROWS = 500_000
+
+MONTHLY_FILE = 'ventes_mensuelles.arrow'
+MANIFEST_FILE = 'ventes_manifest.json'
+HISTORICAL_FILE = 'historique.arrow'
+AGGREGATE_COLUMNS = ['paquets', 'montant_ttc', 'montant_taxes']
+
+
+class SalesAggregator:
+    """Agrégats mensuels des ventes, mis à jour fichier par fichier"""
+
+    def __init__(self, data_dir, chunk_rows=CHUNK_ROWS):
+        self.data_dir = data_dir
+        self.chunk_rows = chunk_rows
+        self.monthly = self._load_monthly()
+        self.manifest = self._load_manifest()
+
+    def _load_monthly(self):
+        path = os.path.join(self.data_dir, MONTHLY_FILE)
+        if os.path.exists(path):
+            return pd.read_feather(path)
+        return pd.DataFrame({'source': pd.Series(dtype='str'),
+                             'annee': pd.Series(dtype='int16'),
+                             'mois': pd.Series(dtype='int8'),
+                             **{col: pd.Series(dtype='float64') for col in AGGREGATE_COLUMNS}})
+
+    def _load_manifest(self):
+        path = os.path.join(self.data_dir, MANIFEST_FILE)
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        return {}
+
+    @staticmethod
+    def _signature(path):
+        stat = os.stat(path)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def is_ingested(self, path):
+        """Vrai si le fichier a déjà été agrégé dans son état actuel"""
+        entry = self.manifest.get(os.path.abspath(path))
+        return entry is not None and entry['signature'] == self._signature(path)
+
+    def aggregate_file(self, path):
+        """Réduit un extrait CSV en agrégats mensuels, bloc par bloc"""
+        rename = {source: target for target, source in SALES_COLUMNS.items()}
+        totals = None
+        rows = 0
+        reader = pd.read_csv(
+            path,
+            usecols=list(SALES_COLUMNS.values()),
+            dtype={SALES_COLUMNS[col]: 'float64' for col in AGGREGATE_COLUMNS},
+            chunksize=self.chunk_rows,
+        )
+        for chunk in reader:
+            chunk = chunk.rename(columns=rename)
+            dates = pd.to_datetime(chunk['date'], format='ISO8601')
+            partial = chunk[AGGREGATE_COLUMNS].groupby([dates.dt.year.rename('annee'),
+                                                        dates.dt.month.rename('mois')]).sum()
+            totals = partial if totals is None else totals.add(partial, fill_value=0)
+            rows += len(chunk)
+
+        if totals is None:
+            return pd.DataFrame(columns=['annee', 'mois'] + AGGREGATE_COLUMNS), rows
+        return totals.reset_index(), rows
+
+    def ingest(self, path):
+        """Ajoute (ou remplace) la contribution d'un fichier ; retourne le nombre de lignes lues"""
+        source = os.path.abspath(path)
+        if self.is_ingested(path):
+            return 0
+
+        monthly, rows = self.aggregate_file(path)
+        monthly.insert(0, 'source', source)
+        kept = self.monthly[self.monthly['source'] != source]
+        self.monthly = pd.concat([kept, monthly], ignore_index=True).astype(
+            {'annee': 'int16', 'mois': 'int8'})
+        self.manifest[source] = {'signature': self._signature(path), 'lignes': rows}
+        return rows
+
+    def monthly_totals(self):
+        """Agrégats mensuels toutes sources confondues"""
+        totals = self.monthly.groupby(['annee', 'mois'], as_index=False)[AGGREGATE_COLUMNS].sum()
+        return totals.sort_values(['annee', 'mois'], ignore_index=True)
+
+    def months_per_year(self):
+        """Nombre de mois distincts couverts par les ventes, par année"""
+        return self.monthly.groupby('annee')['mois'].nunique()
+
+    def partial_years(self):
+        """Années dont les ventes ne couvrent pas les 12 mois : {année: mois couverts}"""
+        months = self.months_per_year()
+        return {int(year): int(count) for year, count in months[months < 12].items()}
+
+    def yearly_indicators(self):
+        """Indicateurs annuels au format de historical_data, pour les années complètes seulement
+
+        Une année partielle (extrait du premier trimestre…) donnerait des totaux
+        d'un trimestre présentés comme annuels : elle attend ses 12 mois.
+        """
+        months = self.months_per_year()
+        complete = self.monthly[self.monthly['annee'].isin(months.index[months == 12])]
+        yearly = complete.groupby('annee')[AGGREGATE_COLUMNS].sum()
+        return pd.DataFrame({
+            'consommation_cigarettes': yearly['paquets'] * CIGARETTES_PAR_PAQUET / 1e9,
+            'prix_moyen': yearly['montant_ttc'] / yearly['paquets'],
+            'recettes_fiscales': yearly['montant_taxes'] / 1e9,
+        }).reset_index()
+
+    def historical_data(self, base):
+        """Met à jour les indicateurs de ventes d'un historical_data existant
+
+        Les années complètes des ventes remplacent les valeurs agrégées ;
+        les autres colonnes (prévalence, fumeurs quotidiens) sont conservées.
+        Les lignes d'années partielles sans autre donnée que les ventes
+        (écrites par une ingestion antérieure) sont retirées.
+        """
+        indicators = self.yearly_indicators()
+        merged = base.set_index('annee')
+        other = merged.columns.difference(indicators.columns)
+        stale = merged.index.isin(list(self.partial_years())) & merged[other].isna().all(axis=1).to_numpy()
+        merged = merged[~stale]
+        merged = merged.reindex(merged.index.union(indicators['annee']))
+        merged.update(indicators.set_index('annee'))
+        return merged.rename_axis('annee').reset_index()
+
+    def save(self, base):
+        """Écrit les agrégats, le manifeste et le historical_data consommé par le dashboard"""
+        os.makedirs(self.data_dir, exist_ok=True)
+        self.monthly.reset_index(drop=True).to_feather(
+            os.path.join(self.data_dir, MONTHLY_FILE), compression='uncompressed')
+        self.historical_data(base).to_feather(
+            os.path.join(self.data_dir, HISTORICAL_FILE), compression='uncompressed')
+        with open(os.path.join(self.data_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2)
+
+
+def load_base_historical(data_dir, builtin):
+    """historical_data actuel : fichier du chargeur, sinon `builtin()` (données intégrées)"""
+    path = os.path.join(data_dir, HISTORICAL_FILE)
+    if os.path.exists(path):
+        return pd.read_feather(path)
+    return builtin()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingestion des extraits de ventes de tabac")
+    parser.add_argument('files', nargs='+', help="extraits CSV à agréger")
+    parser.add_argument('--data-dir', default=os.environ.get(
+        'TABAC_DATA_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')))
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+
+    # Point d'entrée en ligne de commande : seul lui dépend du dashboard (données intégrées)
+    from Dashboard import TobaccoDashboard
+
+    aggregator = SalesAggregator(args.data_dir, chunk_rows=args.chunk_rows)
+    base = load_base_historical(args.data_dir, TobaccoDashboard.initialize_historical_data)
+    for path in args.files:
+        rows = aggregator.ingest(path)
+        print(f"{path}: {rows} lignes agrégées" if rows else f"{path}: déjà ingéré")
+    aggregator.save(base)
+    for year, months in aggregator.partial_years().items():
+        print(f"{year}: {months} mois sur 12, année non publiée dans {HISTORICAL_FILE}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,401 @@
+"""Site statique du dashboard, servi sans session Streamlit (nginx, CDN)
+
+Les six sections et tous leurs onglets sont rendus pour un ensemble de périodes
+précalculées : une page HTML par période, la première servant aussi d'index.
+Les figures sont construites en parallèle dans un pool de processus, puis
+écrites sous l'empreinte de leur contenu (figures/<empreinte>.json) : un
+fichier ne change jamais et peut être mis en cache indéfiniment par le serveur.
+
+Reconstruction incrémentale : le manifeste garde, pour chaque figure, les jeux
+de données qu'elle lit (relevés une fois par version du code) et, pour chaque
+période, sa clé d'entrée (code, paramètres, période, signature de ces jeux de
+données). Seules les figures dont la clé a changé sont reconstruites ; les
+pages inchangées ne sont pas réécrites.
+
+Usage :
+    python static_site.py [--out site] [--periods 2000-2023 2014-2023] [--workers 4]
+"""
+import argparse
+import hashlib
+import html
+import json
+import multiprocessing
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import narrative
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SITE_DIR = os.path.join(BASE_DIR, 'site')
+# Périodes par défaut : toute la série, puis ses RECENT_YEARS dernières années
+RECENT_YEARS = (10, 5)
+MANIFEST = 'manifest.json'
+
+# Onglets de chaque section : (libellé, figures (id, paramètres), texte de narrative.py).
+# Les paramètres sont ceux des onglets du dashboard à l'ouverture, pour partager son cache de figures.
+TABS = {
+    'historique': [
+        ("Prévalence", [('prevalence', {'projections': True}), ('repartition_fumeurs', {})], []),
+        ("Consommation & Prix", [('consommation', {}), ('prix_consommation', {})], []),
+        ("Impact Santé", [('mortalite', {}), ('couts_sante', {})], []),
+    ],
+    'politiques': [
+        ("Timeline des Politiques", [('timeline', {})], []),
+        ("Impact des Mesures", [('impact_prevalence', {'serie': 'France'}),
+                                ('delai_impact', {'serie': 'France'})], []),
+        ("Efficacité Comparée", [('efficacite', {})], []),
+    ],
+    'regional': [
+        ("Cartographie", [('carte', {})], []),
+        ("Disparités Régionales", [('classement', {}), ('evolution', {})], []),
+        ("Analyse Démographique", [], narrative.DEMOGRAPHICS),
+    ],
+    'international': [
+        ("Prévalence", [('prevalence', {}), ('prix_prevalence', {})], []),
+        ("Politiques", [('politiques', {})], []),
+        ("Performances", [('performances', {})], []),
+    ],
+    'strategies': [
+        ("Objectifs 2030", [], narrative.OBJECTIVES),
+        ("Stratégies Prioritaires", [], narrative.PRIORITIES),
+        ("Feuille de Route", [('projection', {'serie': 'France'})],
+         [[f"**📅 {step['periode']}**  \n" + "  \n".join(f"• {action}" for action in step['actions'])
+           for step in narrative.ROADMAP]]),
+        ("Simulateur de Prix", [('scenario', {'prix_2025': 13.0, 'prix_2027': 15.0, 'elasticite': 1.0}),
+                                ('surface', {'elasticite': 1.0})], []),
+    ],
+    'synthese': [
+        ("Synthèse", [], narrative.SYNTHESIS),
+    ],
+}
+
+_worker_dashboard = None
+
+
+class RecordingLoader:
+    """Chargeur du dashboard qui relève les jeux de données consultés"""
+
+    def __init__(self, loader):
+        self._loader = loader
+        self.names = set()
+
+    def load(self, name, columns=None):
+        self.names.add(name)
+        return self._loader.load(name, columns)
+
+    def available(self, name):
+        self.names.add(name)
+        return self._loader.available(name)
+
+    def __getattr__(self, attribute):
+        return getattr(self._loader, attribute)
+
+
+def figure_dependencies(section, figure_id, params):
+    """Jeux de données lus par une figure, construite hors cache avec des données fraîches"""
+    from Dashboard import SharedDatasets, TobaccoDashboard, current_data_version, get_data_loader
+    loader = RecordingLoader(get_data_loader())
+    dashboard = TobaccoDashboard(SharedDatasets(current_data_version(), loader))
+    getattr(dashboard, f"figure_{section}_{figure_id}")(**params)
+    return sorted(loader.names)
+
+
+def build_figure(section, figure_id, params, period):
+    """Figure sérialisée pour une période, dans un processus du pool (cache de figures partagé)"""
+    global _worker_dashboard
+    if _worker_dashboard is None:
+        from Dashboard import TobaccoDashboard
+        _worker_dashboard = TobaccoDashboard()
+    _worker_dashboard.apply_controls({'annee_debut': period[0], 'annee_fin': period[1]})
+    return _worker_dashboard.figure_json(section, figure_id, **params)
+
+
+def default_periods(first, last):
+    """Toute la série, puis ses dernières années"""
+    periods = [(first, last)] + [(max(first, last - years + 1), last) for years in RECENT_YEARS]
+    return list(dict.fromkeys(periods))
+
+
+def figure_name(section, figure_id, params):
+    """Identifiant stable d'une figure et de ses paramètres"""
+    name = f"{section}.{figure_id}"
+    return f"{name}:{json.dumps(params, sort_keys=True)}" if params else name
+
+
+def site_tabs():
+    """Onglets du site ; la carte régionale devient une choroplèthe si ses contours sont en cache"""
+    from Dashboard import cached_level_path, get_data_loader
+    tabs = {section: list(items) for section, items in TABS.items()}
+    geometry_path = cached_level_path('region')
+    if geometry_path and get_data_loader().available('regional_data'):
+        label, _, text = tabs['regional'][0]
+        params = {'niveau': 'region', 'geometrie': (geometry_path, os.path.getmtime(geometry_path))}
+        tabs['regional'][0] = (label, [('choroplethe', params)], text)
+    return tabs
+
+
+def markdown_html(text):
+    """HTML du Markdown des textes : titres, gras, retours à la ligne (deux espaces en fin de ligne)"""
+    def inline(line):
+        return re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', html.escape(line))
+
+    blocks = []
+    for block in re.split(r'\n\s*\n', text.strip()):
+        heading = re.fullmatch(r'(#{1,6}) (.*)', block.strip())
+        if heading:
+            level = len(heading.group(1))
+            blocks.append(f"<h{level}>{inline(heading.group(2))}</h{level}>")
+            continue
+        lines = block.split('\n')
+        body = ''.join(inline(line.rstrip()) + ('<br>' if line.endswith('  ') else ' ') for line in lines)
+        blocks.append(f"<p>{re.sub(r'(<br>)+$', '', body.strip())}</p>")
+    return '\n'.join(blocks)
+
+
+def read_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_if_changed(path, content):
+    """Écrit le fichier s'il est absent ou différent ; vrai s'il a été écrit"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    except OSError:
+        pass
+    with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(f"{path}.tmp", path)
+    return True
+
+
+def process_pool(workers):
+    # spawn, comme le moteur d'export : les processus importent le dashboard
+    if BASE_DIR not in sys.path:
+        sys.path.insert(0, BASE_DIR)
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+
+
+def build_site(out_dir=SITE_DIR, periods=None, workers=None):
+    """Construit (ou met à jour) le site ; retourne les compteurs de la construction"""
+    import plotly.offline
+    from Dashboard import COMPACT_FIGURES, FIGURE_CODE_VERSION, TobaccoDashboard
+
+    dashboard = TobaccoDashboard()
+    loader = dashboard.datasets.loader
+    if not periods:
+        year_index = dashboard.datasets.year_index('historical_data')
+        periods = default_periods(year_index.first, year_index.last)
+    tabs = site_tabs()
+    figures = {figure_name(section, figure_id, params): (section, figure_id, params)
+               for section, items in tabs.items() for _, tab_figures, _ in items
+               for figure_id, params in tab_figures}
+
+    manifest = read_manifest(out_dir)
+    same_code = manifest.get('code') == FIGURE_CODE_VERSION
+    dependencies = {name: deps for name, deps in manifest.get('dependances', {}).items()
+                    if same_code and name in figures}
+    previous = manifest.get('figures', {}) if same_code else {}
+    os.makedirs(os.path.join(out_dir, 'figures'), exist_ok=True)
+    counters = {'construites': 0, 'inchangees': 0, 'pages': 0}
+
+    with process_pool(workers or min(4, os.cpu_count() or 1)) as pool:
+        # Jeux de données lus par chaque figure (une fois par version du code)
+        missing = {name: pool.submit(figure_dependencies, *figures[name])
+                   for name in figures if name not in dependencies}
+        for name, future in missing.items():
+            dependencies[name] = future.result()
+
+        # Clé d'entrée de chaque (figure, période) : seules les clés changées sont reconstruites
+        entries, pending = {}, {}
+        for name, (section, figure_id, params) in figures.items():
+            signatures = {dataset: loader.signature(dataset) for dataset in dependencies[name]}
+            for period in periods:
+                entry_name = f"{name}@{period[0]}-{period[1]}"
+                key = hashlib.sha1(json.dumps([FIGURE_CODE_VERSION, COMPACT_FIGURES, name, period, signatures],
+                                              sort_keys=True).encode('utf-8')).hexdigest()
+                entry = previous.get(entry_name)
+                if entry and entry['cle'] == key and os.path.exists(os.path.join(out_dir, entry['fichier'])):
+                    entries[entry_name] = entry
+                    counters['inchangees'] += 1
+                else:
+                    pending[entry_name] = (key, pool.submit(build_figure, section, figure_id, params, period))
+
+        for entry_name, (key, future) in pending.items():
+            payload = future.result()
+            figure = json.loads(payload)
+            path = f"figures/{hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]}.json"
+            if not os.path.exists(os.path.join(out_dir, path)):
+                write_if_changed(os.path.join(out_dir, path), payload)
+            entries[entry_name] = {'cle': key, 'fichier': path, 'vide': not figure.get('data')}
+            counters['construites'] += 1
+
+    plotly_js = f"plotly-{plotly.offline.get_plotlyjs_version()}.min.js"
+    if not os.path.exists(os.path.join(out_dir, plotly_js)):
+        write_if_changed(os.path.join(out_dir, plotly_js), plotly.offline.get_plotlyjs())
+
+    pages = {}
+    for period in periods:
+        dashboard.year_range = period
+        pages[f"{period[0]}-{period[1]}.html"] = render_page(dashboard, tabs, entries, period, periods, plotly_js)
+    pages['index.html'] = pages[f"{periods[0][0]}-{periods[0][1]}.html"]
+    for filename, content in pages.items():
+        counters['pages'] += write_if_changed(os.path.join(out_dir, filename), content)
+
+    write_if_changed(os.path.join(out_dir, MANIFEST), json.dumps({
+        'code': FIGURE_CODE_VERSION,
+        'periodes': [list(period) for period in periods],
+        'dependances': dependencies,
+        'figures': entries,
+    }, ensure_ascii=False, indent=2, sort_keys=True))
+    prune(out_dir, entries, pages, plotly_js)
+    return counters
+
+
+def prune(out_dir, entries, pages, plotly_js):
+    """Supprime les figures, pages de période et scripts qui ne sont plus référencés"""
+    used = {entry['fichier'] for entry in entries.values()}
+    for name in os.listdir(os.path.join(out_dir, 'figures')):
+        if f"figures/{name}" not in used:
+            os.remove(os.path.join(out_dir, 'figures', name))
+    for name in os.listdir(out_dir):
+        stale_page = re.fullmatch(r'-?\d+--?\d+\.html', name) and name not in pages
+        stale_script = re.fullmatch(r'plotly-.*\.min\.js', name) and name != plotly_js
+        if stale_page or stale_script:
+            os.remove(os.path.join(out_dir, name))
+
+
+def render_page(dashboard, tabs, entries, period, periods, plotly_js):
+    """Page d'une période : indicateurs clés, sections et onglets"""
+    cards = []
+    for card in dashboard.key_metric_cards():
+        delta = ""
+        if card['ecart'] is not None:
+            delta = (f'<div class="delta {"bon" if card["favorable"] else "mauvais"}">'
+                     f'{html.escape(card["ecart"])}</div>')
+        cards.append(f'<div class="carte"><div class="libelle">{html.escape(card["libelle"])}</div>'
+                     f'<div class="valeur">{html.escape(card["valeur"])}</div>{delta}</div>')
+
+    section_labels = {key: label for label, key, _ in dashboard.SECTIONS}
+    nav, panels = [], []
+    for index, (section, items) in enumerate(tabs.items()):
+        nav.append(tab_button('sections', f"s-{section}", section_labels[section], index == 0))
+        sub_nav, sub_panels = [], []
+        for tab_index, (label, tab_figures, text) in enumerate(items):
+            panel_id = f"s-{section}-{tab_index}"
+            sub_nav.append(tab_button(f"s-{section}", panel_id, label, tab_index == 0))
+            content = []
+            for figure_id, params in tab_figures:
+                entry = entries[f"{figure_name(section, figure_id, params)}@{period[0]}-{period[1]}"]
+                if entry['vide']:
+                    content.append('<p class="info">Aucune donnée disponible sur la période sélectionnée.</p>')
+                else:
+                    content.append(f'<div class="figure" data-src="{entry["fichier"]}"></div>')
+            for row in text:
+                content.append('<div class="ligne">' + ''.join(
+                    f'<div class="texte">{markdown_html(block)}</div>' for block in row) + '</div>')
+            sub_panels.append(tab_panel(f"s-{section}", panel_id, '\n'.join(content), tab_index == 0,
+                                        'grille' if tab_figures else ''))
+        body = f'<nav class="onglets">{"".join(sub_nav)}</nav>' + '\n'.join(sub_panels)
+        panels.append(tab_panel('sections', f"s-{section}", body, index == 0))
+
+    period_links = ' · '.join(
+        f'<strong>{start}–{end}</strong>' if (start, end) == tuple(period) else
+        f'<a href="{start}-{end}.html">{start}–{end}</a>' for start, end in periods)
+    return PAGE_TEMPLATE.format(
+        plotly_js=plotly_js, period=f"{period[0]}–{period[1]}", period_links=period_links,
+        cards=''.join(cards), nav=''.join(nav), panels='\n'.join(panels),
+        version=html.escape(dashboard.datasets.version))
+
+
+def tab_button(group, target, label, active):
+    return (f'<button class="onglet{" actif" if active else ""}" data-groupe="{group}" '
+            f'data-cible="{target}">{html.escape(label)}</button>')
+
+
+def tab_panel(group, panel_id, content, active, extra_class=''):
+    return (f'<section id="{panel_id}" class="panneau {extra_class}{" actif" if active else ""}" '
+            f'data-groupe="{group}">{content}</section>')
+
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="fr"><head><meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>Dashboard Tabac France - {period}</title>
+<script src="{plotly_js}"></script>
+<style>
+body {{ font-family: sans-serif; margin: 0 auto; max-width: 1400px; padding: 1rem; }}
+h1 {{ text-align: center; color: #8B0000; }}
+.periodes {{ text-align: center; margin-bottom: 1rem; }}
+.cartes {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 1rem; }}
+.carte {{ padding: 1rem; border-radius: 10px; background: rgba(139, 0, 0, 0.06); }}
+.carte .valeur {{ font-size: 1.8rem; }}
+.delta.bon {{ color: #28a745; }} .delta.mauvais {{ color: #dc3545; }}
+.onglets {{ display: flex; flex-wrap: wrap; gap: 0.25rem; margin: 1.5rem 0 0.5rem;
+            border-bottom: 3px solid #FF6B6B; }}
+.onglet {{ border: none; background: none; padding: 0.5rem 1rem; cursor: pointer; font-size: 1rem; }}
+.onglet.actif {{ background: #8B0000; color: white; border-radius: 6px 6px 0 0; }}
+.panneau {{ display: none; }} .panneau.actif {{ display: block; }}
+.panneau.grille.actif {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(480px, 1fr)); gap: 1rem; }}
+.figure {{ min-height: 450px; }}
+.ligne {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(280px, 1fr)); gap: 1rem; }}
+.grille .ligne {{ grid-column: 1 / -1; }}
+.info {{ padding: 1rem; background: rgba(0, 123, 255, 0.08); border-radius: 8px; }}
+footer {{ margin-top: 2rem; color: #888; font-size: 0.8rem; text-align: center; }}
+</style></head>
+<body>
+<h1>🚭 DASHBOARD STRATÉGIQUE - TABAC EN FRANCE</h1>
+<div class="periodes">Période : {period_links}</div>
+<div class="cartes">{cards}</div>
+<nav class="onglets">{nav}</nav>
+{panels}
+<footer>Version statique · données {version}</footer>
+<script>
+// Une figure n'est chargée qu'à l'affichage de son onglet
+function renderVisible() {{
+  document.querySelectorAll('.figure:not([data-rendu])').forEach(function (div) {{
+    if (div.offsetParent === null) return;
+    div.dataset.rendu = '1';
+    fetch(div.dataset.src).then(function (r) {{ return r.json(); }}).then(function (fig) {{
+      Plotly.newPlot(div, fig.data, fig.layout || {{}}, {{responsive: true}});
+    }});
+  }});
+}}
+document.querySelectorAll('.onglet').forEach(function (button) {{
+  button.addEventListener('click', function () {{
+    var group = button.dataset.groupe;
+    document.querySelectorAll('[data-groupe="' + group + '"]').forEach(function (el) {{
+      el.classList.toggle('actif', el === button || el.id === button.dataset.cible);
+    }});
+    renderVisible();
+  }});
+}});
+renderVisible();
+</script>
+</body></html>
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Construction du site statique du dashboard")
+    parser.add_argument('--out', default=SITE_DIR)
+    parser.add_argument('--periods', nargs='*', default=None, help="périodes DEBUT-FIN (défaut : "
+                        f"toute la série et ses {' / '.join(map(str, RECENT_YEARS))} dernières années)")
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    periods = [tuple(int(year) for year in period.split('-', 1)) for period in args.periods or []]
+    counters = build_site(args.out, periods, args.workers)
+    print(f"{counters['construites']} figures construites, {counters['inchangees']} inchangées, "
+          f"{counters['pages']} pages écrites dans {args.out}")
+
+
+if __name__ == '__main__':
+    main()
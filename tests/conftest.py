@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+# Les modules du dashboard sont à la racine du dépôt
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def app_env(tmp_path, monkeypatch):
+    """Environnement d'une exécution AppTest : caches dans tmp_path, pas de préchauffage, ressources vidées"""
+    import streamlit as st
+
+    monkeypatch.setenv('TABAC_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setenv('TABAC_WARMUP_WORKERS', '0')
+    st.cache_resource.clear()
+    yield
+    st.cache_resource.clear()
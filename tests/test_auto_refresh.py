@@ -0,0 +1,88 @@
+"""Rafraîchissement automatique : un changement de fichier ne relance le rendu qu'une fois"""
+import os
+
+import pandas as pd
+import pyarrow.feather as feather
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import refresh_monitor
+from data_loader import ColumnarDataLoader
+from refresh_monitor import version_changed
+
+DASHBOARD = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Dashboard.py')
+
+
+def test_version_changed_once_per_monitor_version():
+    state = {}
+    assert not version_changed(state, 'v1')
+    assert not version_changed(state, 'v1')
+    assert version_changed(state, 'v2')
+    assert not version_changed(state, 'v2')
+
+
+def write_regions(path, prevalence, mtime_ns):
+    feather.write_feather(pd.DataFrame({
+        'region': ['Bretagne', 'Normandie'], 'annee': [2023, 2023], 'prevalence': [prevalence, 24.0],
+    }), path)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_file_change_reruns_once(tmp_path, monkeypatch, app_env):
+    monkeypatch.setenv('TABAC_DATA_DIR', str(tmp_path))
+    path = tmp_path / 'regions_series.arrow'
+    write_regions(path, 21.0, 10**18)
+
+    # Chaque rendu complet recalcule l'empreinte des fichiers : on compte ces appels
+    calls = []
+    fingerprint = ColumnarDataLoader.fingerprint
+    monkeypatch.setattr(ColumnarDataLoader, 'fingerprint', lambda self: calls.append(1) or fingerprint(self))
+    monitors = []
+    monitor_init = refresh_monitor.DataChangeMonitor.__init__
+    monkeypatch.setattr(refresh_monitor.DataChangeMonitor, '__init__',
+                        lambda self, *args, **kwargs: monitors.append(self) or monitor_init(self, *args, **kwargs))
+
+    at = AppTest.from_file(DASHBOARD, default_timeout=120)
+    at.run()
+    next(box for box in at.sidebar.checkbox if box.label == "Rafraîchissement automatique").check().run()
+    assert not at.exception and len(monitors) == 1
+    del calls[:]
+    at.run()
+    per_render = len(calls)
+
+    # Fichier modifié, moniteur pas encore passé : la session ne se relance pas
+    write_regions(path, 22.0, 10**18 + 10**9)
+    del calls[:]
+    at.run()
+    assert not at.exception
+    assert len(calls) == per_render
+
+    # Le moniteur voit le changement : une seule relance complète
+    assert monitors[0].check()
+    del calls[:]
+    at.run()
+    assert not at.exception
+    assert len(calls) == 2 * per_render
+
+    del calls[:]
+    at.run()
+    assert len(calls) == per_render
+    monitors[0].stop()
+
+
+def test_monitor_skips_unreadable_files_but_raises_other_errors():
+    errors = [OSError("fichier remplacé"), KeyError('bug')]
+
+    def fingerprint():
+        if errors:
+            raise errors.pop(0)
+        return 'v2'
+
+    monitor = refresh_monitor.DataChangeMonitor(lambda: 'v1', interval=3600)
+    monitor._fingerprint = fingerprint
+    assert not monitor.check() and monitor.checks == 0
+    # Une erreur de programmation ne passe pas pour « données inchangées »
+    with pytest.raises(KeyError):
+        monitor.check()
+    assert monitor.check() and monitor.version == 'v2'
+    monitor.stop()
@@ -0,0 +1,30 @@
+"""Le banc d'essai passe à sa plus grande échelle par défaut (configuration réduite)"""
+import importlib
+
+import Dashboard
+from benchmark import DEFAULT_SCALES, FIRST_YEAR, LAST_YEAR, bench_scale, synthetic_datasets
+
+TINY_SIZES = {'politiques': 1, 'regions': 1, 'pays': 1, 'pays_panel': 1}
+
+
+def test_synthetic_years_stay_in_window():
+    datasets = synthetic_datasets(max(DEFAULT_SCALES), sizes=TINY_SIZES)
+    for frame in datasets.values():
+        if 'annee' in frame:
+            assert frame['annee'].between(FIRST_YEAR, LAST_YEAR).all()
+    assert datasets['politiques.arrow']['date'].str[:4].astype(int).between(FIRST_YEAR, LAST_YEAR).all()
+
+
+def test_largest_default_scale_runs(tmp_path, monkeypatch):
+    # bench_scale fixe ces variables et recharge Dashboard : on les restaure ensuite
+    monkeypatch.setenv('TABAC_DATA_DIR', str(tmp_path / 'data'))
+    monkeypatch.setenv('TABAC_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setenv('TABAC_WARMUP_WORKERS', '0')
+    try:
+        results = bench_scale(max(DEFAULT_SCALES), str(tmp_path), sizes=TINY_SIZES)
+    finally:
+        monkeypatch.undo()
+        importlib.reload(Dashboard)
+
+    assert results['run_dashboard.rerun']['bytes'] > 0
+    assert results['figure.historique.prevalence']['bytes'] > 0
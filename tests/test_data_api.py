@@ -0,0 +1,97 @@
+"""API des données : ETag et 304, erreurs 404/400 (même conditionnelles), lots tolérants aux erreurs"""
+import gzip
+import json
+
+import pytest
+
+from data_api import DataAPI
+
+
+@pytest.fixture
+def api(tmp_path):
+    from Dashboard import SharedDatasets, TobaccoDashboard
+    from data_loader import ColumnarDataLoader
+    from dataset_schema import SCHEMAS
+
+    # Sources intégrées seulement : aucun fichier dans tmp_path
+    loader = ColumnarDataLoader(str(tmp_path), SCHEMAS)
+    loader.register('historical_data', 'historique.arrow', TobaccoDashboard.initialize_historical_data)
+    loader.register('health_impact_data', 'sante.arrow', TobaccoDashboard.initialize_health_impact_data)
+    loader.register('policy_timeline', 'politiques.arrow', TobaccoDashboard.initialize_policy_timeline)
+    loader.register('regional_data', 'regions.arrow', TobaccoDashboard.initialize_regional_data)
+    loader.register('international_comparison', 'international.arrow',
+                    TobaccoDashboard.initialize_international_comparison)
+    datasets = SharedDatasets('v1', loader)
+    return DataAPI(lambda: datasets)
+
+
+def get_json(api, path, query='', headers=None):
+    status, response_headers, payload = api.respond('GET', path, query, headers=headers)
+    if response_headers.get('Content-Encoding') == 'gzip':
+        payload = gzip.decompress(payload)
+    return status, response_headers, json.loads(payload) if payload else None
+
+
+def test_slice_filters_years_and_columns(api):
+    status, _, body = get_json(api, '/api/datasets/historical_data',
+                               'annee_debut=2015&annee_fin=2020&colonnes=annee,prevalence_tabagisme')
+    assert status == 200
+    assert body['colonnes'] == ['annee', 'prevalence_tabagisme']
+    assert [row['annee'] for row in body['donnees']] == list(range(2015, 2021))
+
+
+def test_etag_revalidates_with_304(api):
+    status, headers, _ = get_json(api, '/api/datasets/regional_data', 'region=Bretagne')
+    assert status == 200
+    etag = headers['ETag']
+
+    status, headers, body = get_json(api, '/api/datasets/regional_data', 'region=Bretagne',
+                                     {'If-None-Match': f'W/{etag}'})
+    assert (status, body, headers['ETag']) == (304, None, etag)
+    # Même tranche, paramètres dans un autre ordre : même ETag
+    status, _, _ = get_json(api, '/api/datasets/regional_data', 'region=Bretagne&colonnes=',
+                            {'If-None-Match': etag})
+    assert status == 304
+    # Encodage différent : autre représentation, autre ETag
+    status, headers, _ = get_json(api, '/api/datasets/regional_data', 'region=Bretagne',
+                                  {'If-None-Match': etag, 'Accept-Encoding': 'gzip'})
+    assert status == 200 and headers['ETag'] != etag
+
+
+@pytest.mark.parametrize('path, query, expected', [
+    ('/api/datasets/nope', '', 404),
+    ('/api/datasets/historical_data', 'colonnes=inconnue', 400),
+    ('/api/datasets/regional_data', 'pays=France', 400),
+    ('/api/datasets/regional_data', 'annee_debut=2015', 400),
+    ('/api/datasets/historical_data', 'annee_debut=deux-mille', 400),
+    ('/api/inconnu', '', 404),
+])
+def test_invalid_resources_are_errors_even_when_conditional(api, path, query, expected):
+    for headers in ({}, {'If-None-Match': '*'}):
+        status, response_headers, body = get_json(api, path, query, headers)
+        assert status == expected
+        assert 'ETag' not in response_headers and body['erreur']
+
+
+def test_wildcard_matches_existing_resource(api):
+    status, _, _ = get_json(api, '/api/datasets', headers={'If-None-Match': '*'})
+    assert status == 304
+
+
+def test_batch_reports_errors_per_item(api):
+    body = json.dumps({'requetes': [{'dataset': 'historical_data', 'annee_debut': 2022},
+                                    {'dataset': 'nope'},
+                                    {'dataset': 'regional_data', 'colonnes': ['inconnue']},
+                                    'pas un objet']}).encode()
+    status, _, payload = api.respond('POST', '/api/batch', body=body)
+    results = json.loads(payload)['resultats']
+    assert status == 200
+    assert [row['annee'] for row in results[0]['donnees']] == [2022, 2023]
+    assert [result.get('statut') for result in results[1:]] == [404, 400, 400]
+
+
+def test_batch_body_must_be_a_bounded_list(api):
+    status, _, _ = api.respond('POST', '/api/batch', body=b'{"requetes": "historical_data"}')
+    assert status == 400
+    status, _, _ = api.respond('POST', '/api/batch', body=b'not json')
+    assert status == 400
@@ -0,0 +1,66 @@
+"""LTTB : extrémités et taille conservées, passes vectorisées identiques au calcul séquentiel"""
+import numpy as np
+import plotly.graph_objects as go
+import pytest
+
+import downsampling
+from downsampling import WEBGL_THRESHOLD, ResolutionPyramid, lttb_indices, scatter_class
+
+
+def series(kind, n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    x = np.arange(n, dtype=float)
+    if kind == 'marche':
+        return x, rng.normal(size=n).cumsum()
+    if kind == 'plate':
+        return x, np.ones(n)
+    if kind == 'binaire':
+        return x, (np.arange(n) // 7 % 2).astype(float)
+    y = rng.normal(size=n).cumsum()
+    y[rng.integers(1, n - 1, 50)] = np.nan
+    return x, y
+
+
+@pytest.mark.parametrize('n_out', [3, 10, 500])
+def test_keeps_endpoints_and_size(n_out):
+    x, y = series('marche')
+    picked = lttb_indices(x, y, n_out)
+    assert len(picked) == n_out
+    assert picked[0] == 0 and picked[-1] == len(x) - 1
+    assert np.all(np.diff(picked) > 0)
+
+
+def test_short_series_are_untouched():
+    x, y = series('marche', n=20)
+    assert np.array_equal(lttb_indices(x, y, 50), np.arange(20))
+    assert np.array_equal(lttb_indices(x, y, 2), [0, 19])
+
+
+def test_spike_survives():
+    x, y = series('plate')
+    y[1234] = 100.0
+    assert 1234 in lttb_indices(x, y, 100)
+
+
+@pytest.mark.parametrize('kind', ['marche', 'plate', 'binaire', 'trous'])
+def test_vectorized_matches_sequential(kind, monkeypatch):
+    x, y = series(kind)
+    vectorized = lttb_indices(x, y, 300)
+    # Une seule passe : tous les seaux sont refaits dans l'ordre par le repli séquentiel
+    monkeypatch.setattr(downsampling, 'MAX_PASSES', 1)
+    assert np.array_equal(vectorized, lttb_indices(x, y, 300))
+
+
+def test_pyramid_respects_the_point_budget():
+    x, y = series('marche', n=50_000)
+    pyramid = ResolutionPyramid(x, {'y': y}, max_points=1000)
+    rows = pyramid.rows()
+    assert 0 < len(rows) <= 1000
+    assert rows[0] == 0 and rows[-1] == len(x) - 1
+    # Période courte : toutes les lignes
+    assert np.array_equal(pyramid.rows(100, 599), np.arange(100, 600))
+
+
+def test_scatter_class_switches_to_webgl():
+    assert scatter_class(WEBGL_THRESHOLD) is go.Scatter
+    assert scatter_class(WEBGL_THRESHOLD + 1) is go.Scattergl
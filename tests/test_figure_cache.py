@@ -0,0 +1,54 @@
+"""Cache des figures : construction unique, élagage LRU du disque, taille suivie"""
+import os
+import threading
+import time
+
+from figure_cache import FigureCache
+
+
+def test_concurrent_misses_build_once(tmp_path):
+    cache = FigureCache(cache_dir=str(tmp_path))
+    calls = []
+
+    def build():
+        calls.append(1)
+        time.sleep(0.05)
+        return '{"data": []}'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_build('k', build))) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert results == ['{"data": []}'] * 16
+
+
+def test_failed_build_lets_waiters_retry(tmp_path):
+    cache = FigureCache(cache_dir=str(tmp_path))
+    try:
+        cache.get_or_build('k', lambda: 1 / 0)
+    except ZeroDivisionError:
+        pass
+    assert cache.get_or_build('k', lambda: 'ok') == 'ok'
+
+
+def test_disk_prune_evicts_least_recently_read(tmp_path):
+    cache = FigureCache(max_memory_bytes=0, cache_dir=str(tmp_path), max_disk_bytes=10**6)
+    for age, key in enumerate(['a', 'b', 'c']):
+        cache.get_or_build(key, lambda: 'x' * 1000)
+        os.utime(cache._path(key), (1000 + age, 1000 + age))
+    # 'a' est le plus ancien écrit mais vient d'être lu
+    cache.get_or_build('a', lambda: 'rebuilt')
+    cache.max_disk_bytes = 2500
+    cache._prune_disk()
+    assert sorted(name[0] for name in os.listdir(tmp_path)) == ['a', 'c']
+
+
+def test_overwrite_does_not_inflate_disk_size(tmp_path):
+    cache = FigureCache(cache_dir=str(tmp_path))
+    cache._write_disk('k', 'x' * 1000)
+    for _ in range(5):
+        cache._write_disk('k', 'x' * 1000)
+    assert cache._disk_bytes == 1000
@@ -0,0 +1,72 @@
+"""Encodage compact : mêmes valeurs de traces après tableaux typés et x0/dx"""
+import json
+
+import numpy as np
+import plotly.graph_objects as go
+
+from figure_encoding import SIGNIFICANT_DIGITS, compact_figure_json, decimal_figure_json, decode_array, wire_bytes
+
+YEARS = list(range(2000, 2024))
+
+
+def trace_values(trace, key):
+    """Valeurs d'un tableau de trace, x0/dx et tableaux typés décodés"""
+    if key == 'x' and 'x' not in trace and 'x0' in trace:
+        n = len(decode_array(trace['y']))
+        return trace['x0'] + trace['dx'] * np.arange(n, dtype=float)
+    value = trace[key]
+    array = decode_array(value)
+    if array is None:
+        return np.array([np.nan if v is None else v for v in value], dtype=float)
+    return array.astype(float)
+
+
+def figure_payload():
+    rng = np.random.default_rng(0)
+    figure = go.Figure([
+        go.Scatter(x=YEARS, y=np.round(np.linspace(35, 21, len(YEARS)), 1), name="Prévalence"),
+        go.Bar(x=YEARS, y=rng.integers(60_000, 80_000, len(YEARS)), name="Décès"),
+        go.Scatter(x=np.round(rng.uniform(4, 22, 30), 2), y=np.round(rng.uniform(10, 26, 30), 1), mode='markers',
+                   customdata=np.round(rng.uniform(0, 2, 30), 2), name="Pays"),
+        go.Scatter(x=[2001, 2003, 2004, 2010, 2020], y=[1.5, None, 2.25, 3.0, 4.125], name="Irrégulier"),
+    ])
+    return decimal_figure_json(figure.to_json())
+
+
+def test_compact_round_trips_trace_values():
+    payload = figure_payload()
+    original = json.loads(payload)['data']
+    compact = json.loads(compact_figure_json(payload))['data']
+
+    for before, after in zip(original, compact):
+        for key in ('x', 'y', 'customdata'):
+            if key in before:
+                np.testing.assert_allclose(trace_values(after, key), trace_values(before, key),
+                                           rtol=1e-6, equal_nan=True)
+
+
+def test_long_decimals_keep_significant_digits():
+    values = np.random.default_rng(1).uniform(10, 26, 30)
+    payload = go.Figure(go.Scatter(x=values, y=values, mode='markers')).to_json()
+    compact = json.loads(compact_figure_json(payload))['data'][0]
+    np.testing.assert_allclose(trace_values(compact, 'y'), values, rtol=10.0 ** (1 - SIGNIFICANT_DIGITS))
+
+
+def test_regular_axes_and_integers_are_rewritten():
+    compact = json.loads(compact_figure_json(figure_payload()))['data']
+    prevalence, deaths, countries, irregular = compact
+    assert (prevalence['x0'], prevalence['dx']) == (2000, 1) and 'x' not in prevalence
+    assert deaths['y']['dtype'] == 'i4'
+    # Coordonnées irrégulières et survols : pas de x0/dx, décimales exactes
+    assert 'x' in countries and 'x0' not in countries
+    assert 'x' in irregular and irregular['y'][1] is None
+
+
+def test_compact_payload_is_smaller_and_survives_streamlit_validation():
+    payload = figure_payload()
+    compact = compact_figure_json(payload)
+    assert len(compact) < len(payload)
+    # st.plotly_chart revalide la figure : x0/dx et tableaux typés doivent y survivre
+    resent = go.Figure(**json.loads(compact)).to_dict()['data']
+    assert resent[0]['x0'] == 2000 and resent[1]['y']['dtype'] == 'i4'
+    assert wire_bytes(compact) < wire_bytes(payload)
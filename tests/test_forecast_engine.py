@@ -0,0 +1,24 @@
+"""Projections régionales : dérive et année de départ tirées des données"""
+import numpy as np
+import pandas as pd
+
+from forecast_engine import forecast_prevalence, logit, regional_trends
+
+HISTORICAL = pd.DataFrame({'annee': np.arange(2000, 2024), 'prevalence_tabagisme': np.linspace(34.5, 20.9, 24)})
+
+
+def test_drift_uses_the_evolution_span_from_the_column_name():
+    regional = pd.DataFrame({'region': ['A'], 'prevalence_2024': [20.0], 'evolution_2014_2024': [-5.0]})
+    labels, _, drifts, last_years = regional_trends(regional)
+    assert labels == ['A'] and last_years == [2024]
+    assert np.isclose(drifts[0], (logit(20.0) - logit(25.0)) / 10)
+
+
+def test_each_region_starts_after_its_own_last_observed_year():
+    regional = pd.DataFrame({'region': ['A', 'B'], 'prevalence_2023': [20.0, 22.0],
+                             'evolution_2010_2023': [-5.0, -4.0]})
+    series = pd.DataFrame({'region': ['A'] * 3, 'annee': [2019, 2020, 2021], 'prevalence': [24.0, 23.5, 23.0]})
+    projections = forecast_prevalence(HISTORICAL, regional, series=series, n_paths=200)
+    first_years = projections.groupby('serie')['annee'].min()
+    assert first_years.to_dict() == {'France': 2024, 'A': 2022, 'B': 2024}
+    assert (projections.groupby('serie')['annee'].max() == 2030).all()
@@ -0,0 +1,57 @@
+"""Régression segmentée : rupture retrouvée sur une série synthétique par morceaux"""
+import numpy as np
+import pandas as pd
+
+from policy_impact import HORIZON, estimate_policy_impacts, policy_years
+
+YEARS = np.arange(1990, 2024)
+
+
+def piecewise(rupture, level, slope, noise=0.05, seed=0):
+    """Tendance linéaire ; à partir de `rupture`, saut de niveau `level` et pente modifiée de `slope`"""
+    rng = np.random.default_rng(seed)
+    after = YEARS >= rupture
+    return 30 - 0.2 * (YEARS - 1990) + after * (level + slope * (YEARS - rupture)) + rng.normal(0, noise, len(YEARS))
+
+
+def policies(*dates):
+    return pd.DataFrame({'date': list(dates), 'titre': [f"Mesure {d}" for d in dates],
+                         'type': 'tax'})
+
+
+def test_second_half_policies_count_for_next_year():
+    assert list(policy_years(['2005-03-01', '2005-07-01'])) == [2005, 2006]
+
+
+def test_breakpoint_and_impact_are_recovered():
+    series = pd.DataFrame({'serie': 'France', 'annee': YEARS,
+                           'prevalence': piecewise(rupture=2007, level=-1.5, slope=-0.3)})
+    result = estimate_policy_impacts(series, policies('2005-01-01'), n_bootstrap=500)
+    row = result.iloc[0]
+
+    assert row['delai_impact'] == 2
+    expected = -1.5 - 0.3 * HORIZON
+    assert abs(row['impact_prevalence'] - expected) < 0.2
+    assert row['ic_bas'] <= expected <= row['ic_haut']
+    assert abs(row['changement_niveau'] + 1.5) < 0.2
+    assert abs(row['changement_pente'] + 0.3) < 0.1
+
+
+def test_no_break_gives_an_interval_around_zero():
+    series = pd.DataFrame({'serie': 'France', 'annee': YEARS, 'prevalence': piecewise(2100, 0, 0)})
+    row = estimate_policy_impacts(series, policies('2005-01-01'), n_bootstrap=500).iloc[0]
+    assert row['ic_bas'] <= 0 <= row['ic_haut']
+    assert abs(row['impact_prevalence']) < 0.3
+
+
+def test_series_are_estimated_together_and_short_windows_omitted():
+    series = pd.concat([
+        pd.DataFrame({'serie': 'France', 'annee': YEARS, 'prevalence': piecewise(2007, -1.5, -0.3)}),
+        pd.DataFrame({'serie': 'Bretagne', 'annee': YEARS, 'prevalence': piecewise(2012, -1.0, 0.0, seed=1)}),
+    ])
+    # 2025 : aucune observation après l'entrée en vigueur
+    result = estimate_policy_impacts(series, policies('2005-01-01', '2010-01-01', '2025-01-01'), n_bootstrap=200)
+    assert set(result['politique']) == {'Mesure 2005-01-01', 'Mesure 2010-01-01'}
+    lags = result.set_index(['politique', 'serie'])['delai_impact']
+    assert lags[('Mesure 2005-01-01', 'France')] == 2
+    assert lags[('Mesure 2010-01-01', 'Bretagne')] == 2
@@ -0,0 +1,66 @@
+"""Simulateur de prix : élasticités retrouvées, grille conforme au modèle, années cibles déjà observées"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from price_scenarios import PRICE_STEP, TARGET_YEARS, build_surface, fit_elasticities, interpolation_weights
+
+
+def historical(last_year=2023, e_c=-0.4, e_p=-0.3):
+    """Données à élasticité constante exacte, recettes à part fiscale de 80 %"""
+    years = np.arange(2000, last_year + 1)
+    price = np.linspace(4.0, 12.0, len(years))
+    consumption = 90 * (price / price[0]) ** e_c
+    return pd.DataFrame({
+        'annee': years, 'prix_moyen': price, 'consommation_cigarettes': consumption,
+        'prevalence_tabagisme': 33 * (price / price[0]) ** e_p,
+        'recettes_fiscales': 0.8 * price * consumption / 20,
+    })
+
+
+def test_fit_recovers_elasticities_and_tax_share():
+    model = fit_elasticities(historical())
+    assert model['elasticite_consommation'] == pytest.approx(-0.4)
+    assert model['elasticite_prevalence'] == pytest.approx(-0.3)
+    assert model['part_fiscale'] == pytest.approx(0.8)
+    assert (model['annee'], model['prix']) == (2023, pytest.approx(12.0))
+
+
+def test_interpolation_weights_reach_each_target():
+    weights = interpolation_weights(2023, TARGET_YEARS, np.arange(2024, 2031))
+    prices = weights @ np.array([12.0, 14.0, 18.0])
+    assert list(prices) == pytest.approx([13.0, 14.0, 16.0, 18.0, 18.0, 18.0, 18.0])
+
+
+def test_grid_scenarios_match_the_closed_form():
+    surface = build_surface(historical())
+    frame = surface.scenario((14.0, 18.0), multiplier=1.5)
+    ratio = frame['prix'].to_numpy() / 12.0
+    model = surface.model
+    np.testing.assert_allclose(frame['consommation'], model['consommation'] * ratio ** (-0.4 * 1.5), rtol=1e-5)
+    np.testing.assert_allclose(frame['prevalence'], model['prevalence'] * ratio ** (-0.3 * 1.5), rtol=1e-5)
+    np.testing.assert_allclose(frame['recettes'], 0.8 * frame['prix'] * frame['consommation'] / 20, rtol=1e-5)
+    assert (frame['prevalence_bas'] <= frame['prevalence']).all()
+    assert (frame['prevalence'] <= frame['prevalence_haut']).all()
+
+
+def test_constant_price_keeps_last_observed_level():
+    surface = build_surface(historical())
+    frame = surface.scenario((12.0, 12.0))
+    np.testing.assert_allclose(frame['prevalence'], surface.model['prevalence'], rtol=1e-6)
+    # Plus cher, moins de fumeurs
+    final = surface.final_surface('prevalence')
+    assert final[0, 0] == final.max() and final[-1, -1] == final.min()
+
+
+def test_sliders_snap_to_the_grid():
+    surface = build_surface(historical())
+    assert surface.grid_prices((14.04, 30.0)) == (pytest.approx(14.0), pytest.approx(22.0))
+    assert surface.target_prices[0][1] - surface.target_prices[0][0] == pytest.approx(PRICE_STEP)
+
+
+def test_observed_target_year_is_fixed():
+    surface = build_surface(historical(last_year=2025))
+    assert len(surface.target_prices[0]) == 1
+    assert surface.grid_prices((20.0, 15.0))[0] == pytest.approx(surface.model['prix'], abs=0.01)
+    assert list(surface.scenario((20.0, 15.0))['annee']) == list(range(2026, 2031))
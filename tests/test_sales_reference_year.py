@@ -0,0 +1,38 @@
+"""Une année de ventes seules (sans prévalence) ne devient pas l'année de fin par défaut"""
+import os
+
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+from sales_ingestion import SalesAggregator
+
+DASHBOARD = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Dashboard.py')
+
+
+def test_sales_only_year_is_not_the_default_end_year(tmp_path, monkeypatch, app_env):
+    from Dashboard import TobaccoDashboard
+
+    # Extrait couvrant les 12 mois de 2024 : l'année est publiée dans historique.arrow, sans prévalence
+    extract = tmp_path / 'ventes_2024.csv'
+    pd.DataFrame({
+        'date': [f'2024-{month:02d}-15' for month in range(1, 13)],
+        'paquets': 2.0e8, 'montant_ttc': 2.6e9, 'montant_taxes': 2.1e9,
+    }).to_csv(extract, index=False)
+    aggregator = SalesAggregator(str(tmp_path))
+    aggregator.ingest(str(extract))
+    aggregator.save(TobaccoDashboard.initialize_historical_data())
+    historical = pd.read_feather(tmp_path / 'historique.arrow')
+    assert historical['annee'].max() == 2024
+    assert historical.loc[historical['annee'] == 2024, 'prevalence_tabagisme'].isna().all()
+
+    monkeypatch.setenv('TABAC_DATA_DIR', str(tmp_path))
+    at = AppTest.from_file(DASHBOARD, default_timeout=120)
+    at.run()
+    assert not at.exception
+
+    end = next(box for box in at.sidebar.selectbox if box.label == "Année de fin")
+    assert '2024' in end.options
+    assert end.value == 2023
+    prevalence = at.metric[0]
+    assert prevalence.label == "Prévalence Tabagisme (2023)"
+    assert prevalence.value != "n.d."
@@ -0,0 +1,40 @@
+"""Données partagées : vues sans copie, une modification de session reste privée"""
+import numpy as np
+import pandas as pd
+
+from data_loader import ColumnarDataLoader
+
+# Comme Dashboard.py : copy-on-write (par défaut à partir de pandas 3)
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.options.mode.copy_on_write = True
+
+
+def builtin():
+    return pd.DataFrame({'annee': np.arange(2000, 2024), 'prevalence': np.linspace(35, 21, 24)})
+
+
+def loader_with(tmp_path, from_file):
+    loader = ColumnarDataLoader(str(tmp_path))
+    loader.register('historical_data', 'historique.arrow', builtin)
+    if from_file:
+        builtin().to_feather(tmp_path / 'historique.arrow')
+    return loader
+
+
+def test_sessions_share_buffers_without_copy(tmp_path):
+    for from_file in (False, True):
+        loader = loader_with(tmp_path, from_file)
+        first, second = loader.load('historical_data'), loader.load('historical_data')
+        assert first is not second
+        assert np.shares_memory(first['prevalence'].to_numpy(), second['prevalence'].to_numpy())
+
+
+def test_session_edit_does_not_leak(tmp_path):
+    for from_file in (False, True):
+        loader = loader_with(tmp_path, from_file)
+        session = loader.load('historical_data')
+        session.loc[0, 'prevalence'] = -1.0
+        session['nouvelle'] = 1
+        other = loader.load('historical_data')
+        assert other.loc[0, 'prevalence'] == 35.0
+        assert 'nouvelle' not in other.columns
@@ -0,0 +1,31 @@
+"""Préchauffage : un plan tronqué par la file pleine est complété au rerun suivant"""
+import threading
+
+from warmup import WarmupScheduler
+
+
+def test_truncated_plan_is_completed_later():
+    release = threading.Event()
+    built = []
+
+    def task(key):
+        return key, lambda: release.wait(5) and built.append(key)
+
+    scheduler = WarmupScheduler(max_workers=1, max_pending=2)
+    tasks = [task(key) for key in 'abcd']
+    assert scheduler.schedule('s1', 'etat', tasks) == 2
+    assert scheduler.stats()['ignorees'] == 2
+
+    # File libérée : le même état planifie les figures restantes
+    release.set()
+    for future in [future for _, future in scheduler._sessions['s1'][1]]:
+        future.result()
+    assert scheduler.schedule('s1', 'etat', [task(key) for key in 'cd']) == 2
+    for future in [future for _, future in scheduler._sessions['s1'][1]]:
+        future.result()
+    assert sorted(built) == list('abcd')
+
+    # Plan complet : le même état n'est plus replanifié
+    assert scheduler.schedule('s1', 'etat', []) == 0
+    assert scheduler.schedule('s1', 'etat', [task('e')]) == 0
+    assert scheduler.stats()['planifiees'] == 4
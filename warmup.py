@@ -0,0 +1,101 @@
+"""Préchauffage des figures des onglets non affichés
+
+Pendant qu'un utilisateur lit un onglet, les figures des autres onglets sont
+construites pour le même état des contrôles dans un pool de threads borné et
+rejoignent le cache de figures : ouvrir un autre onglet n'est plus qu'une
+lecture du cache.
+
+Une session n'a qu'un état en attente : un nouvel état (autre période, autre
+série…) annule les constructions pas encore commencées de l'état précédent,
+sauf celles qu'une autre session attend aussi. Une figure demandée par
+plusieurs sessions n'est construite qu'une fois.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+WARMUP_WORKERS = 2
+# Constructions en attente au plus, toutes sessions confondues
+MAX_PENDING = 64
+
+logger = logging.getLogger(__name__)
+
+
+class WarmupScheduler:
+    """File de constructions d'arrière-plan, regroupées par état de session"""
+
+    def __init__(self, max_workers=WARMUP_WORKERS, max_pending=MAX_PENDING):
+        self.max_pending = max_pending
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='prechauffage')
+        self._lock = threading.Lock()
+        # session -> (état, [(clé, future)], plan complet)
+        self._sessions = {}
+        # clé -> future des constructions planifiées ou en cours
+        self._inflight = {}
+        self.counters = {'planifiees': 0, 'construites': 0, 'annulees': 0, 'ignorees': 0, 'erreurs': 0}
+
+    def schedule(self, session_id, state, tasks):
+        """Planifie les constructions (clé, build) de l'état `state` de la session
+
+        Un état identique à celui déjà planifié en entier n'est pas replanifié ;
+        un plan tronqué par max_pending est complété aux appels suivants. Retourne
+        le nombre de constructions en attente pour cet état.
+        """
+        with self._lock:
+            previous = self._sessions.get(session_id)
+            if previous is not None and previous[0] == state and previous[2]:
+                return 0
+            if previous is not None and previous[0] != state:
+                self._cancel(session_id, previous[1])
+            self._prune()
+
+            futures = []
+            complete = True
+            for index, (key, build) in enumerate(tasks):
+                future = self._inflight.get(key)
+                if future is None:
+                    if len(self._inflight) >= self.max_pending:
+                        # File pleine : le reste de l'état sera planifié au prochain appel
+                        self.counters['ignorees'] += len(tasks) - index
+                        complete = False
+                        break
+                    future = self._inflight[key] = self._pool.submit(self._run, key, build)
+                    self.counters['planifiees'] += 1
+                futures.append((key, future))
+            self._sessions[session_id] = (state, futures, complete)
+            return sum(1 for key, future in futures if not future.done())
+
+    def _cancel(self, session_id, futures):
+        """Annule les constructions non commencées qu'aucune autre session n'attend"""
+        wanted = {key for other, (_, items, _) in self._sessions.items() if other != session_id
+                  for key, _ in items}
+        for key, future in futures:
+            if key not in wanted and future.cancel():
+                self.counters['annulees'] += 1
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+
+    def _prune(self):
+        """Oublie les sessions dont toutes les constructions sont terminées"""
+        for session_id in [s for s, (_, items, _) in self._sessions.items()
+                           if all(future.done() for _, future in items)]:
+            del self._sessions[session_id]
+
+    def _run(self, key, build):
+        try:
+            build()
+        except Exception:
+            logger.exception("Échec du préchauffage de %s", key)
+            with self._lock:
+                self.counters['erreurs'] += 1
+        else:
+            with self._lock:
+                self.counters['construites'] += 1
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def stats(self):
+        """Compteurs et constructions en attente"""
+        with self._lock:
+            return dict(self.counters, en_attente=len(self._inflight))